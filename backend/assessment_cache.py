@@ -0,0 +1,144 @@
+"""
+Assessment Cache
+================
+
+Quizzes and final tests compiled once and kept in memory, so grading and review
+paths don't reload the document and scan its question list for every answer.
+
+A compiled assessment indexes its questions by id. Entries live for a TTL and are
+dropped as soon as the assessment is edited or deleted in this process; other
+workers pick up edits when their entry expires.
+
+It also handles delivery: learner-safe copies of the questions (no answer key or
+explanation) and anything derived from them are built once per cached version, and
+each attempt gets its questions drawn from the pool (questionsPerAttempt of them,
+shuffled when shuffleQuestions is set) with a seed fixed by the assessment, the
+student and the attempt number, so the questions served and the questions graded
+are the same.
+"""
+
+import hashlib
+import logging
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from prometheus_client import Counter
+
+logger = logging.getLogger(__name__)
+
+ASSESSMENT_CACHE_REQUESTS = Counter(
+    "assessment_cache_requests_total",
+    "Compiled assessment lookups, by collection and result (hit or miss)",
+    ["collection", "result"]
+)
+
+
+# Question fields learners never receive
+ANSWER_KEY_FIELDS = ("correctAnswer", "correctAnswers", "correctOrder", "explanation")
+
+
+def learner_safe_question(question: dict) -> dict:
+    return {key: value for key, value in question.items() if key not in ANSWER_KEY_FIELDS}
+
+
+def attempt_seed(assessment_id: str, student_id: str, attempt_number: int) -> int:
+    """Seed for drawing an attempt's questions; the same inputs always draw the same questions."""
+    digest = hashlib.sha256(f"{assessment_id}:{student_id}:{attempt_number}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+@dataclass
+class CompiledAssessment:
+    id: str
+    document: Dict[str, Any]
+    questions: List[dict] = field(default_factory=list)
+    by_id: Dict[str, dict] = field(default_factory=dict)
+    total_points: float = 0
+    # Values built from this version on first use (learner payloads, ...)
+    derived: Dict[str, Any] = field(default_factory=dict)
+
+    def question(self, question_id: Optional[str]) -> Optional[dict]:
+        return self.by_id.get(question_id)
+
+    def questions_for(self, question_ids: Optional[List[str]]) -> List[dict]:
+        """The questions an attempt was given, in its order (every question when it predates drawing)."""
+        if question_ids is None:
+            return self.questions
+        return [self.by_id[question_id] for question_id in question_ids if question_id in self.by_id]
+
+    @property
+    def is_randomized(self) -> bool:
+        return bool(self.document.get("shuffleQuestions")) or self.draw_count < len(self.questions)
+
+    @property
+    def draw_count(self) -> int:
+        """Questions per attempt: questionsPerAttempt, capped at the pool size."""
+        per_attempt = self.document.get("questionsPerAttempt")
+        return min(per_attempt, len(self.questions)) if per_attempt else len(self.questions)
+
+    def draw(self, seed: int) -> List[dict]:
+        """The questions for the attempt with this seed, in delivery order."""
+        if not self.is_randomized:
+            return self.questions
+        rng = random.Random(seed)
+        indices = sorted(rng.sample(range(len(self.questions)), self.draw_count))
+        if self.document.get("shuffleQuestions"):
+            rng.shuffle(indices)
+        return [self.questions[index] for index in indices]
+
+    def memo(self, name: str, build: Callable[[], Any]) -> Any:
+        if name not in self.derived:
+            self.derived[name] = build()
+        return self.derived[name]
+
+
+def compile_assessment(document: Dict[str, Any]) -> CompiledAssessment:
+    questions = document.get("questions") or []
+    return CompiledAssessment(
+        id=document["id"],
+        document=document,
+        questions=questions,
+        by_id={question.get("id"): question for question in questions},
+        total_points=document.get("totalPoints") or sum(question.get("points", 1) for question in questions)
+    )
+
+
+class AssessmentCache:
+    """LRU of compiled assessments keyed by (database.collection, id)."""
+
+    def __init__(self, ttl_seconds: float = 60.0, max_entries: int = 512):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, CompiledAssessment]]" = OrderedDict()
+
+    async def get(self, collection, assessment_id: Optional[str]) -> Optional[CompiledAssessment]:
+        """The compiled assessment, loading it from collection on a miss (None when it doesn't exist)."""
+        if not assessment_id:
+            return None
+        key = (collection.full_name, assessment_id)
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl_seconds:
+            self._entries.move_to_end(key)
+            ASSESSMENT_CACHE_REQUESTS.labels(collection.name, "hit").inc()
+            return entry[1]
+
+        ASSESSMENT_CACHE_REQUESTS.labels(collection.name, "miss").inc()
+        document = await collection.find_one({"id": assessment_id}, {"_id": 0})
+        if document is None:
+            self._entries.pop(key, None)
+            return None
+        compiled = compile_assessment(document)
+        self._entries[key] = (time.monotonic(), compiled)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return compiled
+
+    def invalidate(self, collection, assessment_id: str):
+        self._entries.pop((collection.full_name, assessment_id), None)
+
+    def clear(self):
+        self._entries.clear()
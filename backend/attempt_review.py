@@ -0,0 +1,131 @@
+"""
+Attempt Review
+==============
+
+Per-question results for quiz and final test attempts, as shown in the detailed
+attempt views.
+
+Results are computed with the compiled assessment's question index and stored on
+the attempt (questionResults) when it is submitted and whenever it is rescored after
+manual grading, so opening a review reads the attempt and the cached assessment and
+nothing else. Attempts stored before questionResults existed are resolved with one
+$in query over submission_grades.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from assessment_cache import CompiledAssessment, compile_assessment
+from grading_queue import submission_id as derived_submission_id
+
+SUBJECTIVE_TYPES = ('short_answer', 'long_form', 'essay')
+
+
+def normalize_answers(answers: Iterable[Any], questions: List[dict]) -> List[dict]:
+    """Answer dicts with questionIds; /quiz-attempts stores bare answers in question order."""
+    normalized = []
+    for position, answer in enumerate(answers or []):
+        if isinstance(answer, dict):
+            normalized.append(answer)
+        elif position < len(questions):
+            normalized.append({"questionId": questions[position].get("id"), "answer": answer})
+    return normalized
+
+
+def answer_is_correct(question: dict, answer: dict) -> bool:
+    """Correctness before manual grading; answered subjective questions count as correct."""
+    question_type = question['type']
+    if question_type == 'multiple_choice':
+        # Handle both numeric and text-based answers
+        student_answer = answer.get('answer', '')
+        correct_answer = question.get('correctAnswer', '')
+        try:
+            return int(student_answer) == int(correct_answer)
+        except (ValueError, TypeError):
+            return str(student_answer) == str(correct_answer)
+    if question_type == 'true_false':
+        return str(answer.get('answer', '')).lower() == str(question.get('correctAnswer', '')).lower()
+    if question_type == 'select-all-that-apply':
+        return set(answer.get('answer') or []) == set(question.get('correctAnswers') or [])
+    if question_type == 'chronological-order':
+        return answer.get('answer') == question.get('correctOrder')
+    if question_type in SUBJECTIVE_TYPES:
+        student_answer = answer.get('answer', '')
+        return bool(student_answer and str(student_answer).strip())
+    return False
+
+
+def submission_ids(attempt: dict, answers: List[dict], assessment: CompiledAssessment) -> Dict[str, str]:
+    """questionId -> subjective submission id for the attempt's subjective answers.
+
+    Final test submissions have deterministic ids; other answers carry theirs.
+    """
+    ids = {}
+    for answer in answers:
+        question = assessment.question(answer.get('questionId'))
+        if not question or question['type'] not in SUBJECTIVE_TYPES:
+            continue
+        submission_id = answer.get('submissionId')
+        if not submission_id and attempt.get('testId'):
+            submission_id = derived_submission_id("final", attempt['id'], question['id'])
+        if submission_id:
+            ids[question['id']] = submission_id
+    return ids
+
+
+def question_results(answers: List[dict], assessment: CompiledAssessment, grades: Dict[str, dict]) -> List[dict]:
+    """One result per answered question; grades maps questionId -> its submission_grades document."""
+    results = []
+    for answer in answers:
+        question = assessment.question(answer.get('questionId'))
+        if not question:
+            continue
+        result = {"questionId": question['id'], "isCorrect": answer_is_correct(question, answer)}
+        grade = grades.get(question['id'])
+        if grade:
+            # A manual grade overrides the default
+            result["isCorrect"] = grade.get('isCorrect', result["isCorrect"])
+            result["manualScore"] = grade.get('score')
+            result["feedback"] = grade.get('feedback')
+        results.append(result)
+    return results
+
+
+def question_results_at_submit(answers: Iterable[Any], document: dict) -> List[dict]:
+    """Results for a newly submitted attempt, before any manual grading."""
+    assessment = compile_assessment(document)
+    return question_results(normalize_answers(answers, assessment.questions), assessment, {})
+
+
+async def load_manual_grades(grades_collection, ids: Dict[str, str]) -> Dict[str, dict]:
+    """Every manual grade for the given submissions in one query, by questionId."""
+    if not ids:
+        return {}
+    question_by_submission = {submission_id: question_id for question_id, submission_id in ids.items()}
+    grades = {}
+    async for grade in grades_collection.find({"submissionId": {"$in": list(question_by_submission)}}, {"_id": 0}):
+        grades[question_by_submission[grade["submissionId"]]] = grade
+    return grades
+
+
+async def attempt_question_results(
+    attempt: dict, assessment: CompiledAssessment, grades_collection
+) -> List[dict]:
+    """Fresh per-question results for an attempt, including its manual grades."""
+    answers = normalize_answers(attempt.get('answers'), assessment.questions_for(attempt.get('questionIds')))
+    grades = await load_manual_grades(grades_collection, submission_ids(attempt, answers, assessment))
+    return question_results(answers, assessment, grades)
+
+
+async def review_answers(attempt: dict, assessment: CompiledAssessment, grades_collection) -> List[dict]:
+    """The attempt's answers with isCorrect (and any manual score and feedback) merged in."""
+    results: Optional[List[dict]] = attempt.get('questionResults')
+    if results is None:
+        results = await attempt_question_results(attempt, assessment, grades_collection)
+    by_question = {result["questionId"]: result for result in results}
+
+    reviewed = []
+    for answer in normalize_answers(attempt.get('answers'), assessment.questions_for(attempt.get('questionIds'))):
+        result = by_question.get(answer.get('questionId'))
+        if result is not None:
+            reviewed.append({**answer, **{key: value for key, value in result.items() if key != "questionId"}})
+    return reviewed
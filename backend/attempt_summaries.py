@@ -0,0 +1,200 @@
+"""
+Attempt Summaries
+=================
+
+One attempt_summaries document per (studentId, assessmentId) with attemptCount,
+bestScore, lastScore, passed and lastAttemptAt, so attempt checks and completion
+validation are a point read instead of counting or loading attempts.
+
+Submitting reserves the attempt first: a single conditional $inc that only matches
+while attemptCount is below the limit, so concurrent submissions can't exceed it.
+The score is recorded once the attempt is stored, and a regrade recomputes the
+summary from the attempts. Students whose attempts predate the collection get their
+summary built from their attempts the first time it is needed.
+
+assessmentId is the quiz id, the final test id or, for quizzes inside a course,
+the lesson id (kind "course_quiz", with courseId).
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROJECTION = {"_id": 0}
+
+# Conditional updates tried before giving up when the summary keeps being created concurrently
+RESERVE_RETRIES = 3
+
+
+@dataclass
+class Assessment:
+    """Where an assessment's attempts live and what counts as passing."""
+    kind: str  # quiz, final_test or course_quiz
+    assessment_id: str
+    attempts: Any  # the attempts collection
+    attempts_filter: Dict[str, Any]  # this assessment's attempts, for any student
+    passing_score: float
+    extra: Dict[str, Any] = field(default_factory=dict)  # stored on the summary (courseId, ...)
+
+
+def quiz_assessment(attempts, quiz: dict) -> Assessment:
+    return Assessment("quiz", quiz["id"], attempts, {"quizId": quiz["id"]}, quiz.get("passingScore", 70.0))
+
+
+def final_test_assessment(attempts, test: dict) -> Assessment:
+    return Assessment("final_test", test["id"], attempts, {"testId": test["id"]}, test.get("passingScore", 75.0))
+
+
+def course_quiz_assessment(attempts, course_id: str, lesson_id: str, quiz: dict) -> Assessment:
+    return Assessment(
+        "course_quiz", lesson_id, attempts, {"courseId": course_id, "lessonId": lesson_id},
+        (quiz or {}).get("passingScore", 70), extra={"courseId": course_id}
+    )
+
+
+async def ensure_summary_indexes(collection):
+    await collection.create_index([("studentId", 1), ("assessmentId", 1)], unique=True)
+
+
+def summary_key(student_id: str, assessment: Assessment) -> Dict[str, str]:
+    return {"studentId": student_id, "assessmentId": assessment.assessment_id}
+
+
+async def summarize_attempts(student_id: str, assessment: Assessment) -> Dict[str, Any]:
+    """Summary fields computed from the student's stored attempts."""
+    match = {**assessment.attempts_filter, "studentId": student_id, "isActive": True}
+    rows = await assessment.attempts.aggregate([
+        {"$match": match},
+        {"$sort": {"created_at": 1}},
+        {"$group": {
+            "_id": None,
+            "attemptCount": {"$sum": 1},
+            "bestScore": {"$max": "$score"},
+            "lastScore": {"$last": "$score"},
+            "anyPassed": {"$max": "$isPassed"},
+            "lastAttemptAt": {"$max": "$created_at"}
+        }}
+    ]).to_list(1)
+    row = rows[0] if rows else {}
+    best = row.get("bestScore")
+    fields = {
+        "attemptCount": row.get("attemptCount", 0),
+        "bestScore": best,
+        "lastScore": row.get("lastScore"),
+        "passed": bool(row.get("anyPassed")) or (best is not None and best >= assessment.passing_score),
+        "lastAttemptAt": row.get("lastAttemptAt")
+    }
+    # Unknown values stay unset rather than null, so later $max updates compare against nothing
+    return {name: value for name, value in fields.items() if value is not None}
+
+
+async def seed_summary(summaries, student_id: str, assessment: Assessment) -> Dict[str, Any]:
+    """Create the summary from existing attempts unless it already exists; returns it."""
+    fields = await summarize_attempts(student_id, assessment)
+    try:
+        await summaries.update_one(
+            summary_key(student_id, assessment),
+            {"$setOnInsert": {**fields, "kind": assessment.kind, **assessment.extra, "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # Another request seeded it first
+        pass
+    return await summaries.find_one(summary_key(student_id, assessment), SUMMARY_PROJECTION)
+
+
+async def get_summary(summaries, student_id: str, assessment: Assessment) -> Dict[str, Any]:
+    summary = await summaries.find_one(summary_key(student_id, assessment), SUMMARY_PROJECTION)
+    if summary is None:
+        summary = await seed_summary(summaries, student_id, assessment)
+    return summary
+
+
+async def reserve_attempt(
+    summaries, student_id: str, assessment: Assessment, max_attempts: Optional[int]
+) -> Optional[Dict[str, Any]]:
+    """Count a new attempt if the limit allows it; returns the updated summary or None.
+
+    The filter only matches below the limit, so two concurrent submissions for the
+    last remaining attempt can't both get it. max_attempts=None means unlimited.
+    """
+    key = summary_key(student_id, assessment)
+    condition = {**key, "attemptCount": {"$lt": max_attempts}} if max_attempts is not None else key
+    update = {"$inc": {"attemptCount": 1}, "$set": {"lastAttemptAt": datetime.utcnow()}}
+    for _ in range(RESERVE_RETRIES):
+        summary = await summaries.find_one_and_update(condition, update, return_document=ReturnDocument.AFTER)
+        if summary is not None:
+            summary.pop("_id", None)
+            return summary
+        existing = await summaries.find_one(key, {"_id": 0, "attemptCount": 1})
+        if existing is None:
+            await seed_summary(summaries, student_id, assessment)
+        elif max_attempts is not None and existing.get("attemptCount", 0) >= max_attempts:
+            return None
+        # Otherwise the summary was seeded concurrently since the update; try again
+    return None
+
+
+async def release_attempt(summaries, student_id: str, assessment: Assessment):
+    """Give back a reserved attempt that was never stored."""
+    await summaries.update_one(summary_key(student_id, assessment), {"$inc": {"attemptCount": -1}})
+
+
+async def record_attempt_result(
+    summaries, student_id: str, assessment: Assessment, score: float, passed: bool
+) -> Optional[Dict[str, Any]]:
+    """Fold a newly stored attempt's score into the summary; returns the updated summary."""
+    passed = bool(passed) or score >= assessment.passing_score
+    summary = await summaries.find_one_and_update(
+        summary_key(student_id, assessment),
+        {
+            "$max": {"bestScore": score, "passed": passed},
+            "$set": {"lastScore": score, "updated_at": datetime.utcnow()}
+        },
+        return_document=ReturnDocument.AFTER
+    )
+    if summary is not None:
+        summary.pop("_id", None)
+    return summary
+
+
+async def refresh_summary(summaries, student_id: str, assessment: Assessment) -> Dict[str, Any]:
+    """Recompute scores after a regrade (attemptCount keeps counting reservations); returns the summary."""
+    fields = await summarize_attempts(student_id, assessment)
+    attempt_count = fields.pop("attemptCount")
+    summary = await summaries.find_one_and_update(
+        summary_key(student_id, assessment),
+        {
+            "$set": {**fields, "updated_at": datetime.utcnow()},
+            "$setOnInsert": {"attemptCount": attempt_count, "kind": assessment.kind, **assessment.extra}
+        },
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    summary.pop("_id", None)
+    return summary
+
+
+async def passed_assessments(summaries, student_id: str, assessments: Iterable[Assessment]) -> List[str]:
+    """Ids of the given assessments the student has passed, in one query (plus seeding for legacy data)."""
+    by_id = {assessment.assessment_id: assessment for assessment in assessments}
+    found = {
+        summary["assessmentId"]: summary
+        async for summary in summaries.find(
+            {"studentId": student_id, "assessmentId": {"$in": list(by_id)}}, SUMMARY_PROJECTION
+        )
+    }
+    passed = []
+    for assessment_id, assessment in by_id.items():
+        summary = found.get(assessment_id)
+        if summary is None:
+            summary = await seed_summary(summaries, student_id, assessment)
+        if summary and summary.get("passed"):
+            passed.append(assessment_id)
+    return passed
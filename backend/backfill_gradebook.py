@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Fill the gradebook cells (enrollments.lessonGrades) from existing quiz attempts.
+
+New attempts and regrades keep the cells current; this covers attempts made before
+the gradebook existed. Safe to run repeatedly.
+
+    python backfill_gradebook.py                     # every course
+    python backfill_gradebook.py --course COURSE_ID  # one course
+    python backfill_gradebook.py --dry-run           # only count the cells that would be written
+"""
+import argparse
+import asyncio
+import logging
+
+from core import db
+from gradebook import rebuild_course_gradebook
+
+logger = logging.getLogger(__name__)
+
+
+async def backfill(database, course_id: str = None, dry_run: bool = False) -> int:
+    """Rebuild the gradebook of one course, or of every course with quiz attempts."""
+    course_ids = [course_id] if course_id else await database.quiz_attempts.distinct(
+        "courseId", {"courseId": {"$ne": None}, "lessonId": {"$exists": True}}
+    )
+    written = 0
+    for course in course_ids:
+        written += await rebuild_course_gradebook(database, course, dry_run=dry_run)
+    return written
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Backfill gradebook cells on enrollments from quiz attempts")
+    parser.add_argument("--course", help="Only rebuild this course's gradebook")
+    parser.add_argument("--dry-run", action="store_true", help="Count the cells that need writing without writing")
+    args = parser.parse_args()
+
+    written = await backfill(db, course_id=args.course, dry_run=args.dry_run)
+    verb = "would be written" if args.dry_run else "written"
+    logger.info(f"{written} gradebook cells {verb}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Backfill the fields the grading queue reads from subjective_submissions.
+
+Older rows miss questionPoints (and course quiz rows questionText/studentAnswer/studentName),
+and rows from /quiz-submissions/subjective stored submittedAt as an ISO string, which
+breaks the queue's (submittedAt, id) ordering. Safe to run repeatedly.
+
+    python backfill_grading_queue.py            # update in place
+    python backfill_grading_queue.py --dry-run  # only count the rows that would change
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from pymongo import UpdateOne
+
+from core import db
+from routers.grading import load_assessment_questions
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+NEEDS_BACKFILL = {"$or": [
+    {"questionPoints": {"$exists": False}},
+    {"submittedAt": {"$type": "string"}},
+    {"studentAnswer": {"$exists": False}, "answer": {"$exists": True}},
+    {"studentName": {"$exists": False}}
+]}
+
+BACKFILL_PROJECTION = {field: 1 for field in (
+    "testId", "courseId", "lessonId", "questionId", "questionText",
+    "questionPoints", "maxScore", "submittedAt", "studentAnswer", "answer", "studentId", "studentName"
+)}
+
+
+def parse_submitted_at(value: str) -> Optional[datetime]:
+    """ISO string -> naive UTC datetime, as pymongo returns stored dates."""
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+async def student_name(database, student_id: Optional[str], name_cache: Dict[str, Optional[str]]) -> Optional[str]:
+    """Full name of a student, looked up once per backfill run."""
+    if student_id not in name_cache:
+        user = await database.users.find_one({"id": student_id}, {"_id": 0, "full_name": 1}) if student_id else None
+        name_cache[student_id] = (user or {}).get("full_name")
+    return name_cache[student_id]
+
+
+async def backfill_fields(
+    database, doc: dict, question_cache: Dict[tuple, Dict[str, dict]], name_cache: Dict[str, Optional[str]]
+) -> Dict[str, Any]:
+    """The $set that brings one submission up to date (empty when nothing is missing)."""
+    fields = {}
+    if "studentName" not in doc:
+        name = await student_name(database, doc.get("studentId"), name_cache)
+        if name:
+            fields["studentName"] = name
+    if isinstance(doc.get("submittedAt"), str):
+        submitted_at = parse_submitted_at(doc["submittedAt"])
+        if submitted_at is not None:
+            fields["submittedAt"] = submitted_at
+    if "studentAnswer" not in doc and "answer" in doc:
+        fields["studentAnswer"] = doc["answer"]
+
+    if "questionPoints" not in doc or not doc.get("questionText"):
+        key = (doc.get("testId"),) if doc.get("testId") else (None, doc.get("courseId"), doc.get("lessonId"))
+        if key not in question_cache:
+            question_cache[key] = await load_assessment_questions(*key)
+        question = question_cache[key].get(doc.get("questionId"), {})
+        if "questionPoints" not in doc:
+            fields["questionPoints"] = doc["maxScore"] if doc.get("maxScore") is not None else question.get("points", 1)
+        if not doc.get("questionText") and question.get("question"):
+            fields["questionText"] = question["question"]
+    return fields
+
+
+async def backfill(database, dry_run: bool = False) -> int:
+    """Update every submission missing queue fields; returns how many were (or would be) updated."""
+    question_cache: Dict[tuple, Dict[str, dict]] = {}
+    name_cache: Dict[str, Optional[str]] = {}
+    updated = 0
+    batch = []
+    async for doc in database.subjective_submissions.find(NEEDS_BACKFILL, BACKFILL_PROJECTION):
+        fields = await backfill_fields(database, doc, question_cache, name_cache)
+        if not fields:
+            continue
+        updated += 1
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields}))
+        if len(batch) >= BATCH_SIZE:
+            if not dry_run:
+                await database.subjective_submissions.bulk_write(batch, ordered=False)
+            batch = []
+    if batch and not dry_run:
+        await database.subjective_submissions.bulk_write(batch, ordered=False)
+    return updated
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Backfill grading queue fields on subjective submissions")
+    parser.add_argument("--dry-run", action="store_true", help="Count the rows that need updating without writing")
+    args = parser.parse_args()
+
+    updated = await backfill(db, dry_run=args.dry_run)
+    verb = "would be updated" if args.dry_run else "updated"
+    logger.info(f"{updated} subjective submissions {verb}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
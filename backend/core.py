@@ -0,0 +1,165 @@
+"""
+Core
+====
+
+Settings read from the environment, logging, password hashing and the shared
+clients every router module uses: the Motor client and database, the progress
+write-behind buffer, the compiled assessment cache and the optional request profiler.
+
+Nothing heavy is imported here; modules that need ReportLab, pyinstrument and
+the like import them where they are used.
+"""
+
+from fastapi.security import HTTPBearer
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+import os
+import logging
+from pathlib import Path
+from passlib.context import CryptContext
+from write_buffer import CoalescingWriteBuffer
+from assessment_cache import AssessmentCache
+from metrics import PoolMetricsListener
+from query_stats import QueryStatsListener
+from request_profiler import RequestProfiler
+from log_pipeline import configure_logging, parse_sample_rates
+from mongo_pool import pool_options_from_env, analytics_options_from_env, is_atlas_url
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+# Environment configuration
+ENVIRONMENT = os.environ.get('ENVIRONMENT', 'development')
+DEBUG = os.environ.get('DEBUG', 'false').lower() == 'true'
+
+# Progress heartbeat write-behind configuration
+PROGRESS_FLUSH_INTERVAL_SECONDS = float(os.environ.get('PROGRESS_FLUSH_INTERVAL_SECONDS', '5'))
+PROGRESS_BUFFER_MAX_PENDING = int(os.environ.get('PROGRESS_BUFFER_MAX_PENDING', '1000'))
+
+# Per-request Mongo command thresholds for the structured warning log
+QUERY_COUNT_WARN_THRESHOLD = int(os.environ.get('QUERY_COUNT_WARN_THRESHOLD', '50'))
+QUERY_TIME_WARN_MS = float(os.environ.get('QUERY_TIME_WARN_MS', '500'))
+
+# Compiled quizzes and final tests kept in memory; edits elsewhere show up after the TTL
+ASSESSMENT_CACHE_TTL_SECONDS = float(os.environ.get('ASSESSMENT_CACHE_TTL_SECONDS', '60'))
+ASSESSMENT_CACHE_MAX_ENTRIES = int(os.environ.get('ASSESSMENT_CACHE_MAX_ENTRIES', '512'))
+
+# Opt-in request profiler (the middleware is only installed when enabled)
+PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', 'false').lower() == 'true'
+PROFILER_SAMPLE_RATE = float(os.environ.get('PROFILER_SAMPLE_RATE', '0'))
+PROFILER_DIR = os.environ.get('PROFILER_DIR', str(ROOT_DIR / 'profiles'))
+PROFILER_MAX_PROFILES_PER_ROUTE = int(os.environ.get('PROFILER_MAX_PROFILES_PER_ROUTE', '20'))
+# Signs X-Profile-Request headers; unset disables them (never derived from the JWT key)
+PROFILER_SECRET = os.environ.get('PROFILER_SECRET') or None
+
+# Columnar snapshots the admin reports read (see reporting.py)
+REPORTS_DIR = os.environ.get('REPORTS_DIR', str(ROOT_DIR / 'reports'))
+
+# Response compression configuration
+GZIP_MINIMUM_SIZE = int(os.environ.get('GZIP_MINIMUM_SIZE', '1024'))
+GZIP_COMPRESS_LEVEL = int(os.environ.get('GZIP_COMPRESS_LEVEL', '6'))
+
+# JWT Configuration
+JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-here-change-in-production-b7d8f9e2c4a6e8f0d2a4b6c8e0f2a4b6')
+JWT_ALGORITHM = os.environ.get('JWT_ALGORITHM', 'HS256')
+JWT_EXPIRATION_HOURS = int(os.environ.get('JWT_EXPIRATION_HOURS', '24'))
+
+# Logging pipeline: records are formatted and written by a background thread
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text').lower()  # text or json
+LOG_SAMPLE_RATES = parse_sample_rates(os.environ.get('LOG_SAMPLE_RATES', ''))
+LOG_RATE_LIMIT_PER_SECOND = float(os.environ.get('LOG_RATE_LIMIT_PER_SECOND', '10'))
+LOG_RATE_LIMIT_BURST = int(os.environ.get('LOG_RATE_LIMIT_BURST', '50'))
+
+# Configure logging early
+log_level = logging.DEBUG if DEBUG else logging.INFO
+log_listener = configure_logging(
+    log_level,
+    json_output=LOG_FORMAT == 'json',
+    sample_rates=LOG_SAMPLE_RATES,
+    rate_limit_per_second=LOG_RATE_LIMIT_PER_SECOND,
+    rate_limit_burst=LOG_RATE_LIMIT_BURST
+)
+logger = logging.getLogger(__name__)
+
+# Log startup information
+logger.info(f"Starting LMS API in {ENVIRONMENT} mode")
+logger.info(f"Debug mode: {DEBUG}")
+
+# Password hashing setup
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Security setup
+security = HTTPBearer()
+
+# MongoDB connection
+mongo_url = os.environ.get('MONGO_URL')
+if not mongo_url:
+    logger.error("MONGO_URL environment variable is required")
+    raise ValueError("MONGO_URL environment variable must be set")
+
+db_name = os.environ.get('DB_NAME', 'learningfriend_lms')
+
+logger.info(f"Connecting to MongoDB database: {db_name}")
+logger.info(f"MongoDB URL configured: {mongo_url[:50]}..." if len(mongo_url) > 50 else f"MongoDB URL configured: {mongo_url}")
+logger.info(f"Database name: {db_name}")
+
+# Pool size, timeouts and compressors come from MONGO_* variables (see mongo_pool.py);
+# Atlas URLs start from the production defaults
+MONGO_CLIENT_OPTIONS = pool_options_from_env(mongo_url)
+MONGO_MIN_POOL_SIZE = MONGO_CLIENT_OPTIONS.get("minPoolSize", 0)
+
+# In-process keep-alive ping interval; 0 disables it
+MONGO_KEEPALIVE_INTERVAL_SECONDS = float(os.environ.get('MONGO_KEEPALIVE_INTERVAL_SECONDS', '0'))
+
+try:
+    if is_atlas_url(mongo_url):
+        # This is likely an Atlas connection
+        logger.info("Detected Atlas MongoDB connection, using production settings")
+    else:
+        # Local or other MongoDB connection
+        logger.info("Using standard MongoDB connection")
+    logger.info(f"MongoDB client options: {MONGO_CLIENT_OPTIONS}")
+    client = AsyncIOMotorClient(
+        mongo_url,
+        event_listeners=[PoolMetricsListener("primary"), QueryStatsListener()],
+        **MONGO_CLIENT_OPTIONS
+    )
+
+    db = client[db_name]
+    logger.info("MongoDB connection established successfully")
+
+except Exception as e:
+    logger.error(f"Failed to connect to MongoDB: {str(e)}")
+    raise
+
+# Separate client for report reads (own pool, secondaries first, compressed); point
+# ANALYTICS_MONGO_URL at an analytics node or replica set to move the traffic entirely
+ANALYTICS_MONGO_URL = os.environ.get('ANALYTICS_MONGO_URL', mongo_url)
+ANALYTICS_CLIENT_OPTIONS = analytics_options_from_env(ANALYTICS_MONGO_URL)
+logger.info(f"Analytics MongoDB client options: {ANALYTICS_CLIENT_OPTIONS}")
+analytics_client = AsyncIOMotorClient(
+    ANALYTICS_MONGO_URL,
+    event_listeners=[PoolMetricsListener("analytics"), QueryStatsListener()],
+    **ANALYTICS_CLIENT_OPTIONS
+)
+analytics_db = analytics_client[db_name]
+
+# Heartbeat-only enrollment updates are coalesced here and flushed in batches
+progress_write_buffer = CoalescingWriteBuffer(
+    db.enrollments,
+    flush_interval=PROGRESS_FLUSH_INTERVAL_SECONDS,
+    max_pending=PROGRESS_BUFFER_MAX_PENDING
+)
+
+assessment_cache = AssessmentCache(
+    ttl_seconds=ASSESSMENT_CACHE_TTL_SECONDS,
+    max_entries=ASSESSMENT_CACHE_MAX_ENTRIES
+)
+
+# Request profiler; None when disabled so the middleware isn't installed at all
+request_profiler = RequestProfiler(
+    PROFILER_DIR,
+    secret=PROFILER_SECRET,
+    sample_rate=PROFILER_SAMPLE_RATE,
+    max_profiles_per_route=PROFILER_MAX_PROFILES_PER_ROUTE
+) if PROFILER_ENABLED else None
@@ -0,0 +1,249 @@
+"""
+Exports
+=======
+
+Full-history reporting exports streamed as CSV or NDJSON.
+
+Each dataset is one aggregation over its collection: a match on the entity filters
+and a date range, sorted by (date field, id), with the names a report needs joined
+in by $lookup and a projection down to the exported columns. Every exported
+collection has a (date field, id) index, so the sort and date range are an index
+scan, and an (owner field, date field, id) index per owner, so an instructor's
+export only scans their own rows. The other entity filters are applied to the rows
+those scans return.
+Rows are written out a batch at a time as the cursor returns them, so an export
+holds one batch in memory however many rows it has. Responses are compressed in
+stream by the GZip middleware for clients that accept gzip.
+
+Instructors only export rows of the courses and programs they own (instructorId)
+and of the standalone quizzes they created (createdBy).
+"""
+
+import csv
+import io
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rows per cursor batch and per chunk written to the response
+EXPORT_BATCH_SIZE = 1000
+
+FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson"
+}
+
+
+@dataclass(frozen=True)
+class Lookup:
+    """Copy fields of a related document onto each row (e.g. the student's email)."""
+    collection: str
+    local_field: str
+    fields: Dict[str, str]  # exported column -> field of the related document
+    foreign_field: str = "id"
+
+
+@dataclass(frozen=True)
+class Owner:
+    """Rows whose row_field names a document of collection that the instructor owns."""
+    collection: str
+    row_field: str
+    owner_field: str = "instructorId"
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    collection: str
+    date_field: str
+    columns: Tuple[str, ...]
+    # Query parameter -> document field it filters on
+    filters: Dict[str, str] = field(default_factory=dict)
+    base_filter: Dict[str, Any] = field(default_factory=dict)
+    lookups: Tuple[Lookup, ...] = ()
+    # An instructor sees rows whose owner is theirs under any of these
+    owners: Tuple[Owner, ...] = ()
+
+
+COURSE_OWNER = Owner("courses", "courseId")
+PROGRAM_OWNER = Owner("programs", "programId")
+# Standalone quiz attempts have no courseId
+QUIZ_OWNER = Owner("quizzes", "quizId", owner_field="createdBy")
+
+
+STUDENT_EMAIL = Lookup("users", "studentId", {"studentEmail": "email"})
+
+EXPORTS: Dict[str, ExportSpec] = {
+    "quiz-attempts": ExportSpec(
+        collection="quiz_attempts",
+        date_field="created_at",
+        columns=(
+            "id", "studentId", "studentName", "studentEmail", "quizId", "quizTitle", "courseId", "lessonId",
+            "score", "pointsEarned", "totalPoints", "isPassed", "attemptNumber", "completedAt", "created_at"
+        ),
+        filters={"studentId": "studentId", "quizId": "quizId", "courseId": "courseId", "lessonId": "lessonId"},
+        base_filter={"isActive": True},
+        lookups=(STUDENT_EMAIL,),
+        owners=(COURSE_OWNER, QUIZ_OWNER)
+    ),
+    "final-test-attempts": ExportSpec(
+        collection="final_test_attempts",
+        date_field="created_at",
+        columns=(
+            "id", "studentId", "studentName", "studentEmail", "testId", "testTitle", "programId", "programName",
+            "score", "pointsEarned", "totalPoints", "isPassed", "attemptNumber", "timeSpent", "completedAt", "created_at"
+        ),
+        filters={"studentId": "studentId", "testId": "testId", "programId": "programId"},
+        base_filter={"isActive": True},
+        lookups=(STUDENT_EMAIL,),
+        owners=(PROGRAM_OWNER,)
+    ),
+    "enrollments": ExportSpec(
+        collection="enrollments",
+        date_field="enrolledAt",
+        columns=(
+            "id", "userId", "studentName", "studentEmail", "courseId", "courseTitle", "progress", "status",
+            "enrolledAt", "completedAt"
+        ),
+        filters={"studentId": "userId", "courseId": "courseId", "status": "status"},
+        lookups=(
+            Lookup("users", "userId", {"studentEmail": "email"}),
+            Lookup("courses", "courseId", {"courseTitle": "title"})
+        ),
+        owners=(COURSE_OWNER,)
+    ),
+    "submissions": ExportSpec(
+        collection="subjective_submissions",
+        date_field="submittedAt",
+        columns=(
+            "id", "studentId", "studentName", "studentEmail", "courseId", "lessonId", "testId", "programId",
+            "attemptId", "questionId", "questionType", "questionPoints", "status", "score", "gradedByName",
+            "submittedAt", "gradedAt"
+        ),
+        filters={
+            "studentId": "studentId", "courseId": "courseId", "lessonId": "lessonId", "testId": "testId",
+            "programId": "programId", "status": "status"
+        },
+        base_filter={"isActive": True},
+        lookups=(STUDENT_EMAIL,),
+        owners=(COURSE_OWNER, PROGRAM_OWNER)
+    ),
+    "certificates": ExportSpec(
+        collection="certificates",
+        date_field="issueDate",
+        columns=(
+            "id", "certificateNumber", "studentId", "studentName", "studentEmail", "type", "courseId", "courseName",
+            "programId", "programName", "status", "issuedByName", "issueDate", "completionDate"
+        ),
+        filters={"studentId": "studentId", "courseId": "courseId", "programId": "programId", "status": "status"},
+        base_filter={"isActive": True},
+        owners=(COURSE_OWNER, PROGRAM_OWNER)
+    )
+}
+
+
+async def ensure_export_indexes(database):
+    """(date field, id) and (owner field, date field, id) per exported collection, so exports are index scans in export order."""
+    for spec in EXPORTS.values():
+        await database[spec.collection].create_index([(spec.date_field, 1), ("id", 1)])
+        for owner in spec.owners:
+            await database[spec.collection].create_index([(owner.row_field, 1), (spec.date_field, 1), ("id", 1)])
+
+
+def export_match(
+    spec: ExportSpec,
+    filters: Dict[str, Any],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """The $match for an export; filters are keyed by query parameter, None means "any"."""
+    match = dict(spec.base_filter)
+    for name, value in filters.items():
+        if value is not None:
+            match[spec.filters[name]] = value
+    date_range = {}
+    if start is not None:
+        date_range["$gte"] = start
+    if end is not None:
+        date_range["$lt"] = end
+    if date_range:
+        match[spec.date_field] = date_range
+    return match
+
+
+async def instructor_match(database, spec: ExportSpec, instructor_id: str) -> Dict[str, Any]:
+    """The rows of an export an instructor may see: those of the courses, programs and quizzes they own."""
+    clauses = []
+    for owner in spec.owners:
+        owned = await database[owner.collection].find({owner.owner_field: instructor_id}, {"_id": 0, "id": 1}).to_list(None)
+        clauses.append({owner.row_field: {"$in": [document["id"] for document in owned]}})
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+
+def export_pipeline(spec: ExportSpec, match: Dict[str, Any]) -> List[Dict[str, Any]]:
+    pipeline: List[Dict[str, Any]] = [
+        {"$match": match},
+        {"$sort": {spec.date_field: 1, "id": 1}}
+    ]
+    for index, lookup in enumerate(spec.lookups):
+        joined = f"_joined{index}"
+        pipeline += [
+            {"$lookup": {
+                "from": lookup.collection,
+                "localField": lookup.local_field,
+                "foreignField": lookup.foreign_field,
+                "as": joined
+            }},
+            {"$set": {column: {"$first": f"${joined}.{source}"} for column, source in lookup.fields.items()}}
+        ]
+    pipeline.append({"$project": {"_id": 0, **{column: 1 for column in spec.columns}}})
+    return pipeline
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=_json_default)
+    return value
+
+
+def format_rows(rows: List[dict], columns: Tuple[str, ...], export_format: str) -> bytes:
+    if export_format == "ndjson":
+        return "".join(json.dumps(row, default=_json_default) + "\n" for row in rows).encode()
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerows([_csv_value(row.get(column)) for column in columns] for row in rows)
+    return output.getvalue().encode()
+
+
+async def stream_export(database, spec: ExportSpec, match: Dict[str, Any], export_format: str) -> AsyncIterator[bytes]:
+    """The export as chunks of EXPORT_BATCH_SIZE rows (a CSV starts with its header row)."""
+    if export_format == "csv":
+        yield format_rows([dict(zip(spec.columns, spec.columns))], spec.columns, "csv")
+
+    cursor = database[spec.collection].aggregate(
+        export_pipeline(spec, match), allowDiskUse=True, batchSize=EXPORT_BATCH_SIZE
+    )
+    batch, exported = [], 0
+    async for row in cursor:
+        batch.append(row)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            exported += len(batch)
+            yield format_rows(batch, spec.columns, export_format)
+            batch = []
+    if batch:
+        exported += len(batch)
+        yield format_rows(batch, spec.columns, export_format)
+    logger.info(f"Exported {exported} rows from {spec.collection}")
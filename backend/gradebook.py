@@ -0,0 +1,173 @@
+"""
+Gradebook
+=========
+
+The gradebook is kept on the enrollments themselves: an enrollment is already the
+(course, student) row with progress, status and completion date, so each one also
+carries lessonGrades, the student's best score, last score, pass flag and attempt
+count per quiz lesson. Quiz submits and regrades update the cell from the student's
+attempt summary, and progress updates land on the same document.
+
+A course gradebook is one indexed read of its enrollments; a classroom gradebook
+reads the enrollments of its courses restricted to its students.
+"""
+
+import csv
+import io
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+# Course outline fields the gradebook columns need
+GRADEBOOK_COURSE_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "title": 1,
+    "modules.id": 1,
+    "modules.title": 1,
+    "modules.lessons.id": 1,
+    "modules.lessons.title": 1,
+    "modules.lessons.type": 1
+}
+
+GRADEBOOK_ROW_PROJECTION = {
+    "_id": 0,
+    "userId": 1,
+    "courseId": 1,
+    "studentName": 1,
+    "progress": 1,
+    "status": 1,
+    "enrolledAt": 1,
+    "completedAt": 1,
+    "lessonGrades": 1
+}
+
+GRADEBOOK_SORT = [("courseId", 1), ("studentName", 1)]
+
+EMPTY_GRADE = {"bestScore": None, "lastScore": None, "passed": False, "attempts": 0, "lastAttemptAt": None}
+
+
+async def ensure_gradebook_indexes(enrollments):
+    await enrollments.create_index(GRADEBOOK_SORT)
+
+
+def gradebook_columns(course: dict) -> List[dict]:
+    """One column per quiz lesson, in course order."""
+    return [
+        {
+            "courseId": course["id"],
+            "lessonId": lesson.get("id"),
+            "moduleId": module.get("id"),
+            "title": lesson.get("title")
+        }
+        for module in course.get("modules", [])
+        for lesson in module.get("lessons", [])
+        if lesson.get("type") == "quiz"
+    ]
+
+
+def lesson_grade(summary: Dict[str, Any]) -> Dict[str, Any]:
+    """A gradebook cell from a course quiz attempt summary."""
+    return {
+        "bestScore": summary.get("bestScore"),
+        "lastScore": summary.get("lastScore"),
+        "passed": bool(summary.get("passed")),
+        "attempts": summary.get("attemptCount", 0),
+        "lastAttemptAt": summary.get("lastAttemptAt")
+    }
+
+
+async def record_lesson_grade(enrollments, student_id: str, course_id: str, lesson_id: str, summary: Optional[dict]):
+    """Update the student's gradebook cell for a quiz lesson."""
+    if not summary:
+        return
+    await enrollments.update_one(
+        {"userId": student_id, "courseId": course_id},
+        {"$set": {f"lessonGrades.{lesson_id}": lesson_grade(summary)}}
+    )
+
+
+async def fetch_gradebook_rows(enrollments, query: Dict[str, Any]) -> List[dict]:
+    return await enrollments.find(query, GRADEBOOK_ROW_PROJECTION).sort(GRADEBOOK_SORT).to_list(None)
+
+
+def gradebook_row(enrollment: dict, columns: Iterable[dict]) -> Dict[str, Any]:
+    """An enrollment as a gradebook row, with a cell for every column of its course."""
+    grades = enrollment.get("lessonGrades") or {}
+    return {
+        "studentId": enrollment.get("userId"),
+        "studentName": enrollment.get("studentName"),
+        "courseId": enrollment.get("courseId"),
+        "progress": enrollment.get("progress", 0.0),
+        "status": enrollment.get("status"),
+        "enrolledAt": enrollment.get("enrolledAt"),
+        "completedAt": enrollment.get("completedAt"),
+        "lessons": {
+            column["lessonId"]: grades.get(column["lessonId"], EMPTY_GRADE)
+            for column in columns
+            if column["courseId"] == enrollment.get("courseId")
+        }
+    }
+
+
+def gradebook_csv(columns: List[dict], rows: List[dict], course_titles: Dict[str, str]) -> str:
+    """Rows as CSV: student fields, then best score, pass flag and attempts per quiz lesson."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    header = ["Course", "Student", "Progress", "Status", "Completed At"]
+    for column in columns:
+        title = column["title"] or column["lessonId"]
+        header += [f"{title} best score", f"{title} passed", f"{title} attempts"]
+    writer.writerow(header)
+
+    for row in rows:
+        line = [
+            course_titles.get(row["courseId"], row["courseId"]), row["studentName"], row["progress"], row["status"],
+            row["completedAt"].isoformat() if row["completedAt"] else ""
+        ]
+        for column in columns:
+            grade = row["lessons"].get(column["lessonId"])
+            if grade is None:
+                line += ["", "", ""]
+            else:
+                best = grade["bestScore"]
+                line += ["" if best is None else best, "yes" if grade["passed"] else "no", grade["attempts"]]
+        writer.writerow(line)
+    return output.getvalue()
+
+
+async def rebuild_course_gradebook(database, course_id: str, dry_run: bool = False) -> int:
+    """Recompute every quiz cell of a course from its attempts; returns the cells (to be) written."""
+    rows = database.quiz_attempts.aggregate([
+        {"$match": {"courseId": course_id, "lessonId": {"$exists": True}, "isActive": True}},
+        {"$sort": {"created_at": 1}},
+        {"$group": {
+            "_id": {"studentId": "$studentId", "lessonId": "$lessonId"},
+            "bestScore": {"$max": "$score"},
+            "lastScore": {"$last": "$score"},
+            "passed": {"$max": "$isPassed"},
+            "attemptCount": {"$sum": 1},
+            "lastAttemptAt": {"$max": "$created_at"}
+        }}
+    ])
+    written = 0
+    batch = []
+    async for row in rows:
+        key = row.pop("_id")
+        written += 1
+        batch.append(UpdateOne(
+            {"userId": key["studentId"], "courseId": course_id},
+            {"$set": {f"lessonGrades.{key['lessonId']}": lesson_grade(row)}}
+        ))
+        if len(batch) >= BATCH_SIZE:
+            if not dry_run:
+                await database.enrollments.bulk_write(batch, ordered=False)
+            batch = []
+    if batch and not dry_run:
+        await database.enrollments.bulk_write(batch, ordered=False)
+    return written
@@ -0,0 +1,168 @@
+"""
+Grading Queue
+=============
+
+Writes and keyset-paginated reads over subjective_submissions for the Grading Center.
+
+Submissions carry everything a grader needs (question text, points, student name and
+answer) from the moment they are stored, so a page of the queue is one indexed find
+ordered by (submittedAt, id) and the status counts are one aggregation over the same
+filter. The cursor is the (submittedAt, id) of the last row of the previous page, so
+later pages cost the same as the first and rows graded in between don't shift the pages.
+
+An attempt's submissions are written with one insert_many. Their ids are derived from
+the attempt and question and double as _id, so writing the same attempt's submissions
+again can't store a question twice. That only makes a resent request a no-op when the
+client names the attempt: course quiz and final test submits create a new attempt (and
+attempt id) per request, while /quiz-submissions/subjective takes the attemptId the
+quiz page generates when the quiz starts. That id is client-supplied, so it is combined
+with the student's id: another learner reusing it writes their own submissions rather
+than colliding with (or pre-empting) the first learner's.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo.errors import BulkWriteError
+
+QUEUE_SORT = [("submittedAt", 1), ("id", 1)]
+
+# One index per filter the queue supports, each ending in the sort keys
+QUEUE_INDEXES = [
+    [("status", 1), ("submittedAt", 1), ("id", 1)],
+    [("courseId", 1), ("status", 1), ("submittedAt", 1), ("id", 1)],
+    [("programId", 1), ("status", 1), ("submittedAt", 1), ("id", 1)],
+    [("testId", 1), ("status", 1), ("submittedAt", 1), ("id", 1)],
+    [("gradedBy", 1), ("status", 1), ("submittedAt", 1), ("id", 1)],
+    [("id", 1)]
+]
+
+QUEUE_PROJECTION = {"_id": 0}
+
+STATUSES = ("pending", "graded", "needs_review")
+
+
+DUPLICATE_KEY = 11000
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+async def ensure_queue_indexes(collection):
+    for keys in QUEUE_INDEXES:
+        await collection.create_index(keys)
+
+
+def submission_id(source: str, attempt_id: str, question_id: str) -> str:
+    """Deterministic id of the submission for one question of an attempt ("final" or "quiz" source)."""
+    return f"{source}-{attempt_id}-{question_id}"
+
+
+async def insert_submissions(collection, submissions: List[dict]) -> int:
+    """Store submissions in one insert_many; returns how many were new.
+
+    Each row's id is used as its _id, so rows already stored for the same attempt are
+    skipped rather than duplicated.
+    """
+    if not submissions:
+        return 0
+    try:
+        result = await collection.insert_many([{"_id": doc["id"], **doc} for doc in submissions], ordered=False)
+        return len(result.inserted_ids)
+    except BulkWriteError as e:
+        if any(error.get("code") != DUPLICATE_KEY for error in e.details.get("writeErrors", [])):
+            raise
+        return e.details.get("nInserted", 0)
+
+
+def queue_filter(
+    status: Optional[str] = None,
+    course_id: Optional[str] = None,
+    program_id: Optional[str] = None,
+    test_id: Optional[str] = None,
+    graded_by: Optional[str] = None
+) -> Dict[str, Any]:
+    """Mongo filter for the queue; None means "any".
+
+    Rows stored without a status are pending (as status_counts and queue_item treat
+    them), so the pending filter matches a missing or null status too.
+    """
+    fields = {
+        "status": {"$in": ["pending", None]} if status == "pending" else status,
+        "courseId": course_id,
+        "programId": program_id,
+        "testId": test_id,
+        "gradedBy": graded_by
+    }
+    return {field: value for field, value in fields.items() if value is not None}
+
+
+def encode_cursor(doc: dict) -> str:
+    submitted_at = doc["submittedAt"]
+    if isinstance(submitted_at, datetime):
+        submitted_at = submitted_at.isoformat()
+    raw = json.dumps([submitted_at, doc["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        submitted_at, submission_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(submitted_at), str(submission_id)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+
+
+def after_cursor(query: Dict[str, Any], cursor: Optional[str]) -> Dict[str, Any]:
+    """Restrict query to rows that sort after the cursor."""
+    if not cursor:
+        return query
+    submitted_at, submission_id = decode_cursor(cursor)
+    return {"$and": [query, {"$or": [
+        {"submittedAt": {"$gt": submitted_at}},
+        {"submittedAt": submitted_at, "id": {"$gt": submission_id}}
+    ]}]}
+
+
+async def fetch_queue_page(
+    collection, query: Dict[str, Any], limit: int, cursor: Optional[str] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """One page of submissions and the cursor of the next page (None on the last page)."""
+    docs = await collection.find(after_cursor(query, cursor), QUEUE_PROJECTION).sort(QUEUE_SORT).to_list(limit + 1)
+    if len(docs) <= limit:
+        return docs, None
+    docs = docs[:limit]
+    return docs, encode_cursor(docs[-1])
+
+
+async def status_counts(collection, query: Dict[str, Any]) -> Dict[str, int]:
+    """Submissions per status for query (any status filter in it is ignored), plus the total."""
+    match = {field: value for field, value in query.items() if field != "status"}
+    counts = dict.fromkeys(STATUSES, 0)
+    async for row in collection.aggregate([
+        {"$match": match},
+        {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+    ]):
+        status = row["_id"] or "pending"
+        counts[status] = counts.get(status, 0) + row["count"]
+    counts["total"] = sum(counts.values())
+    return counts
+
+
+def queue_item(doc: dict) -> dict:
+    """API shape of a stored submission.
+
+    Rows stored before questionPoints was recorded fall back to maxScore (course
+    quizzes) and then to one point; course quiz rows kept the answer under "answer".
+    """
+    item = dict(doc)
+    item.setdefault("studentName", "Unknown Student")
+    item["studentAnswer"] = doc.get("studentAnswer", doc.get("answer"))
+    item["questionPoints"] = doc.get("questionPoints", doc.get("maxScore", 1))
+    item["status"] = doc.get("status") or "pending"
+    item["source"] = "final_test" if doc.get("testId") else "quiz"
+    return item
@@ -0,0 +1,291 @@
+"""
+Item Analysis
+=============
+
+Per-question statistics for quizzes, course quizzes and final tests: difficulty
+(p-value), corrected point-biserial discrimination, multiple-choice option
+frequencies, and KR-20 reliability per assessment.
+
+Each assessment has one item_statistics document of running sums, keyed like its
+attempt summaries (kind, assessmentId). Every statistic can be derived from:
+
+    n, sumTotal, sumTotalSq          over attempts, T = sum of item scores
+    items.<qid>.n, sum, sumSq,       over the attempts given the question, x = item score,
+      sumCross, sumTotal, sumTotalSq   sumCross = sum(x * T)
+    items.<qid>.options              multiple-choice selections per option
+
+Sums over the attempts given each question keep discrimination exact when attempts
+draw their questions from a pool.
+
+An item score is the fraction of the question's credit earned (0/1 for auto-graded
+questions). A submitted attempt adds its scores with one $inc; a regrade applies the
+difference between the attempt's old and new scores (kept on the attempt as
+itemScores), so nothing is recomputed from the attempts. The first time an
+assessment is analysed its sums are built from its stored attempts with NumPy
+(imported on first use, like the analysis itself).
+"""
+
+import logging
+import math
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne
+
+from assessment_cache import compile_assessment
+from attempt_review import normalize_answers, question_results
+from attempt_summaries import Assessment
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+ATTEMPT_PROJECTION = {"_id": 0, "id": 1, "answers": 1, "questionIds": 1, "questionResults": 1, "itemScores": 1}
+
+# Flag thresholds, as commonly used for classroom tests
+EASY_P_VALUE = 0.9
+HARD_P_VALUE = 0.2
+LOW_DISCRIMINATION = 0.2
+
+
+async def ensure_item_statistics_indexes(collection):
+    await collection.create_index([("kind", 1), ("assessmentId", 1)], unique=True)
+
+
+def statistics_key(assessment: Assessment) -> Dict[str, str]:
+    return {"kind": assessment.kind, "assessmentId": assessment.assessment_id}
+
+
+def item_scores(questions: List[dict], results: Iterable[dict]) -> Dict[str, float]:
+    """questionId -> fraction of the question's credit earned; unanswered questions score 0."""
+    by_question = {result.get("questionId"): result for result in results or []}
+    scores = {}
+    for question in questions:
+        result = by_question.get(question.get("id")) or {}
+        manual_score = result.get("manualScore")
+        if manual_score is not None:
+            points = question.get("points", 1) or 1
+            scores[question["id"]] = min(1.0, max(0.0, manual_score / points))
+        else:
+            scores[question["id"]] = 1.0 if result.get("isCorrect") else 0.0
+    return scores
+
+
+def selected_options(questions: List[dict], answers: Iterable[Any]) -> Dict[str, int]:
+    """questionId -> chosen option index for the multiple-choice questions answered."""
+    by_question = {answer.get("questionId"): answer.get("answer") for answer in normalize_answers(answers, questions)}
+    selected = {}
+    for question in questions:
+        if question.get("type") != "multiple_choice":
+            continue
+        answer = by_question.get(question.get("id"))
+        if answer is not None and str(answer).isdigit():
+            selected[question["id"]] = int(answer)
+    return selected
+
+
+def attempt_increments(scores: Dict[str, float], options: Dict[str, int], sign: int = 1) -> Dict[str, float]:
+    """The $inc adding (or with sign=-1, removing) one attempt's contribution."""
+    total = sum(scores.values())
+    increments = {"n": sign, "sumTotal": sign * total, "sumTotalSq": sign * total * total}
+    for question_id, score in scores.items():
+        increments[f"items.{question_id}.n"] = sign
+        increments[f"items.{question_id}.sum"] = sign * score
+        increments[f"items.{question_id}.sumSq"] = sign * score * score
+        increments[f"items.{question_id}.sumCross"] = sign * score * total
+        increments[f"items.{question_id}.sumTotal"] = sign * total
+        increments[f"items.{question_id}.sumTotalSq"] = sign * total * total
+    for question_id, option in options.items():
+        increments[f"items.{question_id}.options.{option}"] = sign
+    return increments
+
+
+async def add_attempt(statistics, assessment: Assessment, scores: Dict[str, float], options: Dict[str, int]):
+    """Fold a newly stored attempt into the running sums.
+
+    Nothing is written until the sums have been built (on first analysis), which
+    then includes this attempt.
+    """
+    await statistics.update_one(statistics_key(assessment), {"$inc": attempt_increments(scores, options)})
+
+
+async def apply_regrade(statistics, assessment: Assessment, old_scores: Optional[Dict[str, float]], new_scores: Dict[str, float]):
+    """Replace an attempt's old item scores with its regraded ones in the running sums."""
+    if old_scores is None or old_scores == new_scores:
+        # Attempts without itemScores were never added to the sums
+        return
+    removed = attempt_increments(old_scores, {}, sign=-1)
+    added = attempt_increments(new_scores, {})
+    increments = {field: removed.get(field, 0) + added.get(field, 0) for field in {**removed, **added}}
+    increments = {field: value for field, value in increments.items() if value}
+    if increments:
+        await statistics.update_one(statistics_key(assessment), {"$inc": increments})
+
+
+async def rebuild_statistics(statistics, assessment: Assessment, questions: List[dict]) -> Dict[str, Any]:
+    """Build the running sums from every stored attempt; returns the statistics document.
+
+    Attempts missing itemScores get them stored, so later regrades can be applied
+    as differences. Attempts submitted while this runs may be missed; rebuilding
+    again picks them up.
+    """
+    import numpy as np
+
+    compiled = compile_assessment({"id": assessment.assessment_id, "questions": questions})
+    question_ids = [question["id"] for question in questions]
+    column = {question_id: index for index, question_id in enumerate(question_ids)}
+
+    # One row per attempt: item scores, and which questions the attempt was given
+    rows: List[List[float]] = []
+    given: List[List[bool]] = []
+    option_counts: Dict[str, Dict[str, int]] = {}
+    backfill = []
+    cursor = assessment.attempts.find({**assessment.attempts_filter, "isActive": True}, ATTEMPT_PROJECTION)
+    async for attempt in cursor:
+        attempt_questions = compiled.questions_for(attempt.get("questionIds"))
+        scores = attempt.get("itemScores")
+        if scores is None:
+            results = attempt.get("questionResults")
+            if results is None:
+                results = question_results(normalize_answers(attempt.get("answers"), attempt_questions), compiled, {})
+            scores = item_scores(attempt_questions, results)
+            if attempt.get("id"):
+                backfill.append(UpdateOne({"id": attempt["id"]}, {"$set": {"itemScores": scores}}))
+        row, mask = [0.0] * len(question_ids), [False] * len(question_ids)
+        for question_id, score in scores.items():
+            if question_id in column:
+                row[column[question_id]] = score
+                mask[column[question_id]] = True
+        rows.append(row)
+        given.append(mask)
+        for question_id, option in selected_options(attempt_questions, attempt.get("answers")).items():
+            counts = option_counts.setdefault(question_id, {})
+            counts[str(option)] = counts.get(str(option), 0) + 1
+
+    shape = (len(rows), len(question_ids))
+    scores_matrix = np.array(rows, dtype=float).reshape(shape)
+    given_matrix = np.array(given, dtype=float).reshape(shape)
+    totals = scores_matrix.sum(axis=1)
+    counts = given_matrix.sum(axis=0)
+    sums = scores_matrix.sum(axis=0)
+    squares = (scores_matrix ** 2).sum(axis=0)
+    cross = scores_matrix.T @ totals
+    item_totals = given_matrix.T @ totals
+    item_total_squares = given_matrix.T @ totals ** 2
+    document = {
+        **statistics_key(assessment),
+        "n": len(rows),
+        "sumTotal": float(totals.sum()),
+        "sumTotalSq": float((totals ** 2).sum()),
+        "items": {
+            question_id: {
+                "n": int(counts[index]),
+                "sum": float(sums[index]),
+                "sumSq": float(squares[index]),
+                "sumCross": float(cross[index]),
+                "sumTotal": float(item_totals[index]),
+                "sumTotalSq": float(item_total_squares[index]),
+                "options": option_counts.get(question_id, {})
+            }
+            for question_id, index in column.items()
+        }
+    }
+    await statistics.replace_one(statistics_key(assessment), document, upsert=True)
+    for start in range(0, len(backfill), BATCH_SIZE):
+        await assessment.attempts.bulk_write(backfill[start:start + BATCH_SIZE], ordered=False)
+    logger.info(f"Rebuilt item statistics for {assessment.kind} {assessment.assessment_id} from {len(rows)} attempts")
+    return document
+
+
+def _number(value) -> Optional[float]:
+    return None if value is None or not math.isfinite(value) else round(float(value), 4)
+
+
+def item_analysis(document: Dict[str, Any], questions: List[dict]) -> Dict[str, Any]:
+    """Difficulty, discrimination, option frequencies and KR-20 from the running sums."""
+    import numpy as np
+
+    n = document.get("n", 0)
+    items = document.get("items", {})
+    question_ids = [question["id"] for question in questions]
+
+    def column(name):
+        return np.array([items.get(question_id, {}).get(name, 0) for question_id in question_ids], dtype=float)
+
+    counts, sums, squares, cross = column("n"), column("sum"), column("sumSq"), column("sumCross")
+    item_totals, item_total_squares = column("sumTotal"), column("sumTotalSq")
+    total_sum, total_squares = document.get("sumTotal", 0.0), document.get("sumTotalSq", 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p_values = sums / counts
+        item_variance = np.clip(squares / counts - p_values ** 2, 0, None)
+        # Correlate each item with the rest of the attempt (total minus the item), over the attempts given it
+        rest_mean = (item_totals - sums) / counts
+        rest_variance = np.clip((item_total_squares - 2 * cross + squares) / counts - rest_mean ** 2, 0, None)
+        covariance = (cross - squares) / counts - p_values * rest_mean
+        discrimination = covariance / np.sqrt(item_variance * rest_variance)
+        total_variance = total_squares / n - (total_sum / n) ** 2 if n else 0.0
+
+    # KR-20 needs items every attempt was given (not the case with pools or questions added
+    # later). The stored total variance is over every item in the totals, so it only matches
+    # the item variances when all of those items are complete and still on the assessment.
+    complete = (counts == n) & (counts > 0)
+    k = int(complete.sum())
+    scored = [item.get("n", 0) for item in items.values() if item.get("n", 0) > 0]
+    totals_from_complete = len(scored) == k and all(count == n for count in scored)
+    kr20 = None
+    if k > 1 and totals_from_complete and total_variance > 0:
+        kr20 = k / (k - 1) * (1 - item_variance[complete].sum() / total_variance)
+
+    results = []
+    for index, question in enumerate(questions):
+        p_value, item_discrimination = _number(p_values[index]), _number(discrimination[index])
+        flags = []
+        if p_value is not None and p_value >= EASY_P_VALUE:
+            flags.append("too_easy")
+        if p_value is not None and p_value <= HARD_P_VALUE:
+            flags.append("too_hard")
+        if item_discrimination is not None and item_discrimination < 0:
+            flags.append("negative_discrimination")
+        elif item_discrimination is not None and item_discrimination < LOW_DISCRIMINATION:
+            flags.append("low_discrimination")
+
+        result = {
+            "questionId": question["id"],
+            "question": question.get("question"),
+            "type": question.get("type"),
+            "responses": int(counts[index]),
+            "pValue": p_value,
+            "discrimination": item_discrimination,
+            "flags": flags
+        }
+        if question.get("type") == "multiple_choice":
+            option_counts = items.get(question["id"], {}).get("options", {})
+            answered = sum(option_counts.values())
+            result["options"] = [
+                {
+                    "index": option_index,
+                    "text": text,
+                    "isCorrect": str(option_index) == str(question.get("correctAnswer")),
+                    "count": option_counts.get(str(option_index), 0),
+                    "frequency": round(option_counts.get(str(option_index), 0) / answered, 4) if answered else None
+                }
+                for option_index, text in enumerate(question.get("options") or [])
+            ]
+        results.append(result)
+
+    return {
+        "assessmentId": document.get("assessmentId"),
+        "kind": document.get("kind"),
+        "attempts": n,
+        "kr20": _number(kr20),
+        "reliabilityItems": k,
+        "questions": results
+    }
+
+
+async def analyse(statistics, assessment: Assessment, questions: List[dict], rebuild: bool = False) -> Dict[str, Any]:
+    """Item analysis for an assessment, building its running sums first when they don't exist yet."""
+    document = None if rebuild else await statistics.find_one(statistics_key(assessment), {"_id": 0})
+    if document is None:
+        document = await rebuild_statistics(statistics, assessment, questions)
+    return item_analysis(document, questions)
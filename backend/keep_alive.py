@@ -3,6 +3,9 @@
 Database Keep-Alive Service
 Pings MongoDB Atlas every 30 minutes to prevent auto-pause on Free Tier.
 Run this as a background service to keep your cluster active.
+
+The API can do the same in-process: set MONGO_KEEPALIVE_INTERVAL_SECONDS=1800
+instead of running this script next to it.
 """
 import asyncio
 import os
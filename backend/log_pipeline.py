@@ -0,0 +1,214 @@
+"""
+Log Pipeline
+============
+
+Non-blocking logging for the API. The root handler only enqueues records; a
+QueueListener thread formats them (plain text or JSON lines) and writes them to
+stderr, so log I/O never runs on the event loop.
+
+Before a record is queued it passes per-logger sampling (records below WARNING
+from the configured logger prefixes) and a per-call-site rate limit (records
+below WARNING, except the access log). Dropped
+records cost almost nothing and are counted in log_records_dropped_total. When a
+rate-limited call site gets through again, its record says how many were suppressed.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from prometheus_client import Counter
+
+from query_stats import current_query_stats
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# uvicorn writes its own (and access) logs synchronously; these are moved onto the queue
+ROUTED_LOGGERS = ("uvicorn", "uvicorn.access")
+
+# Attributes every LogRecord has; anything else came in through extra= and goes into the JSON line
+RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped_total",
+    "Log records dropped before output, by reason",
+    ["reason"]
+)
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """Parse "routers.quizzes=0.1,uvicorn.access=0.01" into {logger prefix: keep rate}."""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, rate = item.partition("=")
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of the records below WARNING from the configured loggers.
+
+    The longest matching prefix decides; loggers that match nothing keep everything.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+        self._rate_by_logger: Dict[str, float] = {}
+
+    def rate_for(self, name: str) -> float:
+        rate = self._rate_by_logger.get(name)
+        if rate is None:
+            rate = next(
+                (prefix_rate for prefix, prefix_rate in self.rates if name == prefix or name.startswith(prefix + ".")),
+                1.0
+            )
+            self._rate_by_logger[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record.name)
+        if rate >= 1.0 or random.random() < rate:
+            return True
+        LOG_RECORDS_DROPPED.labels("sampled").inc()
+        return False
+
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per call site (logger, file and line) for records below WARNING.
+
+    The access log is exempt: every request logs from the same call site.
+    """
+
+    EXEMPT_LOGGERS = ("uvicorn.access",)
+
+    def __init__(self, per_second: float, burst: int):
+        super().__init__()
+        self.per_second = per_second
+        self.burst = burst
+        # call site -> [tokens, last refill, suppressed since last record let through]
+        self._buckets: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or record.name in self.EXEMPT_LOGGERS:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            tokens = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.per_second)
+            bucket[1] = now
+            if tokens < 1.0:
+                bucket[0] = tokens
+                bucket[2] += 1
+                LOG_RECORDS_DROPPED.labels("rate_limited").inc()
+                return False
+            bucket[0] = tokens - 1.0
+            suppressed, bucket[2] = bucket[2], 0
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp the current request id; the listener thread can't see the request's context."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        stats = current_query_stats.get()
+        record.request_id = stats.request_id if stats else None
+        return True
+
+
+class BackgroundQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread.
+
+    The stock prepare() formats on the calling thread so records can be pickled for
+    multiprocessing queues. This queue is in-process, so only the message arguments are
+    merged here (they may be mutated once the call returns); tracebacks are rendered later.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        return f"{text} [{suppressed} similar records suppressed]" if suppressed else text
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; fields passed with extra= are included as-is."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        for key, value in vars(record).items():
+            if key not in RESERVED_ATTRS:
+                entry[key] = value
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(
+    level: int,
+    json_output: bool = False,
+    sample_rates: Optional[Dict[str, float]] = None,
+    rate_limit_per_second: float = 0.0,
+    rate_limit_burst: int = 50
+) -> logging.handlers.QueueListener:
+    """Send all logging through a background thread; returns the started listener.
+
+    Calling it again replaces the previous pipeline. Handlers added by others (pytest's
+    capture, for instance) are left alone.
+    """
+    output = logging.StreamHandler()
+    output.setFormatter(JsonFormatter() if json_output else TextFormatter(TEXT_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    handler = BackgroundQueueHandler(log_queue)
+    if sample_rates:
+        handler.addFilter(SamplingFilter(sample_rates))
+    if rate_limit_per_second > 0:
+        handler.addFilter(RateLimitFilter(rate_limit_per_second, rate_limit_burst))
+    handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        if isinstance(existing, BackgroundQueueHandler):
+            root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    for name in ROUTED_LOGGERS:
+        routed = logging.getLogger(name)
+        routed.handlers.clear()
+        routed.propagate = True
+
+    listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    # Drain whatever is still queued when the process exits
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,250 @@
+"""
+Request Metrics
+===============
+
+Prometheus metrics for the API: per-route request counts, latency and response
+size histograms, in-flight gauges, event-loop lag, and Mongo connection pool gauges,
+checkout wait times and saturation (checked-out connections over maxPoolSize).
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional
+
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+from pymongo import common, monitoring
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Routes that didn't match anything are grouped to keep label cardinality bounded
+UNMATCHED_ROUTE = "unmatched"
+
+REQUEST_COUNT = Counter(
+    "http_requests_total",
+    "HTTP requests by route template, method and status class",
+    ["method", "route", "status_class"]
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "HTTP response body size by route template (after compression)",
+    ["method", "route"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served",
+    ["method"]
+)
+EVENT_LOOP_LAG = Gauge(
+    "event_loop_lag_seconds",
+    "Delay between when the lag probe was scheduled to wake and when it ran"
+)
+MONGO_POOL_CONNECTIONS = Gauge(
+    "mongo_pool_connections",
+    "Open connections in the Mongo connection pools",
+    ["pool", "address"]
+)
+MONGO_POOL_CHECKED_OUT = Gauge(
+    "mongo_pool_checked_out_connections",
+    "Mongo connections currently checked out by operations",
+    ["pool", "address"]
+)
+MONGO_POOL_WAITING = Gauge(
+    "mongo_pool_waiting_operations",
+    "Operations waiting to check out a Mongo connection",
+    ["pool", "address"]
+)
+MONGO_POOL_MAX_SIZE = Gauge(
+    "mongo_pool_max_size",
+    "Configured maxPoolSize of each Mongo connection pool",
+    ["pool", "address"]
+)
+MONGO_POOL_SATURATION = Gauge(
+    "mongo_pool_saturation_ratio",
+    "Checked-out connections as a fraction of maxPoolSize (1.0 means requests queue)",
+    ["pool", "address"]
+)
+MONGO_POOL_CHECKOUT_WAIT = Histogram(
+    "mongo_pool_checkout_wait_seconds",
+    "Time from requesting a Mongo connection to getting one (or failing)",
+    ["pool", "address"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+MONGO_POOL_CHECKOUT_FAILURES = Counter(
+    "mongo_pool_checkout_failures_total",
+    "Failed Mongo connection checkouts (e.g. wait queue timeouts)",
+    ["pool", "address", "reason"]
+)
+
+
+def route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request metrics per route template."""
+
+    def __init__(self, app: ASGIApp, skip_paths: tuple = ("/metrics",)):
+        self.app = app
+        self.skip_paths = skip_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        response_size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.labels(method).inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            REQUESTS_IN_PROGRESS.labels(method).dec()
+            route = route_template(scope)
+            REQUEST_COUNT.labels(method, route, f"{status_code // 100}xx").inc()
+            REQUEST_LATENCY.labels(method, route).observe(elapsed)
+            RESPONSE_SIZE.labels(method, route).observe(response_size)
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Keeps the Mongo pool gauges current from pymongo's CMAP events.
+
+    Each client gets its own listener, labelled with the pool it watches ("primary",
+    "analytics"), since both clients may connect to the same addresses. Checkout start
+    and finish events fire on the thread doing the checkout, so the wait is timed with
+    a thread-local start time.
+    """
+
+    def __init__(self, pool: str = "primary"):
+        self.pool = pool
+        self._max_size = {}
+        self._checked_out = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @staticmethod
+    def _address(event) -> str:
+        host, port = event.address
+        return f"{host}:{port}"
+
+    def _adjust_checked_out(self, address: str, delta: int):
+        with self._lock:
+            checked_out = self._checked_out.get(address, 0) + delta
+            self._checked_out[address] = checked_out
+            max_size = self._max_size.get(address) or common.MAX_POOL_SIZE
+        MONGO_POOL_CHECKED_OUT.labels(self.pool, address).set(checked_out)
+        MONGO_POOL_SATURATION.labels(self.pool, address).set(checked_out / max_size)
+
+    def _observe_wait(self, address: str):
+        started = getattr(self._local, "checkout_started", {}).pop(address, None)
+        if started is not None:
+            MONGO_POOL_CHECKOUT_WAIT.labels(self.pool, address).observe(time.perf_counter() - started)
+
+    def pool_created(self, event):
+        address = self._address(event)
+        # options only lists non-default settings
+        max_size = event.options.get("maxPoolSize", common.MAX_POOL_SIZE)
+        with self._lock:
+            self._max_size[address] = max_size
+        MONGO_POOL_MAX_SIZE.labels(self.pool, address).set(max_size)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        address = self._address(event)
+        with self._lock:
+            self._checked_out[address] = 0
+        MONGO_POOL_CONNECTIONS.labels(self.pool, address).set(0)
+        MONGO_POOL_CHECKED_OUT.labels(self.pool, address).set(0)
+        MONGO_POOL_SATURATION.labels(self.pool, address).set(0)
+        MONGO_POOL_WAITING.labels(self.pool, address).set(0)
+
+    def connection_created(self, event):
+        MONGO_POOL_CONNECTIONS.labels(self.pool, self._address(event)).inc()
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        MONGO_POOL_CONNECTIONS.labels(self.pool, self._address(event)).dec()
+
+    def connection_check_out_started(self, event):
+        address = self._address(event)
+        if not hasattr(self._local, "checkout_started"):
+            self._local.checkout_started = {}
+        self._local.checkout_started[address] = time.perf_counter()
+        MONGO_POOL_WAITING.labels(self.pool, address).inc()
+
+    def connection_check_out_failed(self, event):
+        address = self._address(event)
+        self._observe_wait(address)
+        MONGO_POOL_WAITING.labels(self.pool, address).dec()
+        MONGO_POOL_CHECKOUT_FAILURES.labels(self.pool, address, str(event.reason)).inc()
+
+    def connection_checked_out(self, event):
+        address = self._address(event)
+        self._observe_wait(address)
+        MONGO_POOL_WAITING.labels(self.pool, address).dec()
+        self._adjust_checked_out(address, 1)
+
+    def connection_checked_in(self, event):
+        self._adjust_checked_out(self._address(event), -1)
+
+
+class EventLoopLagMonitor:
+    """Samples how late the event loop wakes a sleeping task."""
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            EVENT_LOOP_LAG.set(max(0.0, loop.time() - scheduled))
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def metrics_response() -> Response:
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
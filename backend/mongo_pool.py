@@ -0,0 +1,178 @@
+"""
+Mongo Connection Pool
+=====================
+
+Motor client options read from the environment, pool warm-up at startup and an
+optional in-process keep-alive that replaces running keep_alive.py alongside the API.
+
+Analytics and report endpoints read through a second client (analytics_db in core)
+with its own small pool, secondaryPreferred reads with bounded staleness and wire
+compression, so large result sets don't compete with quiz submissions on the primary.
+
+Atlas URLs keep the previous production defaults (maxPoolSize=10, 5 s timeouts,
+retryWrites); every option can be overridden with its MONGO_* variable. Compressors
+need their optional packages (zstandard for zstd, python-snappy for snappy); pymongo
+skips ones that are not installed.
+"""
+
+import asyncio
+import importlib.util
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+ATLAS_DEFAULTS = {
+    "maxPoolSize": 10,
+    "waitQueueTimeoutMS": 5000,
+    "connectTimeoutMS": 5000,
+    "socketTimeoutMS": 5000,
+    "serverSelectionTimeoutMS": 5000,
+    "retryWrites": True
+}
+
+# Client option -> environment variable
+POOL_ENV_OPTIONS = {
+    "maxPoolSize": "MONGO_MAX_POOL_SIZE",
+    "minPoolSize": "MONGO_MIN_POOL_SIZE",
+    "maxIdleTimeMS": "MONGO_MAX_IDLE_TIME_MS",
+    "maxConnecting": "MONGO_MAX_CONNECTING",
+    "waitQueueTimeoutMS": "MONGO_WAIT_QUEUE_TIMEOUT_MS",
+    "connectTimeoutMS": "MONGO_CONNECT_TIMEOUT_MS",
+    "socketTimeoutMS": "MONGO_SOCKET_TIMEOUT_MS",
+    "serverSelectionTimeoutMS": "MONGO_SERVER_SELECTION_TIMEOUT_MS"
+}
+
+
+def is_atlas_url(mongo_url: str) -> bool:
+    return 'mongodb.net' in mongo_url or 'atlas' in mongo_url.lower()
+
+
+def pool_options_from_env(mongo_url: str, environ=os.environ) -> Dict[str, Any]:
+    """Client keyword arguments for mongo_url, with MONGO_* overrides applied."""
+    options = dict(ATLAS_DEFAULTS) if is_atlas_url(mongo_url) else {}
+    for option, variable in POOL_ENV_OPTIONS.items():
+        value = environ.get(variable)
+        if value:
+            options[option] = int(value)
+    compressors = environ.get('MONGO_COMPRESSORS', '').strip()
+    if compressors:
+        options["compressors"] = compressors
+    return options
+
+
+# Packages the optional wire compressors need; zlib is always available
+COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy"}
+
+
+def available_compressors(preferred: str) -> str:
+    """Drop compressors whose package isn't installed (pymongo would warn on every client)."""
+    return ",".join(
+        name for name in preferred.split(",")
+        if name not in COMPRESSOR_MODULES or importlib.util.find_spec(COMPRESSOR_MODULES[name]) is not None
+    )
+
+
+# Report reads: a small pool of their own, secondaries first, compressed result sets
+ANALYTICS_DEFAULTS = {
+    "maxPoolSize": 5,
+    "readPreference": "secondaryPreferred",
+    "maxStalenessSeconds": 120,
+    "socketTimeoutMS": 30000,
+    "compressors": available_compressors("zstd,snappy,zlib")
+}
+
+ANALYTICS_ENV_OPTIONS = {
+    "maxPoolSize": ("ANALYTICS_MAX_POOL_SIZE", int),
+    "readPreference": ("ANALYTICS_READ_PREFERENCE", str),
+    "maxStalenessSeconds": ("ANALYTICS_MAX_STALENESS_SECONDS", int),
+    "socketTimeoutMS": ("ANALYTICS_SOCKET_TIMEOUT_MS", int),
+    "compressors": ("ANALYTICS_COMPRESSORS", str)
+}
+
+
+def analytics_options_from_env(mongo_url: str, environ=os.environ) -> Dict[str, Any]:
+    """Client keyword arguments for the analytics handle.
+
+    Timeouts follow the main client; pool size, read preference, staleness bound,
+    socket timeout and compressors have their own ANALYTICS_* settings. Staleness
+    can't be bounded when reading from the primary, so it is dropped there.
+    """
+    options = pool_options_from_env(mongo_url, environ)
+    options.pop("minPoolSize", None)
+    options.update(ANALYTICS_DEFAULTS)
+    for option, (variable, cast) in ANALYTICS_ENV_OPTIONS.items():
+        value = environ.get(variable)
+        if value:
+            options[option] = cast(value)
+    if options["readPreference"] == "primary":
+        options.pop("maxStalenessSeconds")
+    return options
+
+
+async def warm_up_pool(client, connections: int) -> int:
+    """Open up to `connections` pooled connections now instead of on the first requests.
+
+    Concurrent pings each need their own connection, so the TCP/TLS handshake and
+    authentication happen here. Returns how many pings succeeded.
+    """
+    if connections <= 0:
+        return 0
+    results = await asyncio.gather(
+        *(client.admin.command('ping') for _ in range(connections)),
+        return_exceptions=True
+    )
+    warmed = sum(1 for result in results if not isinstance(result, Exception))
+    logger.info(f"Warmed Mongo connection pool: {warmed}/{connections} connections")
+    return warmed
+
+
+class DatabaseKeepAlive:
+    """Pings the cluster on an interval so idle Atlas tiers don't pause.
+
+    Every `health_every` pings it also records a timestamp in db.system_health, as
+    keep_alive.py does.
+    """
+
+    def __init__(self, client, db, interval: float, health_every: int = 10):
+        self.client = client
+        self.db = db
+        self.interval = interval
+        self.health_every = health_every
+        self._task: Optional[asyncio.Task] = None
+
+    async def ping(self, count: int):
+        await self.client.admin.command('ping')
+        if count % self.health_every == 0:
+            await self.db.system_health.replace_one(
+                {"service": "keep_alive"},
+                {"service": "keep_alive", "last_ping": datetime.utcnow(), "status": "active"},
+                upsert=True
+            )
+
+    async def _run(self):
+        count = 0
+        while True:
+            await asyncio.sleep(self.interval)
+            count += 1
+            try:
+                await self.ping(count)
+                logger.debug("Keep-alive ping successful")
+            except Exception as e:
+                logger.warning(f"Keep-alive ping failed: {str(e)}")
+
+    def start(self):
+        if self._task is None:
+            logger.info(f"Starting database keep-alive (every {self.interval:.0f}s)")
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
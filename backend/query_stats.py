@@ -0,0 +1,164 @@
+"""
+Per-Request Query Statistics
+============================
+
+Tags every request with a context id and uses pymongo command monitoring to count
+and time the Mongo commands it issues. Results go to Prometheus histograms, to
+response headers in debug mode, and to a structured log line when a request
+exceeds the configured thresholds.
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from prometheus_client import Histogram
+from pymongo import monitoring
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+SLOWEST_COMMANDS_KEPT = 5
+
+REQUEST_DB_COMMANDS = Histogram(
+    "http_request_db_commands",
+    "Mongo commands issued per request by route template",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233, 377)
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds",
+    "Total Mongo command time per request by route template",
+    ["method", "route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+
+
+class RequestQueryStats:
+    """Mongo command counters for one request.
+
+    Listener callbacks run on Motor's executor threads, so updates are locked.
+    """
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.command_count = 0
+        self.db_time_ms = 0.0
+        self.slowest: List[Tuple[float, str, Optional[str]]] = []
+        self._in_flight: Dict[int, Tuple[str, Optional[str]]] = {}
+        self._lock = threading.Lock()
+
+    def command_started(self, request_id: int, command_name: str, collection: Optional[str]):
+        with self._lock:
+            self._in_flight[request_id] = (command_name, collection)
+
+    def command_finished(self, request_id: int, command_name: str, duration_micros: int):
+        duration_ms = duration_micros / 1000.0
+        with self._lock:
+            name, collection = self._in_flight.pop(request_id, (command_name, None))
+            self.command_count += 1
+            self.db_time_ms += duration_ms
+            self.slowest.append((duration_ms, name, collection))
+            self.slowest.sort(reverse=True)
+            del self.slowest[SLOWEST_COMMANDS_KEPT:]
+
+    def slowest_commands(self) -> List[dict]:
+        return [
+            {"command": name, "collection": collection, "ms": round(ms, 2)}
+            for ms, name, collection in self.slowest
+        ]
+
+
+current_query_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+class QueryStatsListener(monitoring.CommandListener):
+    """Attributes Mongo commands to the request whose context issued them."""
+
+    def started(self, event):
+        stats = current_query_stats.get()
+        if stats is not None:
+            collection = event.command.get(event.command_name)
+            stats.command_started(
+                event.request_id,
+                event.command_name,
+                collection if isinstance(collection, str) else None
+            )
+
+    def succeeded(self, event):
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.command_finished(event.request_id, event.command_name, event.duration_micros)
+
+    def failed(self, event):
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.command_finished(event.request_id, event.command_name, event.duration_micros)
+
+
+class QueryStatsMiddleware:
+    """Tag requests with an id and report the Mongo work each one did."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        expose_headers: bool = False,
+        count_threshold: int = 50,
+        time_threshold_ms: float = 500.0
+    ):
+        self.app = app
+        self.expose_headers = expose_headers
+        self.count_threshold = count_threshold
+        self.time_threshold_ms = time_threshold_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get(REQUEST_ID_HEADER) or uuid.uuid4().hex[:16]
+        stats = RequestQueryStats(request_id)
+        token = current_query_stats.set(stats)
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers[REQUEST_ID_HEADER] = request_id
+                if self.expose_headers:
+                    headers["X-DB-Query-Count"] = str(stats.command_count)
+                    headers["X-DB-Time-Ms"] = f"{stats.db_time_ms:.1f}"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_stats.reset(token)
+            self._report(scope, stats, time.perf_counter() - start)
+
+    def _report(self, scope: Scope, stats: RequestQueryStats, elapsed: float):
+        method = scope["method"]
+        route = route_template(scope)
+        REQUEST_DB_COMMANDS.labels(method, route).observe(stats.command_count)
+        REQUEST_DB_TIME.labels(method, route).observe(stats.db_time_ms / 1000.0)
+
+        if stats.command_count > self.count_threshold or stats.db_time_ms > self.time_threshold_ms:
+            logger.warning(json.dumps({
+                "event": "request_db_threshold_exceeded",
+                "request_id": stats.request_id,
+                "method": method,
+                "route": route,
+                "path": scope["path"],
+                "db_commands": stats.command_count,
+                "db_time_ms": round(stats.db_time_ms, 1),
+                "request_ms": round(elapsed * 1000, 1),
+                "slowest": stats.slowest_commands()
+            }))
@@ -0,0 +1,470 @@
+"""
+Reporting Snapshots
+===================
+
+Columnar snapshots of the operational collections for admin reports, and the
+pandas reports computed from them, so heavy analytical questions read compact
+local files instead of running live aggregations on the cluster.
+
+Each snapshot table is a directory of Parquet files under
+REPORTS_DIR/snapshots/<table>/, one batch=<run time> partition per run:
+
+- Fact tables (enrollments with their progress, quiz and final test attempts) are
+  incremental: a run reads only the documents changed since the table's watermark
+  (updated_at, else the creation date), less an overlap for writes that were in
+  flight. A document changed between runs appears in several partitions and
+  readers keep its latest copy; compacting a table rewrites it as one partition.
+- Dimension tables (users, classrooms) are small and have no reliable change
+  date, so every run replaces them.
+
+Reports (cohort completion curves, time to completion, department and classroom
+funnels) read only the columns they need. Reads, writes and compaction of a table
+take the table's lock, so a report never lists a partition that is half written or
+about to be removed. The Parquet conversion and I/O run in worker threads. pandas and pyarrow are imported where
+they are used, so importing this module (and the app) doesn't load them.
+"""
+
+import json
+import logging
+import shutil
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+import anyio
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+# Rows per Parquet file written (and the most a snapshot run holds in memory)
+SNAPSHOT_CHUNK_ROWS = 50_000
+CURSOR_BATCH_SIZE = 1000
+WATERMARK_OVERLAP = timedelta(minutes=5)
+WATERMARK_FILE = "_watermark.json"
+
+_table_locks: Dict[str, threading.RLock] = {}
+_table_locks_guard = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def arrow_types() -> Dict[str, "pa.DataType"]:
+    """Arrow type of each snapshot column kind."""
+    import pyarrow as pa
+
+    return {
+        "string": pa.string(),
+        "float": pa.float64(),
+        "int": pa.int64(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("us"),
+        "list": pa.list_(pa.string())
+    }
+
+
+class SnapshotMissing(LookupError):
+    """A report needs a table that hasn't been snapshotted yet."""
+
+
+@dataclass(frozen=True)
+class SnapshotTable:
+    name: str
+    fields: Tuple[Tuple[str, str], ...]  # (column, kind in arrow_types())
+    changed_fields: Tuple[str, ...] = ()  # empty: replaced by every run
+
+    @property
+    def columns(self) -> List[str]:
+        return [column for column, _ in self.fields]
+
+    @property
+    def schema(self) -> "pa.Schema":
+        import pyarrow as pa
+
+        types = arrow_types()
+        return pa.schema([(column, types[kind]) for column, kind in self.fields])
+
+    @property
+    def incremental(self) -> bool:
+        return bool(self.changed_fields)
+
+
+SNAPSHOT_TABLES: Dict[str, SnapshotTable] = {
+    "enrollments": SnapshotTable(
+        name="enrollments",
+        fields=(
+            ("id", "string"), ("userId", "string"), ("courseId", "string"), ("progress", "float"),
+            ("status", "string"), ("enrolledAt", "timestamp"), ("completedAt", "timestamp"), ("updated_at", "timestamp")
+        ),
+        changed_fields=("updated_at", "enrolledAt")
+    ),
+    "quiz_attempts": SnapshotTable(
+        name="quiz_attempts",
+        fields=(
+            ("id", "string"), ("studentId", "string"), ("quizId", "string"), ("courseId", "string"),
+            ("lessonId", "string"), ("score", "float"), ("isPassed", "bool"), ("attemptNumber", "int"),
+            ("created_at", "timestamp"), ("updated_at", "timestamp")
+        ),
+        changed_fields=("updated_at", "created_at")
+    ),
+    "final_test_attempts": SnapshotTable(
+        name="final_test_attempts",
+        fields=(
+            ("id", "string"), ("studentId", "string"), ("testId", "string"), ("programId", "string"),
+            ("score", "float"), ("isPassed", "bool"), ("attemptNumber", "int"),
+            ("created_at", "timestamp"), ("updated_at", "timestamp")
+        ),
+        changed_fields=("updated_at", "created_at")
+    ),
+    "users": SnapshotTable(
+        name="users",
+        fields=(("id", "string"), ("role", "string"), ("department", "string"), ("created_at", "timestamp"))
+    ),
+    "classrooms": SnapshotTable(
+        name="classrooms",
+        fields=(
+            ("id", "string"), ("name", "string"), ("department", "string"),
+            ("courseIds", "list"), ("studentIds", "list")
+        )
+    )
+}
+
+
+# =============================================================================
+# SNAPSHOTS
+# =============================================================================
+
+def table_directory(root: str, name: str) -> Path:
+    return Path(root) / "snapshots" / name
+
+
+def read_watermark(directory: Path) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(json.loads((directory / WATERMARK_FILE).read_text())["watermark"])
+    except (FileNotFoundError, KeyError, ValueError):
+        return None
+
+
+def write_watermark(directory: Path, watermark: datetime):
+    directory.mkdir(parents=True, exist_ok=True)
+    temporary = directory / f"{WATERMARK_FILE}.tmp"
+    temporary.write_text(json.dumps({"watermark": watermark.isoformat()}))
+    temporary.replace(directory / WATERMARK_FILE)
+
+
+def changed_since(table: SnapshotTable, since: Optional[datetime]) -> Dict[str, Any]:
+    """Documents whose first present change field is after since (every document when since is None)."""
+    if since is None or not table.incremental:
+        return {}
+    clauses, missing = [], {}
+    for changed_field in table.changed_fields:
+        clauses.append({**missing, changed_field: {"$gt": since}})
+        # Later fields only count for documents without this one
+        missing = {**missing, changed_field: None}
+    return {"$or": clauses}
+
+
+def snapshot_frame(table: SnapshotTable, rows: List[dict]) -> "pa.Table":
+    """Documents as an Arrow table with the table's schema (missing fields are null)."""
+    import pandas as pd
+    import pyarrow as pa
+
+    frame = pd.DataFrame.from_records(rows, columns=table.columns)
+    for column, kind in table.fields:
+        if kind == "timestamp":
+            frame[column] = pd.to_datetime(frame[column], errors="coerce", utc=True).dt.tz_localize(None)
+        elif kind in ("float", "int"):
+            frame[column] = pd.to_numeric(frame[column], errors="coerce")
+        elif kind == "bool":
+            frame[column] = frame[column].map(lambda value: None if value is None or value != value else bool(value))
+        elif kind == "string":
+            frame[column] = frame[column].map(lambda value: None if value is None or value != value else str(value))
+        elif kind == "list":
+            frame[column] = frame[column].map(
+                lambda value: [str(item) for item in value] if isinstance(value, list) else None
+            )
+    return pa.Table.from_pandas(frame, schema=table.schema, preserve_index=False, safe=False)
+
+
+def write_part(directory: Path, batch: str, part: int, data: "pa.Table"):
+    import pyarrow.parquet as pq
+
+    partition = directory / f"batch={batch}"
+    partition.mkdir(parents=True, exist_ok=True)
+    pq.write_table(data, partition / f"part-{part:05d}.parquet")
+
+
+def batches(directory: Path) -> List[Path]:
+    return sorted(directory.glob("batch=*"))
+
+
+def table_lock(directory: Path) -> threading.RLock:
+    """Serializes listing, writing and removing a table's partitions (taken in worker threads)."""
+    with _table_locks_guard:
+        return _table_locks.setdefault(str(directory.resolve()), threading.RLock())
+
+
+def write_rows(directory: Path, batch: str, part: int, table: SnapshotTable, rows: List[dict]):
+    """Convert rows and write them as one part; run in a worker thread."""
+    data = snapshot_frame(table, rows)
+    with table_lock(directory):
+        write_part(directory, batch, part, data)
+
+
+def remove_partitions(directory: Path, partitions: List[Path]):
+    with table_lock(directory):
+        for partition in partitions:
+            shutil.rmtree(partition)
+
+
+async def snapshot_table(database, table: SnapshotTable, root: str, now: Optional[datetime] = None) -> int:
+    """Copy the table's new and changed documents into a new partition; returns the rows written."""
+    directory = table_directory(root, table.name)
+    watermark = read_watermark(directory)
+    started = now or datetime.utcnow()
+    batch = started.strftime("%Y%m%dT%H%M%S%f")
+    since = watermark - WATERMARK_OVERLAP if watermark else None
+    previous = batches(directory)
+
+    cursor = database[table.name].find(
+        changed_since(table, since), {"_id": 0, **{column: 1 for column in table.columns}}
+    ).batch_size(CURSOR_BATCH_SIZE)
+    rows, part, written = [], 0, 0
+    async for document in cursor:
+        rows.append(document)
+        if len(rows) >= SNAPSHOT_CHUNK_ROWS:
+            await anyio.to_thread.run_sync(write_rows, directory, batch, part, table, rows)
+            written, part, rows = written + len(rows), part + 1, []
+    if rows or not previous:
+        # A first snapshot always writes a partition, so reports can tell "empty" from "never run"
+        await anyio.to_thread.run_sync(write_rows, directory, batch, part, table, rows)
+        written += len(rows)
+
+    if not table.incremental:
+        await anyio.to_thread.run_sync(remove_partitions, directory, previous)
+    write_watermark(directory, started)
+    logger.info(f"Snapshot of {table.name}: {written} rows in batch {batch}")
+    return written
+
+
+async def snapshot_all(database, root: str, tables: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """Snapshot the named tables (all of them by default); returns rows written per table."""
+    return {
+        name: await snapshot_table(database, SNAPSHOT_TABLES[name], root)
+        for name in (tables or SNAPSHOT_TABLES)
+    }
+
+
+def load_table(root: str, name: str, columns: Optional[List[str]] = None) -> "pd.DataFrame":
+    """The latest copy of every row of a snapshot table, reading only the given columns."""
+    import pandas as pd
+    import pyarrow.parquet as pq
+
+    table = SNAPSHOT_TABLES[name]
+    directory = table_directory(root, name)
+    columns = columns or table.columns
+    read = columns if "id" in columns or not table.incremental else ["id", *columns]
+    with table_lock(directory):
+        partitions = batches(directory)
+        if not partitions:
+            raise SnapshotMissing(name)
+        arrow_tables = [pq.read_table(partition, columns=read, schema=table.schema) for partition in partitions]
+    frames = [arrow_table.to_pandas() for arrow_table in arrow_tables]
+    frame = pd.concat(frames, ignore_index=True)
+    if table.incremental:
+        # Partitions are in run order, so the last copy of a row is its latest
+        frame = frame.drop_duplicates("id", keep="last")
+    return frame[columns].reset_index(drop=True)
+
+
+def compact_table(root: str, name: str) -> int:
+    """Rewrite an incremental table as one partition holding the latest copy of each row."""
+    import pyarrow as pa
+
+    table = SNAPSHOT_TABLES[name]
+    directory = table_directory(root, name)
+    with table_lock(directory):
+        partitions = batches(directory)
+        if len(partitions) < 2:
+            return len(partitions)
+        frame = load_table(root, name)
+        # Sorts after the partitions it replaces; a crash before they are removed only leaves duplicates
+        compacted = f"{partitions[-1].name[len('batch='):]}~compact"
+        write_part(directory, compacted, 0, pa.Table.from_pandas(frame, schema=table.schema, preserve_index=False))
+        remove_partitions(directory, partitions)
+    logger.info(f"Compacted {name}: {len(partitions)} partitions into one of {len(frame)} rows")
+    return len(partitions)
+
+
+def snapshot_time(root: str, name: str) -> Optional[datetime]:
+    return read_watermark(table_directory(root, name))
+
+
+# =============================================================================
+# REPORTS
+# =============================================================================
+
+PERIODS = {"month": "M", "week": "W"}
+
+FUNNEL_STAGES = ("enrolled", "started", "attemptedQuiz", "completed")
+
+
+def _rate(part: int, whole: int) -> Optional[float]:
+    return round(part / whole, 4) if whole else None
+
+
+def _completed(enrollments: "pd.DataFrame") -> "pd.Series":
+    return enrollments["completedAt"].notna() | (enrollments["status"] == "completed") | (enrollments["progress"] >= 100)
+
+
+def cohort_completion(
+    enrollments: "pd.DataFrame", as_of: datetime, period: str = "month", horizon_weeks: int = 12
+) -> List[Dict[str, Any]]:
+    """Share of each enrollment cohort completed within k weeks of enrolling, k = 0..horizon_weeks.
+
+    Points a cohort can't have reached yet (its start plus k weeks is after as_of) are None.
+    """
+    import pandas as pd
+
+    frame = enrollments.dropna(subset=["enrolledAt"])
+    if frame.empty:
+        return []
+    cohorts = frame["enrolledAt"].dt.to_period(PERIODS[period])
+    weeks = (frame["completedAt"] - frame["enrolledAt"]).dt.days // 7
+    # Completions after the horizon (or never) fall in a column that is dropped
+    weeks = weeks.clip(lower=0).fillna(horizon_weeks + 1).clip(upper=horizon_weeks + 1).astype(int)
+    counts = pd.crosstab(cohorts, weeks).reindex(columns=range(horizon_weeks + 2), fill_value=0)
+    completed = counts.iloc[:, :horizon_weeks + 1].cumsum(axis=1)
+    sizes = counts.sum(axis=1)
+
+    curves = []
+    for cohort, row in completed.iterrows():
+        observable = (as_of - cohort.start_time.to_pydatetime()).days // 7
+        curves.append({
+            "cohort": str(cohort),
+            "enrolled": int(sizes[cohort]),
+            "curve": [
+                {"week": week, "completed": _rate(int(row[week]), int(sizes[cohort])) if week <= observable else None}
+                for week in range(horizon_weeks + 1)
+            ]
+        })
+    return curves
+
+
+def completion_time_stats(days: "pd.Series") -> Dict[str, Any]:
+    if days.empty:
+        return {"completed": 0, "meanDays": None, "medianDays": None, "p75Days": None, "p90Days": None}
+    quantiles = days.quantile([0.5, 0.75, 0.9])
+    return {
+        "completed": int(days.size),
+        "meanDays": round(float(days.mean()), 2),
+        "medianDays": round(float(quantiles[0.5]), 2),
+        "p75Days": round(float(quantiles[0.75]), 2),
+        "p90Days": round(float(quantiles[0.9]), 2)
+    }
+
+
+def time_to_completion(enrollments: "pd.DataFrame") -> Dict[str, Any]:
+    """Days from enrolling to completing: summary, weekly histogram, and the summary per course."""
+    frame = enrollments.dropna(subset=["enrolledAt", "completedAt"])
+    days = (frame["completedAt"] - frame["enrolledAt"]).dt.total_seconds() / 86400
+    frame, days = frame[days >= 0], days[days >= 0]
+
+    histogram = []
+    if not days.empty:
+        weeks = (days // 7).astype(int)
+        histogram = [{"week": int(week), "count": int(count)} for week, count in weeks.value_counts().sort_index().items()]
+    return {
+        **completion_time_stats(days),
+        "enrolled": int(len(enrollments)),
+        "histogram": histogram,
+        "byCourse": [
+            {"courseId": course_id, **completion_time_stats(course_days)}
+            for course_id, course_days in days.groupby(frame["courseId"])
+        ]
+    }
+
+
+def funnel(
+    enrollments: "pd.DataFrame",
+    quiz_attempts: "pd.DataFrame",
+    users: "pd.DataFrame",
+    classrooms: "pd.DataFrame",
+    by: str = "department"
+) -> List[Dict[str, Any]]:
+    """Enrolled -> started -> attempted a quiz -> completed, per department or per classroom.
+
+    A classroom counts the enrollments of its students in its courses; an enrollment
+    in courses shared by several classrooms counts in each.
+    """
+    frame = enrollments.assign(
+        enrolled=True,
+        started=enrollments["progress"].fillna(0) > 0,
+        completed=_completed(enrollments)
+    )
+    attempted = quiz_attempts.dropna(subset=["courseId"])[["studentId", "courseId"]].drop_duplicates()
+    attempted = attempted.rename(columns={"studentId": "userId"}).assign(attemptedQuiz=True)
+    frame = frame.merge(attempted, on=["userId", "courseId"], how="left")
+    frame["attemptedQuiz"] = frame["attemptedQuiz"].astype("boolean").fillna(False).astype(bool)
+
+    if by == "department":
+        departments = users.set_index("id")["department"]
+        frame["groupId"] = frame["userId"].map(departments).fillna("Unassigned")
+        frame["group"] = frame["groupId"]
+    else:
+        members = classrooms.explode("studentIds").explode("courseIds").dropna(subset=["studentIds", "courseIds"])
+        members = members.rename(columns={"id": "groupId", "name": "group", "studentIds": "userId", "courseIds": "courseId"})
+        frame = frame.merge(members[["groupId", "group", "userId", "courseId"]], on=["userId", "courseId"])
+
+    if frame.empty:
+        return []
+    counts = frame.groupby(["groupId", "group"])[list(FUNNEL_STAGES)].sum().astype(int)
+    counts = counts.sort_values("enrolled", ascending=False)
+    return [
+        {
+            "groupId": group_id,
+            "group": group,
+            **{stage: int(row[stage]) for stage in FUNNEL_STAGES},
+            "completionRate": _rate(int(row["completed"]), int(row["enrolled"]))
+        }
+        for (group_id, group), row in counts.iterrows()
+    ]
+
+
+def filter_course(frame: "pd.DataFrame", course_id: Optional[str]) -> "pd.DataFrame":
+    return frame if course_id is None else frame[frame["courseId"] == course_id]
+
+
+ENROLLMENT_REPORT_COLUMNS = ["userId", "courseId", "progress", "status", "enrolledAt", "completedAt"]
+
+
+def cohort_report(root: str, period: str, horizon_weeks: int, course_id: Optional[str] = None) -> Dict[str, Any]:
+    enrollments = filter_course(load_table(root, "enrollments", ENROLLMENT_REPORT_COLUMNS), course_id)
+    as_of = snapshot_time(root, "enrollments") or datetime.utcnow()
+    return {
+        "asOf": as_of,
+        "period": period,
+        "cohorts": cohort_completion(enrollments, as_of, period, horizon_weeks)
+    }
+
+
+def time_to_completion_report(root: str, course_id: Optional[str] = None) -> Dict[str, Any]:
+    enrollments = filter_course(load_table(root, "enrollments", ENROLLMENT_REPORT_COLUMNS), course_id)
+    return {"asOf": snapshot_time(root, "enrollments"), **time_to_completion(enrollments)}
+
+
+def funnel_report(root: str, by: str, course_id: Optional[str] = None) -> Dict[str, Any]:
+    enrollments = filter_course(load_table(root, "enrollments", ENROLLMENT_REPORT_COLUMNS), course_id)
+    quiz_attempts = load_table(root, "quiz_attempts", ["studentId", "courseId"])
+    users = load_table(root, "users", ["id", "department"]) if by == "department" else None
+    classrooms = load_table(root, "classrooms", ["id", "name", "courseIds", "studentIds"]) if by == "classroom" else None
+    return {
+        "asOf": snapshot_time(root, "enrollments"),
+        "by": by,
+        "stages": list(FUNNEL_STAGES),
+        "groups": funnel(enrollments, quiz_attempts, users, classrooms, by)
+    }
@@ -0,0 +1,176 @@
+"""
+Request Profiler
+================
+
+Opt-in statistical profiling of individual requests. A sampled fraction of requests,
+or any request carrying a signed X-Profile-Request header, is profiled with
+pyinstrument (async-aware, so only the request's own task is attributed). Each
+profile is written as folded stacks (flamegraph.pl / speedscope compatible) into a
+per-route directory that keeps only the newest N files.
+
+When PROFILER_ENABLED is off the middleware is never installed. Headers are signed
+with PROFILER_SECRET only; without it signed headers are refused and only sampling
+selects requests.
+"""
+
+import hashlib
+import hmac
+import logging
+import random
+import re
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from metrics import route_template
+from query_stats import current_query_stats
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile-Request"
+PROFILE_SUFFIX = ".folded"
+
+
+def route_key(route: str) -> str:
+    """Filesystem-safe directory name for a route template."""
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", route).strip("_") or "root"
+
+
+class RequestProfiler:
+    """Decides which requests to profile and owns the on-disk profile ring."""
+
+    def __init__(
+        self,
+        directory: str,
+        secret: Optional[str] = None,
+        sample_rate: float = 0.0,
+        max_profiles_per_route: int = 20,
+        interval: float = 0.001
+    ):
+        self.directory = Path(directory)
+        self.secret = secret.encode() if secret else None
+        self.sample_rate = sample_rate
+        self.max_profiles_per_route = max_profiles_per_route
+        self.interval = interval
+
+    @property
+    def signing_enabled(self) -> bool:
+        return self.secret is not None
+
+    # Signed header: "<expires>.<hex hmac of 'METHOD PATH expires'>"
+    def _signature(self, method: str, path: str, expires: int) -> str:
+        message = f"{method.upper()} {path} {expires}".encode()
+        return hmac.new(self.secret, message, hashlib.sha256).hexdigest()
+
+    def sign(self, method: str, path: str, ttl_seconds: int = 300) -> str:
+        if not self.signing_enabled:
+            raise ValueError("Signed profile headers need PROFILER_SECRET")
+        expires = int(time.time()) + ttl_seconds
+        return f"{expires}.{self._signature(method, path, expires)}"
+
+    def verify(self, method: str, path: str, token: str) -> bool:
+        if not self.signing_enabled:
+            return False
+        expires, _, signature = token.partition(".")
+        if not expires.isdigit() or int(expires) < time.time():
+            return False
+        return hmac.compare_digest(signature, self._signature(method, path, int(expires)))
+
+    def should_profile(self, scope: Scope) -> bool:
+        token = Headers(scope=scope).get(PROFILE_HEADER)
+        if token:
+            return self.verify(scope["method"], scope["path"], token)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def save(self, route: str, request_id: str, elapsed_ms: float, folded: str) -> Path:
+        route_dir = self.directory / route_key(route)
+        route_dir.mkdir(parents=True, exist_ok=True)
+        safe_request_id = route_key(request_id)[:64]
+        path = route_dir / f"{int(time.time() * 1000)}_{int(elapsed_ms)}ms_{safe_request_id}{PROFILE_SUFFIX}"
+        path.write_text(folded)
+
+        # Bounded ring: drop the oldest profiles for this route
+        profiles = sorted(route_dir.glob(f"*{PROFILE_SUFFIX}"))
+        for old in profiles[:-self.max_profiles_per_route]:
+            old.unlink(missing_ok=True)
+        return path
+
+    def list_profiles(self) -> List[dict]:
+        profiles = []
+        if not self.directory.exists():
+            return profiles
+        for route_dir in sorted(self.directory.iterdir()):
+            for path in sorted(route_dir.glob(f"*{PROFILE_SUFFIX}"), reverse=True):
+                captured_ms, duration, request_id = path.stem.split("_", 2)
+                profiles.append({
+                    "route": route_dir.name,
+                    "profile": path.name,
+                    "capturedAt": int(captured_ms) / 1000,
+                    "durationMs": int(duration.rstrip("ms")),
+                    "requestId": request_id,
+                    "bytes": path.stat().st_size
+                })
+        return profiles
+
+    def profile_path(self, route: str, profile: str) -> Optional[Path]:
+        path = (self.directory / route / profile).resolve()
+        if path.parent.parent != self.directory.resolve() or path.suffix != PROFILE_SUFFIX or not path.is_file():
+            return None
+        return path
+
+
+def folded_stacks(session) -> str:
+    """Render a pyinstrument session as folded stacks weighted in microseconds."""
+    lines = []
+
+    def walk(frame, stack):
+        label = frame.function if frame.is_synthetic else f"{frame.function} ({frame.file_path_short}:{frame.line_no})"
+        stack = stack + [label.replace(";", ":")]
+        self_time = frame.time - sum(child.time for child in frame.children)
+        if self_time > 0:
+            lines.append(f"{';'.join(stack)} {max(1, int(self_time * 1_000_000))}")
+        for child in frame.children:
+            walk(child, stack)
+
+    root = session.root_frame()
+    if root is not None:
+        walk(root, [])
+    return "\n".join(lines) + "\n"
+
+
+class ProfilerMiddleware:
+    """Profile selected requests and store their folded stacks per route."""
+
+    def __init__(self, app: ASGIApp, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.profiler.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        from pyinstrument import Profiler
+
+        profiler = Profiler(interval=self.profiler.interval, async_mode="enabled")
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.stop()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            stats = current_query_stats.get()
+            request_id = stats.request_id if stats else "unknown"
+            try:
+                folded = folded_stacks(profiler.last_session)
+                path = await anyio.to_thread.run_sync(
+                    self.profiler.save, route_template(scope), request_id, elapsed_ms, folded
+                )
+                logger.info(f"Profiled {scope['method']} {scope['path']} ({elapsed_ms:.0f}ms) -> {path}")
+            except Exception as e:
+                logger.error(f"Failed to save request profile: {str(e)}")
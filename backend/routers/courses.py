@@ -0,0 +1,529 @@
+"""
+Course Endpoints
+================
+
+Course CRUD, catalog summaries and the lesson content stored in db.lesson_contents.
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, status
+from pymongo import UpdateOne
+import logging
+from pydantic import BaseModel, Field
+from typing import List, Optional, Dict, Any, Tuple
+import uuid
+from datetime import datetime
+import json
+import hashlib
+from core import db
+from routers.auth import UserResponse, get_admin_user, get_current_user
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# =============================================================================
+# COURSE MODELS
+# =============================================================================
+
+class CourseModule(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    title: str
+    lessons: List[dict] = []
+
+class CourseCreate(BaseModel):
+    title: str = Field(..., min_length=1, max_length=200, description="Course title")
+    description: str = Field(..., min_length=1, max_length=2000, description="Course description")
+    category: str = Field(..., min_length=1, max_length=100, description="Course category")
+    duration: Optional[str] = Field(None, max_length=50)
+    thumbnailUrl: Optional[str] = None
+    accessType: Optional[str] = Field("open", pattern="^(open|restricted|invitation)$")
+    learningOutcomes: List[str] = []  # What students will learn
+    modules: List[CourseModule] = []
+    canvaEmbedCode: Optional[str] = None
+    
+class CourseInDB(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    title: str
+    description: str
+    category: str
+    duration: Optional[str] = None
+    thumbnailUrl: Optional[str] = None
+    accessType: str = "open"
+    learningOutcomes: List[str] = []  # What students will learn
+    modules: List[CourseModule] = []
+    canvaEmbedCode: Optional[str] = None
+    totalModules: int = 0  # Precomputed on write for catalog views
+    totalLessons: int = 0
+    instructorId: str
+    instructor: str
+    status: str = "published"  # draft, published, archived
+    enrolledStudents: int = 0
+    rating: float = 4.5
+    reviews: List[dict] = []
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class CourseResponse(BaseModel):
+    id: str
+    title: str
+    description: str
+    category: str
+    duration: Optional[str] = None
+    thumbnailUrl: Optional[str] = None
+    accessType: str
+    learningOutcomes: List[str] = []  # What students will learn
+    modules: List[dict] = []
+    canvaEmbedCode: Optional[str] = None
+    totalModules: int = 0
+    totalLessons: int = 0
+    instructorId: str
+    instructor: str
+    status: str
+    enrolledStudents: int
+    rating: float
+    reviews: List[dict] = []
+    created_at: datetime
+    updated_at: datetime
+
+class CourseSummaryResponse(BaseModel):
+    """Catalog/list view of a course - no lesson bodies, embeds or quiz answer keys."""
+    id: str
+    title: str
+    description: str
+    category: str
+    duration: Optional[str] = None
+    thumbnailUrl: Optional[str] = None
+    accessType: str
+    instructorId: str
+    instructor: str
+    status: str
+    enrolledStudents: int
+    rating: float
+    totalModules: int = 0
+    totalLessons: int = 0
+    created_at: datetime
+    updated_at: datetime
+
+# =============================================================================
+# COURSE MANAGEMENT ENDPOINTS
+# =============================================================================
+
+def compute_course_counts(modules: List[Any]) -> Dict[str, int]:
+    """Module/lesson counts stored on the course document so list views never need the modules tree."""
+    modules = [m.dict() if isinstance(m, BaseModel) else m for m in modules or []]
+    return {
+        "totalModules": len(modules),
+        "totalLessons": sum(len(module.get("lessons") or []) for module in modules)
+    }
+
+# Projection used by catalog/list endpoints. Courses written before the counts were
+# stored fall back to computing them server-side, so the modules tree is never sent.
+COURSE_SUMMARY_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "title": 1,
+    "description": 1,
+    "category": 1,
+    "duration": 1,
+    "thumbnailUrl": 1,
+    "accessType": 1,
+    "instructorId": 1,
+    "instructor": 1,
+    "status": 1,
+    "enrolledStudents": 1,
+    "rating": 1,
+    "created_at": 1,
+    "updated_at": 1,
+    "totalModules": {"$ifNull": ["$totalModules", {"$size": {"$ifNull": ["$modules", []]}}]},
+    "totalLessons": {"$ifNull": ["$totalLessons", {"$sum": {"$map": {
+        "input": {"$ifNull": ["$modules", []]},
+        "in": {"$size": {"$ifNull": ["$$this.lessons", []]}}
+    }}}]}
+}
+
+# Lesson bodies and quiz definitions live in db.lesson_contents keyed by
+# (courseId, lessonId); course documents keep only the lesson outline, flagged
+# with contentExternal. Courses that predate the split still embed everything.
+# The bulky fields move: text/HTML bodies, presentation embed HTML, and quizzes
+# (quiz, or lesson-level questions on older lessons, both with answer keys).
+# Titles, types, durations and video/presentation/document URLs stay on the
+# outline, which lists and progress views read without hydrating.
+LESSON_CONTENT_FIELDS = ("content", "quiz", "questions", "embedCode")
+
+def lesson_content_hash(content: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+def split_lesson_content(modules: List[Any]):
+    """Strip lesson content out of a modules tree.
+    
+    Returns (outline_modules, contents, lesson_ids) where contents maps lessonId to the
+    content fields supplied for it. Outline-only lessons (contentExternal with no content
+    fields) are treated as unchanged and don't appear in contents.
+    """
+    outline_modules = []
+    contents = {}
+    lesson_ids = set()
+    for module in modules or []:
+        module = module.dict() if isinstance(module, BaseModel) else dict(module)
+        outline_lessons = []
+        for lesson in module.get("lessons") or []:
+            lesson_id = lesson.get("id")
+            if not lesson_id or lesson_id in lesson_ids:
+                # No unique key to store it under - keep this lesson embedded
+                outline_lessons.append(lesson)
+                continue
+            lesson_ids.add(lesson_id)
+            content = {field: lesson[field] for field in LESSON_CONTENT_FIELDS if field in lesson}
+            if content or not lesson.get("contentExternal"):
+                contents[lesson_id] = content
+            outline = {k: v for k, v in lesson.items() if k not in LESSON_CONTENT_FIELDS}
+            outline["contentExternal"] = True
+            outline_lessons.append(outline)
+        module["lessons"] = outline_lessons
+        outline_modules.append(module)
+    return outline_modules, contents, lesson_ids
+
+async def save_lesson_contents(course_id: str, contents: Dict[str, Dict[str, Any]], existing_hashes: Optional[Dict[str, str]] = None) -> int:
+    """Upsert lesson content documents whose content changed. Returns the number written."""
+    existing_hashes = existing_hashes or {}
+    now = datetime.utcnow()
+    operations = []
+    for lesson_id, content in contents.items():
+        content_hash = lesson_content_hash(content)
+        if existing_hashes.get(lesson_id) == content_hash:
+            continue
+        update = {
+            "$set": {**content, "contentHash": content_hash, "updated_at": now},
+            "$setOnInsert": {"created_at": now}
+        }
+        # Content fields the lesson no longer has (e.g. quiz after a type change) must
+        # not be merged back in by hydrate_course_lessons
+        removed = [field for field in LESSON_CONTENT_FIELDS if field not in content]
+        if removed:
+            update["$unset"] = dict.fromkeys(removed, "")
+        operations.append(UpdateOne({"courseId": course_id, "lessonId": lesson_id}, update, upsert=True))
+    if operations:
+        await db.lesson_contents.bulk_write(operations, ordered=False)
+    return len(operations)
+
+LESSON_CONTENT_PROJECTION = {"_id": 0, "courseId": 1, "lessonId": 1, **{field: 1 for field in LESSON_CONTENT_FIELDS}}
+
+async def hydrate_course_lessons(course: Optional[dict], lesson_ids: Optional[List[str]] = None) -> Optional[dict]:
+    """Merge externally stored lesson content back into course["modules"] in place.
+    
+    Pass lesson_ids to load only those lessons; by default every lesson is loaded.
+    """
+    if course:
+        await hydrate_courses_lessons([course], lesson_ids)
+    return course
+
+async def hydrate_courses_lessons(courses: List[dict], lesson_ids: Optional[List[str]] = None) -> List[dict]:
+    """Batch form of hydrate_course_lessons - one query for any number of courses."""
+    wanted = set(lesson_ids) if lesson_ids is not None else None
+    external = {}
+    for course in courses:
+        for module in course.get("modules") or []:
+            for lesson in module.get("lessons") or []:
+                if lesson.get("contentExternal") and (wanted is None or lesson.get("id") in wanted):
+                    external[(course["id"], lesson["id"])] = lesson
+    if not external:
+        return courses
+    
+    query = {"courseId": {"$in": list({course_id for course_id, _ in external})}}
+    if wanted is not None:
+        query["lessonId"] = {"$in": list(wanted)}
+    async for doc in db.lesson_contents.find(query, LESSON_CONTENT_PROJECTION):
+        lesson = external.get((doc.pop("courseId"), doc.pop("lessonId")))
+        if lesson is not None:
+            lesson.update(doc)
+    return courses
+
+async def store_course_modules(course_id: str, modules: List[Any]) -> Tuple[List[dict], int]:
+    """Write lesson content for a course, touching only lessons whose content changed.
+    
+    Removes content for lessons no longer in the course. Returns the outline modules
+    to store on the course document and the number of lesson contents written.
+    """
+    outline_modules, contents, lesson_ids = split_lesson_content(modules)
+    existing = await db.lesson_contents.find(
+        {"courseId": course_id}, {"_id": 0, "lessonId": 1, "contentHash": 1}
+    ).to_list(None)
+    existing_hashes = {doc["lessonId"]: doc.get("contentHash") for doc in existing}
+    
+    written = await save_lesson_contents(course_id, contents, existing_hashes)
+    removed = [lesson_id for lesson_id in existing_hashes if lesson_id not in lesson_ids]
+    if removed:
+        await db.lesson_contents.delete_many({"courseId": course_id, "lessonId": {"$in": removed}})
+    logger.debug(f"Course {course_id}: wrote {written} lesson contents, removed {len(removed)}")
+    return outline_modules, written
+
+def find_lesson_in_course(course: dict, lesson_id: str) -> Optional[dict]:
+    for module in course.get("modules") or []:
+        for lesson in module.get("lessons") or []:
+            if lesson.get("id") == lesson_id:
+                return lesson
+    return None
+
+# Just enough of a course to locate lessons and compute progress
+COURSE_OUTLINE_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "title": 1,
+    "totalLessons": 1,
+    "modules.id": 1,
+    "modules.lessons.id": 1,
+    "modules.lessons.type": 1
+}
+
+async def find_course_summaries(query: dict) -> List[dict]:
+    return await db.courses.aggregate([
+        {"$match": query},
+        {"$project": COURSE_SUMMARY_PROJECTION}
+    ]).to_list(1000)
+
+async def get_enrolled_course_ids(user_id: str) -> List[str]:
+    enrollments = await db.enrollments.find({"userId": user_id}, {"courseId": 1}).to_list(1000)
+    return [enrollment['courseId'] for enrollment in enrollments]
+
+@router.post("/courses", response_model=CourseResponse)
+async def create_course(
+    course_data: CourseCreate,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Create a new course."""
+    # Only instructors and admins can create courses
+    if current_user.role not in ['instructor', 'admin']:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only instructors and admins can create courses"
+        )
+    
+    # Create course document
+    course_id = str(uuid.uuid4())
+    outline_modules, contents, _ = split_lesson_content(course_data.modules)
+    course_dict = {
+        "id": course_id,
+        **course_data.dict(),
+        **compute_course_counts(course_data.modules),
+        "instructorId": current_user.id,
+        "instructor": current_user.full_name,
+        "status": "published",
+        "enrolledStudents": 0,
+        "rating": 4.5,
+        "reviews": [],
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow()
+    }
+    
+    # Lesson content goes to its own collection; the course keeps the outline
+    await save_lesson_contents(course_id, contents)
+    await db.courses.insert_one({**course_dict, "modules": outline_modules})
+    
+    return CourseResponse(**course_dict)
+
+@router.get("/courses", response_model=List[CourseResponse])
+async def get_all_courses(current_user: UserResponse = Depends(get_current_user)):
+    """Get all published courses (course catalog)."""
+    courses = await db.courses.find({"status": "published"}).to_list(1000)
+    await hydrate_courses_lessons(courses)
+    return [CourseResponse(**course) for course in courses]
+
+@router.get("/courses/summary", response_model=List[CourseSummaryResponse])
+async def get_all_courses_summary(current_user: UserResponse = Depends(get_current_user)):
+    """Get the course catalog without module/lesson content."""
+    courses = await find_course_summaries({"status": "published"})
+    return [CourseSummaryResponse(**course) for course in courses]
+
+@router.get("/courses/my-courses", response_model=List[CourseResponse])
+async def get_my_courses(current_user: UserResponse = Depends(get_current_user)):
+    """Get courses created by current user or enrolled in."""
+    if current_user.role in ['instructor', 'admin']:
+        # Get courses created by this instructor
+        created_courses = await db.courses.find({"instructorId": current_user.id}).to_list(1000)
+        await hydrate_courses_lessons(created_courses)
+        return [CourseResponse(**course) for course in created_courses]
+    else:
+        # Get courses student is enrolled in
+        course_ids = await get_enrolled_course_ids(current_user.id)
+        
+        if not course_ids:
+            return []
+            
+        enrolled_courses = await db.courses.find({"id": {"$in": course_ids}}).to_list(1000)
+        await hydrate_courses_lessons(enrolled_courses)
+        return [CourseResponse(**course) for course in enrolled_courses]
+
+@router.get("/courses/my-courses/summary", response_model=List[CourseSummaryResponse])
+async def get_my_courses_summary(current_user: UserResponse = Depends(get_current_user)):
+    """Get created or enrolled courses without module/lesson content."""
+    if current_user.role in ['instructor', 'admin']:
+        query = {"instructorId": current_user.id}
+    else:
+        course_ids = await get_enrolled_course_ids(current_user.id)
+        if not course_ids:
+            return []
+        query = {"id": {"$in": course_ids}}
+    
+    courses = await find_course_summaries(query)
+    return [CourseSummaryResponse(**course) for course in courses]
+
+@router.get("/courses/{course_id}", response_model=CourseResponse)
+async def get_course(
+    course_id: str,
+    include_content: bool = True,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Get a specific course by ID. Pass include_content=false for the lesson outline only."""
+    course = await db.courses.find_one({"id": course_id})
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
+        )
+    
+    if include_content:
+        await hydrate_course_lessons(course)
+    return CourseResponse(**course)
+
+@router.get("/courses/{course_id}/lessons/{lesson_id}")
+async def get_course_lesson(
+    course_id: str,
+    lesson_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Get a single lesson with its content and quiz."""
+    course = await db.courses.find_one({"id": course_id}, {"_id": 0, "id": 1, "modules": 1})
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
+        )
+    
+    lesson = find_lesson_in_course(course, lesson_id)
+    if not lesson:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Lesson not found in course"
+        )
+    
+    await hydrate_course_lessons(course, [lesson_id])
+    return lesson
+
+@router.put("/courses/{course_id}", response_model=CourseResponse)
+async def update_course(
+    course_id: str,
+    course_data: CourseCreate,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Update a course (only by course creator or admin)."""
+    # Find the course
+    course = await db.courses.find_one({"id": course_id})
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
+        )
+    
+    # Check permissions
+    if current_user.role != 'admin' and course['instructorId'] != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only edit your own courses"
+        )
+    
+    # Update course - only lessons whose content changed are rewritten
+    update_data = course_data.dict()
+    update_data.update(compute_course_counts(course_data.modules))
+    update_data["modules"], _ = await store_course_modules(course_id, course_data.modules)
+    update_data["updated_at"] = datetime.utcnow()
+    
+    result = await db.courses.update_one(
+        {"id": course_id},
+        {"$set": update_data}
+    )
+    
+    if result.modified_count == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found or no changes made"
+        )
+    
+    # Get updated course
+    updated_course = await db.courses.find_one({"id": course_id})
+    await hydrate_course_lessons(updated_course)
+    return CourseResponse(**updated_course)
+
+@router.delete("/courses/{course_id}")
+async def delete_course(
+    course_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Delete a course (only by course creator or admin)."""
+    # Find the course
+    course = await db.courses.find_one({"id": course_id})
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
+        )
+    
+    # Check permissions
+    if current_user.role != 'admin' and course['instructorId'] != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only delete your own courses"
+        )
+    
+    # Delete all enrollments for this course first
+    enrollment_delete_result = await db.enrollments.delete_many({"courseId": course_id})
+    logger.info(f"Deleted {enrollment_delete_result.deleted_count} enrollments for course {course_id}")
+    
+    # Delete the course and its stored lesson content
+    result = await db.courses.delete_one({"id": course_id})
+    await db.lesson_contents.delete_many({"courseId": course_id})
+    
+    if result.deleted_count == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
+        )
+    
+    return {
+        "message": f"Course '{course['title']}' and {enrollment_delete_result.deleted_count} associated enrollments have been successfully deleted"
+    }
+
+@router.post("/courses/migrate-lesson-content")
+async def migrate_lesson_content(admin_user: UserResponse = Depends(get_admin_user)):
+    """Move embedded lesson content/quizzes out of course documents (admin only).
+    
+    Also moves content fields added to LESSON_CONTENT_FIELDS since a course was
+    split: its stored content is merged back in first, so the rewritten documents
+    keep it.
+    """
+    migrated_courses = 0
+    migrated_lessons = 0
+    
+    # Only courses with at least one embedded lesson or content field left on the outline
+    cursor = db.courses.find(
+        {"modules.lessons": {"$elemMatch": {"$or": [
+            {"contentExternal": {"$ne": True}},
+            *({field: {"$exists": True}} for field in LESSON_CONTENT_FIELDS)
+        ]}}},
+        {"_id": 0, "id": 1, "modules": 1}
+    )
+    async for course in cursor:
+        await hydrate_course_lessons(course)
+        outline_modules, written = await store_course_modules(course["id"], course.get("modules", []))
+        migrated_lessons += written
+        await db.courses.update_one(
+            {"id": course["id"]},
+            {"$set": {"modules": outline_modules, **compute_course_counts(outline_modules)}}
+        )
+        migrated_courses += 1
+    
+    logger.info(f"Lesson content migration: {migrated_courses} courses, {migrated_lessons} lessons")
+    return {
+        "message": "Lesson content migration completed",
+        "migratedCourses": migrated_courses,
+        "migratedLessons": migrated_lessons
+    }
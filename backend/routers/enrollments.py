@@ -0,0 +1,891 @@
+"""
+Enrollment Endpoints
+====================
+
+Enrollments, progress tracking and the completion checks behind them.
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, status
+from pymongo import ReturnDocument
+import logging
+from pydantic import BaseModel, Field
+from typing import List, Optional
+import uuid
+from datetime import datetime
+from core import db, analytics_db, progress_write_buffer
+from attempt_summaries import course_quiz_assessment, passed_assessments
+from routers.auth import UserResponse, get_current_user
+from routers.courses import COURSE_OUTLINE_PROJECTION, hydrate_course_lessons
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# =============================================================================
+# ENROLLMENT MODELS
+# =============================================================================
+
+class EnrollmentCreate(BaseModel):
+    courseId: str
+
+# Progress tracking models
+class LessonProgress(BaseModel):
+    lessonId: str
+    completed: bool = False
+    completedAt: Optional[datetime] = None
+    timeSpent: Optional[int] = 0  # in seconds
+
+class ModuleProgress(BaseModel):
+    moduleId: str
+    lessons: List[LessonProgress] = []
+    completed: bool = False
+    completedAt: Optional[datetime] = None
+
+class EnrollmentResponse(BaseModel):
+    id: str
+    userId: str
+    courseId: str
+    enrolledAt: datetime
+    progress: float = 0.0
+    completedAt: Optional[datetime] = None
+    status: str = "active"  # active, completed, dropped
+    currentModuleId: Optional[str] = None
+    currentLessonId: Optional[str] = None
+    moduleProgress: Optional[List[ModuleProgress]] = None
+    lastAccessedAt: Optional[datetime] = None
+    timeSpent: Optional[int] = None
+
+
+class EnrollmentInDB(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    courseId: str
+    studentId: str
+    courseName: str  # Denormalized for easy access
+    studentName: str  # Denormalized for easy access
+    enrollmentDate: datetime = Field(default_factory=datetime.utcnow)
+    status: str = "active"  # active, completed, dropped, suspended
+    progress: float = 0.0  # 0.0 to 100.0
+    lastAccessedAt: Optional[datetime] = None
+    completedAt: Optional[datetime] = None
+    grade: Optional[str] = None
+    isActive: bool = True
+    enrolledBy: str  # Who enrolled the student (instructor/admin/self)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    enrolledBy: str
+    created_at: datetime
+    updated_at: datetime
+
+class EnrollmentUpdate(BaseModel):
+    status: Optional[str] = None
+    progress: Optional[float] = None
+    lastAccessedAt: Optional[datetime] = None
+    completedAt: Optional[datetime] = None
+    grade: Optional[str] = None
+
+class BulkEnrollmentCreate(BaseModel):
+    courseId: str
+    studentIds: List[str]
+
+
+# =============================================================================
+# ENROLLMENT ENDPOINTS
+# =============================================================================
+
+@router.post("/enrollments", response_model=EnrollmentResponse)
+async def enroll_in_course(
+    enrollment_data: EnrollmentCreate,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Enroll current user in a course."""
+    # Only learners can enroll (instructors manage their own courses)
+    if current_user.role != 'learner':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only students can enroll in courses"
+        )
+    
+    # Check if course exists
+    course = await db.courses.find_one({"id": enrollment_data.courseId})
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
+        )
+    
+    # Check if already enrolled
+    existing_enrollment = await db.enrollments.find_one({
+        "userId": current_user.id,
+        "courseId": enrollment_data.courseId
+    })
+    
+    if existing_enrollment:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You are already enrolled in this course"
+        )
+    
+    # Get course details for response
+    course = await db.courses.find_one({"id": enrollment_data.courseId})
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
+        )
+    
+    # Create enrollment
+    now = datetime.utcnow()
+    enrollment_dict = {
+        "id": str(uuid.uuid4()),
+        "userId": current_user.id,
+        "courseId": enrollment_data.courseId,
+        "studentId": current_user.id,
+        "courseName": course.get("title", "Unknown Course"),
+        "studentName": current_user.full_name,
+        "enrollmentDate": now,
+        "enrolledAt": now,
+        "progress": 0.0,
+        "lastAccessedAt": None,
+        "completedAt": None,
+        "grade": None,
+        "status": "active",
+        "isActive": True,
+        "enrolledBy": current_user.id,
+        "created_at": now,
+        "updated_at": now
+    }
+    
+    await db.enrollments.insert_one(enrollment_dict)
+    
+    # Update course enrollment count
+    await db.courses.update_one(
+        {"id": enrollment_data.courseId},
+        {"$inc": {"enrolledStudents": 1}}
+    )
+    
+    return EnrollmentResponse(**enrollment_dict)
+
+@router.get("/enrollments", response_model=List[EnrollmentResponse])
+async def get_my_enrollments(current_user: UserResponse = Depends(get_current_user)):
+    """Get current user's course enrollments."""
+    enrollments = await db.enrollments.find({"userId": current_user.id}).to_list(1000)
+    return [EnrollmentResponse(**enrollment) for enrollment in enrollments]
+
+@router.get("/admin/enrollments", response_model=List[EnrollmentResponse])
+async def get_all_enrollments_admin(current_user: UserResponse = Depends(get_current_user)):
+    """Get all course enrollments (admin and instructor only) for analytics."""
+    if current_user.role not in ['admin', 'instructor']:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins and instructors can access all enrollments"
+        )
+    
+    # Report read: served from the analytics handle (secondaries first)
+    # For instructors, filter to only their courses
+    if current_user.role == 'instructor':
+        # Get courses created by this instructor
+        instructor_courses = await analytics_db.courses.find({"instructor_id": current_user.id}).to_list(1000)
+        course_ids = [course["id"] for course in instructor_courses]
+        
+        if course_ids:
+            enrollments = await analytics_db.enrollments.find({"courseId": {"$in": course_ids}}).to_list(10000)
+        else:
+            enrollments = []
+    else:
+        # Admin gets all enrollments
+        enrollments = await analytics_db.enrollments.find({}).to_list(10000)
+    
+    return [EnrollmentResponse(**enrollment) for enrollment in enrollments]
+
+@router.delete("/enrollments/{course_id}")
+async def unenroll_from_course(
+    course_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Unenroll from a course."""
+    # Find enrollment
+    enrollment = await db.enrollments.find_one({
+        "userId": current_user.id,
+        "courseId": course_id
+    })
+    
+    if not enrollment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Enrollment not found"
+        )
+    
+    # Delete enrollment
+    await db.enrollments.delete_one({
+        "userId": current_user.id,
+        "courseId": course_id
+    })
+    
+    # Update course enrollment count
+    await db.courses.update_one(
+        {"id": course_id},
+        {"$inc": {"enrolledStudents": -1}}
+    )
+    
+    return {"message": "Successfully unenrolled from course"}
+
+# Progress ceiling while a course still has quizzes to pass
+QUIZ_GATE_MAX_PROGRESS = 95.0
+
+def find_lesson_module_id(course: dict, lesson_id: str) -> Optional[str]:
+    for module in course.get("modules") or []:
+        for lesson in module.get("lessons") or []:
+            if lesson.get("id") == lesson_id:
+                return module.get("id")
+    return None
+
+async def apply_lesson_progress(
+    enrollment_filter: dict,
+    module_id: str,
+    lesson_id: str,
+    completed: bool = False,
+    time_spent: Optional[int] = None
+) -> Optional[dict]:
+    """Atomically update one lesson entry in moduleProgress and return the enrollment.
+    
+    The update only touches the targeted lesson via arrayFilters, so concurrent saves
+    from other tabs can't overwrite each other. Missing module/lesson entries are created
+    on the first event; completedAt keeps the time of the first completion.
+    
+    time_spent is added to the lesson's own timeSpent. The enrollment-level timeSpent is
+    the running total the client reports through PUT /progress and isn't touched here.
+    """
+    now = datetime.utcnow()
+    lesson_path = "moduleProgress.$[m].lessons.$[l]"
+    update = {"$set": {
+        "currentModuleId": module_id,
+        "currentLessonId": lesson_id,
+        "lastAccessedAt": now,
+        "updated_at": now
+    }}
+    array_filters = []
+    if time_spent:
+        update["$inc"] = {f"{lesson_path}.timeSpent": time_spent}
+        array_filters.append({"l.lessonId": lesson_id})
+    if completed:
+        update["$set"]["moduleProgress.$[m].lessons.$[pending].completed"] = True
+        update["$set"]["moduleProgress.$[m].lessons.$[pending].completedAt"] = now
+        array_filters.append({"pending.lessonId": lesson_id, "pending.completed": {"$ne": True}})
+    # MongoDB rejects array filters whose identifier the update doesn't use
+    if array_filters:
+        array_filters.insert(0, {"m.moduleId": module_id})
+    array_filters = array_filters or None
+    
+    # Only match when the lesson entry exists - array updates fail on a missing path
+    entry_filter = {**enrollment_filter, "moduleProgress": {"$elemMatch": {
+        "moduleId": module_id,
+        "lessons.lessonId": lesson_id
+    }}}
+    enrollment = await db.enrollments.find_one_and_update(
+        entry_filter,
+        update,
+        array_filters=array_filters,
+        return_document=ReturnDocument.AFTER
+    )
+    if enrollment:
+        return enrollment
+    
+    # First event for this lesson - create the entries. Each step is guarded, so
+    # racing requests can't push duplicates; they no-op if the enrollment doesn't exist.
+    await db.enrollments.update_one(
+        {**enrollment_filter, "moduleProgress": None},
+        {"$set": {"moduleProgress": []}}
+    )
+    await db.enrollments.update_one(
+        {**enrollment_filter, "moduleProgress.moduleId": {"$ne": module_id}},
+        {"$push": {"moduleProgress": {
+            "moduleId": module_id,
+            "lessons": [],
+            "completed": False,
+            "completedAt": None
+        }}}
+    )
+    await db.enrollments.update_one(
+        {**enrollment_filter, "moduleProgress": {"$elemMatch": {
+            "moduleId": module_id,
+            "lessons.lessonId": {"$ne": lesson_id}
+        }}},
+        {"$push": {"moduleProgress.$.lessons": {
+            "lessonId": lesson_id,
+            "completed": False,
+            "completedAt": None,
+            "timeSpent": 0
+        }}}
+    )
+    return await db.enrollments.find_one_and_update(
+        entry_filter,
+        update,
+        array_filters=array_filters,
+        return_document=ReturnDocument.AFTER
+    )
+
+def collect_quiz_lessons(course: dict) -> List[dict]:
+    """Quiz lessons with questions, in course order."""
+    quiz_lessons = []
+    for module in course.get("modules", []):
+        for lesson in module.get("lessons", []):
+            if lesson.get("type") == "quiz" and lesson.get("quiz") and lesson.get("quiz", {}).get("questions"):
+                quiz_lessons.append({
+                    "lessonId": lesson.get("id"),
+                    "moduleId": module.get("id"),
+                    "title": lesson.get("title"),
+                    "quiz": lesson.get("quiz")
+                })
+    return quiz_lessons
+
+def quiz_lesson_ids(course: dict) -> List[str]:
+    return [
+        lesson.get("id")
+        for module in course.get("modules") or []
+        for lesson in module.get("lessons") or []
+        if lesson.get("type") == "quiz"
+    ]
+
+async def unpassed_quiz_lessons(course_id: str, user_id: str, lesson_ids: Optional[List[str]] = None) -> List[dict]:
+    """Quiz lessons of the course (or just lesson_ids) the user hasn't passed yet."""
+    course = await db.courses.find_one({"id": course_id})
+    if not course:
+        return []
+    wanted = [lesson_id for lesson_id in quiz_lesson_ids(course) if lesson_ids is None or lesson_id in lesson_ids]
+    if not wanted:
+        return []
+    # Only quiz lessons' content is needed here
+    await hydrate_course_lessons(course, wanted)
+    quiz_lessons = [quiz_lesson for quiz_lesson in collect_quiz_lessons(course) if quiz_lesson["lessonId"] in wanted]
+    if not quiz_lessons:
+        return []
+    # From the attempt summaries in one query
+    passed_lessons = set(await passed_assessments(db.attempt_summaries, user_id, [
+        course_quiz_assessment(db.quiz_attempts, course_id, quiz_lesson["lessonId"], quiz_lesson["quiz"])
+        for quiz_lesson in quiz_lessons
+    ]))
+    return [quiz_lesson for quiz_lesson in quiz_lessons if quiz_lesson["lessonId"] not in passed_lessons]
+
+async def refresh_course_progress(course: dict, enrollment_filter: dict, module_id: str, enrollment: Optional[dict] = None):
+    """Recompute progress from completed lessons and precomputed lesson counts.
+    
+    progress only moves forward ($max), so a stale concurrent recompute can't lower it.
+    Returns (enrollment, newly_completed) - newly_completed is True only for the one
+    request that moved the enrollment to "completed". As with PUT /progress, a course
+    whose quizzes aren't all passed isn't completed and its progress stays capped.
+    """
+    if enrollment is None:
+        enrollment = await db.enrollments.find_one(enrollment_filter)
+        if not enrollment:
+            return None, False
+    
+    completed_ids = {
+        lp.get("lessonId")
+        for mp in enrollment.get("moduleProgress") or []
+        for lp in mp.get("lessons") or []
+        if lp.get("completed")
+    }
+    course_lesson_ids = {
+        lesson.get("id")
+        for module in course.get("modules") or []
+        for lesson in module.get("lessons") or []
+    }
+    total_lessons = course.get("totalLessons") or len(course_lesson_ids)
+    progress = round(len(completed_ids & course_lesson_ids) / total_lessons * 100, 2) if total_lessons else 0.0
+    progress = min(100.0, progress)
+    
+    can_complete = True
+    if progress >= 100.0 and enrollment.get("status") != "completed" and quiz_lesson_ids(course):
+        can_complete = not await unpassed_quiz_lessons(course["id"], enrollment["userId"])
+        if not can_complete:
+            progress = QUIZ_GATE_MAX_PROGRESS
+    
+    now = datetime.utcnow()
+    update = {"$max": {"progress": progress}, "$set": {"updated_at": now}}
+    array_filters = None
+    module_lesson_ids = {
+        lesson.get("id")
+        for module in course.get("modules") or [] if module.get("id") == module_id
+        for lesson in module.get("lessons") or []
+    }
+    if module_lesson_ids and module_lesson_ids <= completed_ids:
+        update["$set"]["moduleProgress.$[done].completed"] = True
+        update["$set"]["moduleProgress.$[done].completedAt"] = now
+        array_filters = [{"done.moduleId": module_id, "done.completed": {"$ne": True}}]
+    
+    enrollment = await db.enrollments.find_one_and_update(
+        enrollment_filter,
+        update,
+        array_filters=array_filters,
+        return_document=ReturnDocument.AFTER
+    )
+    
+    if enrollment and can_complete and progress >= 100.0 and enrollment.get("status") != "completed":
+        # Guarded on status so only one request performs the completion transition
+        completed_enrollment = await db.enrollments.find_one_and_update(
+            {**enrollment_filter, "status": {"$ne": "completed"}},
+            {"$set": {"status": "completed", "completedAt": now}},
+            return_document=ReturnDocument.AFTER
+        )
+        if completed_enrollment:
+            return completed_enrollment, True
+    return enrollment, False
+
+async def issue_completion_certificates(current_user: UserResponse, course_id: str, score: float):
+    """Issue the course certificate, plus any program certificates this completion unlocks."""
+    # Check if certificate already exists
+    existing_certificate = await db.certificates.find_one({
+        "studentId": current_user.id,
+        "courseId": course_id,
+        "isActive": True
+    })
+
+    if not existing_certificate:
+        # Get course details for certificate
+        course = await db.courses.find_one({"id": course_id})
+        if course:
+            # Generate certificate
+            certificate_number = f"CERT-{course_id[:8].upper()}-{current_user.id[:8].upper()}-{datetime.utcnow().strftime('%Y%m%d')}"
+            verification_code = str(uuid.uuid4()).replace('-', '').upper()[:12]
+
+            certificate_dict = {
+                "id": str(uuid.uuid4()),
+                "certificateNumber": certificate_number,
+                "studentId": current_user.id,
+                "studentName": current_user.full_name,
+                "studentEmail": current_user.email,
+                "courseId": course_id,
+                "courseName": course.get("title", "Unknown Course"),
+                "programId": None,
+                "programName": None,
+                "type": "completion",
+                "template": "default",
+                "status": "generated",
+                "issueDate": datetime.utcnow(),
+                "expiryDate": None,
+                "grade": "A" if score >= 95 else "B" if score >= 85 else "C",
+                "score": score,
+                "completionDate": datetime.utcnow(),
+                "certificateUrl": None,
+                "issuedBy": "system",
+                "issuedByName": "LearningFwiend System",
+                "verificationCode": verification_code,
+                "isActive": True,
+                "created_at": datetime.utcnow(),
+                "updated_at": datetime.utcnow()
+            }
+
+            await db.certificates.insert_one(certificate_dict)
+
+    # **PROGRAM COMPLETION DETECTION**: Check if user has completed all courses in any programs
+    # This fixes the missing program certificate generation logic
+    # Find all programs that contain this course
+    programs_with_course = await db.programs.find({
+        "courseIds": course_id,
+        "isActive": True
+    }).to_list(1000)
+
+    for program in programs_with_course:
+        # Check if user has completed ALL courses in this program
+        program_course_ids = program.get("courseIds", [])
+        if not program_course_ids:
+            continue
+
+        # Get all user's enrollments for courses in this program
+        user_program_enrollments = await db.enrollments.find({
+            "userId": current_user.id,
+            "courseId": {"$in": program_course_ids}
+        }).to_list(1000)
+
+        # Check if all program courses are completed (100% progress)
+        completed_courses = [e for e in user_program_enrollments if e.get("progress", 0) >= 100.0]
+
+        if len(completed_courses) >= len(program_course_ids):
+            # User has completed all courses in this program!
+            # Check if program certificate already exists
+            existing_program_cert = await db.certificates.find_one({
+                "studentId": current_user.id,
+                "programId": program["id"],
+                "isActive": True
+            })
+
+            if not existing_program_cert:
+                # Generate program completion certificate
+                program_cert_number = f"PROG-{program['id'][:8].upper()}-{current_user.id[:8].upper()}-{datetime.utcnow().strftime('%Y%m%d')}"
+                program_verification_code = str(uuid.uuid4()).replace('-', '').upper()[:12]
+
+                # Calculate overall program score (average of all course scores)
+                total_score = sum(e.get("progress", 0) for e in completed_courses)
+                program_score = total_score / len(completed_courses) if completed_courses else 100.0
+
+                program_certificate_dict = {
+                    "id": str(uuid.uuid4()),
+                    "certificateNumber": program_cert_number,
+                    "studentId": current_user.id,
+                    "studentName": current_user.full_name,
+                    "studentEmail": current_user.email,
+                    "courseId": None,
+                    "courseName": None,
+                    "programId": program["id"],
+                    "programName": program.get("title", "Unknown Program"),
+                    "type": "program_completion",
+                    "template": "program",
+                    "status": "generated",
+                    "issueDate": datetime.utcnow(),
+                    "expiryDate": None,
+                    "grade": "A" if program_score >= 95 else "B" if program_score >= 85 else "C",
+                    "score": program_score,
+                    "completionDate": datetime.utcnow(),
+                    "certificateUrl": None,
+                    "issuedBy": "system",
+                    "issuedByName": "LearningFriend System",
+                    "verificationCode": program_verification_code,
+                    "isActive": True,
+                    "created_at": datetime.utcnow(),
+                    "updated_at": datetime.utcnow()
+                }
+
+                await db.certificates.insert_one(program_certificate_dict)
+                logger.info(f"Generated program completion certificate for user {current_user.id}, program {program['id']}")
+
+class EnrollmentProgressUpdate(BaseModel):
+    progress: Optional[float] = None  # Overall progress percentage (0-100)
+    currentModuleId: Optional[str] = None
+    currentLessonId: Optional[str] = None
+    moduleProgress: Optional[List[ModuleProgress]] = None
+    lastAccessedAt: Optional[datetime] = None
+    timeSpent: Optional[int] = None  # Total time spent in seconds
+    markQuizCompleted: Optional[bool] = None  # Flag to mark quiz lesson as completed
+
+    def is_heartbeat(self) -> bool:
+        """True when the update can't change completion state and may be write-behind."""
+        return (
+            self.progress is None
+            and self.moduleProgress is None
+            and not self.markQuizCompleted
+        )
+
+def is_lesson_marked_complete(enrollment: dict, lesson_id: str) -> bool:
+    for module_prog in enrollment.get("moduleProgress") or []:
+        for lesson_prog in module_prog.get("lessons", []):
+            if lesson_prog.get("lessonId") == lesson_id and lesson_prog.get("completed"):
+                return True
+    return False
+
+def count_completed_lessons(enrollment: dict) -> int:
+    return sum(
+        len([l for l in mp.get("lessons", []) if l.get("completed")])
+        for mp in enrollment.get("moduleProgress") or []
+    )
+
+@router.put("/enrollments/{course_id}/progress", response_model=EnrollmentResponse)
+async def update_enrollment_progress(
+    course_id: str,
+    progress_data: EnrollmentProgressUpdate,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Update progress for a course enrollment."""
+    # Find the enrollment
+    enrollment = await db.enrollments.find_one({
+        "userId": current_user.id,
+        "courseId": course_id
+    })
+    
+    if not enrollment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Enrollment not found"
+        )
+    
+    buffer_key = (current_user.id, course_id)
+    if progress_data.is_heartbeat():
+        # Position/time heartbeats are coalesced and flushed in batches
+        heartbeat = {
+            "lastAccessedAt": progress_data.lastAccessedAt or datetime.utcnow(),
+            "updated_at": datetime.utcnow()
+        }
+        if progress_data.currentModuleId is not None:
+            heartbeat["currentModuleId"] = progress_data.currentModuleId
+        if progress_data.currentLessonId is not None:
+            heartbeat["currentLessonId"] = progress_data.currentLessonId
+        if progress_data.timeSpent is not None:
+            heartbeat["timeSpent"] = progress_data.timeSpent
+        progress_write_buffer.add(buffer_key, {"userId": current_user.id, "courseId": course_id}, heartbeat)
+        return EnrollmentResponse(**{**enrollment, **progress_write_buffer.pending(buffer_key)})
+    
+    # Get course details to check for quiz lessons
+    course = await db.courses.find_one({"id": course_id})
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
+        )
+    
+    # Prepare update data
+    update_data = {"updated_at": datetime.utcnow()}
+    
+    if progress_data.progress is not None:
+        # **COURSE COMPLETION FIX**: Validate quiz completion before allowing 100% progress
+        if progress_data.progress >= 100.0:
+            # Only quiz lessons' content is needed here
+            await hydrate_course_lessons(course, [
+                lesson.get("id")
+                for module in course.get("modules", [])
+                for lesson in module.get("lessons", [])
+                if lesson.get("type") == "quiz"
+            ])
+            
+            # Check if course has quiz lessons
+            quiz_lessons = collect_quiz_lessons(course)
+            
+            if quiz_lessons:
+                # Verify all quiz lessons have been passed, from the attempt summaries in one query
+                passed_lessons = set(await passed_assessments(db.attempt_summaries, current_user.id, [
+                    course_quiz_assessment(db.quiz_attempts, course_id, quiz_lesson["lessonId"], quiz_lesson["quiz"])
+                    for quiz_lesson in quiz_lessons
+                ]))
+                for quiz_lesson in quiz_lessons:
+                    if quiz_lesson["lessonId"] not in passed_lessons:
+                        # **TEMPORARY DEBUG**: Check if lesson is marked completed in enrollment progress
+                        lesson_marked_complete = is_lesson_marked_complete(enrollment, quiz_lesson["lessonId"])
+                        
+                        if lesson_marked_complete:
+                            logger.debug(f"Quiz lesson {quiz_lesson['title']} marked as completed in moduleProgress; allowing progress update without a passing attempt")
+                        else:
+                            # Calculate actual progress without allowing 100%
+                            total_lessons = sum(len(module.get("lessons", [])) for module in course.get("modules", []))
+                            completed_lessons = count_completed_lessons(enrollment)
+                            
+                            # Cap progress at 95% if quizzes are not completed
+                            max_allowed_progress = min(QUIZ_GATE_MAX_PROGRESS, (completed_lessons / total_lessons * 100) if total_lessons > 0 else 0)
+                            
+                            logger.debug(f"Blocking progress update: quiz {quiz_lesson['title']} not passed and lesson not marked complete")
+                            raise HTTPException(
+                                status_code=status.HTTP_400_BAD_REQUEST,
+                                detail=f"Cannot complete course. You must take and pass the quiz '{quiz_lesson['title']}' before completing the course. Current progress capped at {max_allowed_progress:.1f}%"
+                            )
+        
+        update_data["progress"] = min(100.0, max(0.0, progress_data.progress))
+        
+        # Mark as completed if progress reaches 100% (and all validations passed)
+        if progress_data.progress >= 100.0:
+            update_data["status"] = "completed"
+            update_data["completedAt"] = datetime.utcnow()
+    
+    if progress_data.currentModuleId is not None:
+        update_data["currentModuleId"] = progress_data.currentModuleId
+    
+    if progress_data.currentLessonId is not None:
+        update_data["currentLessonId"] = progress_data.currentLessonId
+    
+    if progress_data.moduleProgress is not None:
+        # Convert Pydantic models to dict for storage
+        update_data["moduleProgress"] = [
+            module.dict() for module in progress_data.moduleProgress
+        ]
+    
+    if progress_data.lastAccessedAt is not None:
+        update_data["lastAccessedAt"] = progress_data.lastAccessedAt
+    else:
+        update_data["lastAccessedAt"] = datetime.utcnow()
+    
+    if progress_data.timeSpent is not None:
+        update_data["timeSpent"] = progress_data.timeSpent
+    
+    # Update the enrollment - written through, carrying any buffered heartbeat fields
+    update_data = {**progress_write_buffer.take(buffer_key), **update_data}
+    result = await db.enrollments.update_one(
+        {"userId": current_user.id, "courseId": course_id},
+        {"$set": update_data}
+    )
+    
+    # **QUIZ PROGRESSION FIX**: Handle quiz lesson completion for multi-quiz progression
+    if progress_data.markQuizCompleted and progress_data.currentLessonId:
+        lesson_module_id = find_lesson_module_id(course, progress_data.currentLessonId)
+        if lesson_module_id:
+            await apply_lesson_progress(
+                {"userId": current_user.id, "courseId": course_id},
+                lesson_module_id,
+                progress_data.currentLessonId,
+                completed=True
+            )
+            _, newly_completed = await refresh_course_progress(
+                course, {"userId": current_user.id, "courseId": course_id}, lesson_module_id
+            )
+            if newly_completed and not (progress_data.progress is not None and progress_data.progress >= 100.0):
+                await issue_completion_certificates(current_user, course_id, 100.0)
+            logger.info(f"Quiz lesson {progress_data.currentLessonId} marked as completed for user {current_user.id}")
+    
+    # Fetch updated enrollment
+    updated_enrollment = await db.enrollments.find_one({
+        "userId": current_user.id,
+        "courseId": course_id
+    })
+    
+    # Auto-generate certificates when course is completed (100% progress)
+    if progress_data.progress is not None and progress_data.progress >= 100.0:
+        await issue_completion_certificates(current_user, course_id, progress_data.progress)
+    
+    return EnrollmentResponse(**updated_enrollment)
+
+class LessonProgressUpdate(BaseModel):
+    completed: Optional[bool] = None  # Lessons can only be marked complete, never un-completed
+    timeSpent: Optional[int] = None  # Seconds to add to the lesson's time spent (not the enrollment total)
+
+@router.post("/enrollments/{course_id}/lessons/{lesson_id}/progress", response_model=EnrollmentResponse)
+async def update_lesson_progress(
+    course_id: str,
+    lesson_id: str,
+    progress_data: LessonProgressUpdate,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Update progress for a single lesson; overall course progress is computed server-side."""
+    course = await db.courses.find_one({"id": course_id}, COURSE_OUTLINE_PROJECTION)
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
+        )
+    
+    module_id = find_lesson_module_id(course, lesson_id)
+    if not module_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Lesson not found in course"
+        )
+    
+    if progress_data.completed and lesson_id in quiz_lesson_ids(course):
+        unpassed = await unpassed_quiz_lessons(course_id, current_user.id, [lesson_id])
+        if unpassed:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"You must take and pass the quiz '{unpassed[0]['title']}' before marking it as complete"
+            )
+    
+    enrollment_filter = {"userId": current_user.id, "courseId": course_id}
+    buffered = progress_write_buffer.take((current_user.id, course_id))
+    if buffered:
+        # Land queued heartbeat fields first so they can't overwrite this update later
+        await db.enrollments.update_one(enrollment_filter, {"$set": buffered})
+    enrollment = await apply_lesson_progress(
+        enrollment_filter,
+        module_id,
+        lesson_id,
+        completed=bool(progress_data.completed),
+        time_spent=progress_data.timeSpent
+    )
+    if not enrollment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Enrollment not found"
+        )
+    
+    if progress_data.completed:
+        enrollment, newly_completed = await refresh_course_progress(course, enrollment_filter, module_id, enrollment)
+        if newly_completed:
+            await issue_completion_certificates(current_user, course_id, enrollment.get("progress", 100.0))
+    
+    return EnrollmentResponse(**enrollment)
+
+@router.post("/enrollments/{enrollment_id}/migrate-progress")
+async def migrate_enrollment_progress(
+    enrollment_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Migrate existing enrollment to new progress tracking system."""
+    # Find the enrollment
+    enrollment = await db.enrollments.find_one({
+        "id": enrollment_id,
+        "userId": current_user.id
+    })
+    
+    if not enrollment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Enrollment not found"
+        )
+    
+    # Get the course to understand structure
+    course = await db.courses.find_one({"id": enrollment["courseId"]})
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
+        )
+    
+    # Initialize moduleProgress if it doesn't exist
+    if "moduleProgress" not in enrollment or not enrollment["moduleProgress"]:
+        module_progress = []
+        
+        for module in course.get("modules", []):
+            if module.get("lessons"):
+                lesson_progress = []
+                for lesson in module["lessons"]:
+                    lesson_progress.append({
+                        "lessonId": lesson["id"],
+                        "completed": False,
+                        "completedAt": None,
+                        "timeSpent": 0
+                    })
+                
+                module_progress.append({
+                    "moduleId": module["id"],
+                    "lessons": lesson_progress,
+                    "completed": False,
+                    "completedAt": None
+                })
+        
+        # Update enrollment with new progress structure
+        await db.enrollments.update_one(
+            {"id": enrollment_id},
+            {
+                "$set": {
+                    "moduleProgress": module_progress,
+                    "progress": 0.0,
+                    "updated_at": datetime.utcnow()
+                }
+            }
+        )
+        
+        return {
+            "message": "Enrollment migrated to new progress tracking system",
+            "totalLessons": sum(len(m.get("lessons", [])) for m in course.get("modules", [])),
+            "moduleCount": len(course.get("modules", []))
+        }
+    
+    return {"message": "Enrollment already has progress tracking structure"}
+
+@router.post("/enrollments/cleanup-orphaned")
+async def cleanup_orphaned_enrollments(current_user: UserResponse = Depends(get_current_user)):
+    """Clean up enrollment records that reference non-existent courses (admin only)."""
+    if current_user.role != 'admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can cleanup orphaned enrollments"
+        )
+    
+    # Get all enrollments
+    all_enrollments = await db.enrollments.find({}).to_list(10000)
+    
+    # Get all valid course IDs
+    all_courses = await db.courses.find({}).to_list(10000)
+    valid_course_ids = {course["id"] for course in all_courses}
+    
+    # Find orphaned enrollments
+    orphaned_enrollments = []
+    for enrollment in all_enrollments:
+        if enrollment["courseId"] not in valid_course_ids:
+            orphaned_enrollments.append(enrollment)
+    
+    # Delete orphaned enrollments
+    deleted_count = 0
+    for enrollment in orphaned_enrollments:
+        await db.enrollments.delete_one({"id": enrollment["id"]})
+        deleted_count += 1
+    
+    return {
+        "message": f"Successfully cleaned up {deleted_count} orphaned enrollment records",
+        "deletedCount": deleted_count,
+        "orphanedCourseIds": list(set(e["courseId"] for e in orphaned_enrollments))
+    }
@@ -0,0 +1,85 @@
+"""
+Export Endpoints
+================
+
+Streamed CSV and NDJSON exports of attempts, enrollments, submissions and
+certificates for reporting.
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi.responses import StreamingResponse
+import logging
+from datetime import datetime
+from typing import Optional
+from core import analytics_db
+from exports import EXPORTS, FORMATS, export_match, instructor_match, stream_export
+from routers.auth import UserResponse, get_current_user
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# =============================================================================
+# EXPORT ENDPOINTS
+# =============================================================================
+
+@router.get("/exports/{dataset}")
+async def export_dataset(
+    dataset: str,
+    export_format: str = Query("csv", alias="format"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    student_id: Optional[str] = Query(None, alias="studentId"),
+    course_id: Optional[str] = Query(None, alias="courseId"),
+    lesson_id: Optional[str] = Query(None, alias="lessonId"),
+    quiz_id: Optional[str] = Query(None, alias="quizId"),
+    test_id: Optional[str] = Query(None, alias="testId"),
+    program_id: Optional[str] = Query(None, alias="programId"),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Stream a dataset as CSV or NDJSON, filtered by entity ids and a [start, end) date range.
+
+    Datasets: quiz-attempts, final-test-attempts, enrollments, submissions, certificates.
+    Instructors get the rows of their own courses and programs only.
+    """
+    if current_user.role not in ['admin', 'instructor']:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins and instructors can export reports"
+        )
+    spec = EXPORTS.get(dataset)
+    if spec is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown export '{dataset}'; available: {', '.join(EXPORTS)}"
+        )
+    if export_format not in FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format '{export_format}'; use one of: {', '.join(FORMATS)}"
+        )
+
+    filters = {
+        "studentId": student_id, "courseId": course_id, "lessonId": lesson_id, "quizId": quiz_id,
+        "testId": test_id, "programId": program_id, "status": status_filter
+    }
+    unsupported = [name for name, value in filters.items() if value is not None and name not in spec.filters]
+    if unsupported:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The {dataset} export can't be filtered by {', '.join(unsupported)}"
+        )
+    match = export_match(spec, filters, start, end)
+
+    if current_user.role == 'instructor':
+        # Combined with the filters above, so a course or program filter can only narrow it
+        match = {"$and": [match, await instructor_match(analytics_db, spec, current_user.id)]}
+
+    # Report read: served from the analytics handle (secondaries first)
+    stamp = datetime.utcnow().strftime("%Y%m%d")
+    return StreamingResponse(
+        stream_export(analytics_db, spec, match, export_format),
+        media_type=FORMATS[export_format],
+        headers={"Content-Disposition": f"attachment; filename={dataset}_{stamp}.{export_format}"}
+    )
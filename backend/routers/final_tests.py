@@ -0,0 +1,964 @@
+"""
+Final Test Endpoints
+====================
+
+Program-level final tests and their attempts.
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, status
+import logging
+from pydantic import BaseModel, Field
+from typing import List, Optional, Dict, Any
+import uuid
+from datetime import datetime
+from core import db, assessment_cache
+from assessment_cache import attempt_seed
+from attempt_review import question_results_at_submit, review_answers
+from attempt_summaries import final_test_assessment, get_summary, record_attempt_result, release_attempt, reserve_attempt
+from grading_queue import insert_submissions, submission_id
+from item_analysis import add_attempt, analyse, item_scores, selected_options
+from routers.auth import UserResponse, get_current_user
+from routers.quizzes import QuestionCreate, QuestionInDB, QuestionResponse, drawn_points, learner_assessment_response
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# =============================================================================
+# FINAL TEST MODELS (PROGRAM-LEVEL TESTS)
+# =============================================================================
+
+class FinalTestCreate(BaseModel):
+    title: str = Field(..., min_length=1, max_length=200, description="Final test title")
+    description: Optional[str] = Field(None, max_length=1000)
+    programId: str = Field(..., description="Program ID this test belongs to")
+    questions: List[QuestionCreate] = Field(default=[], description="Test questions (can be empty for initial creation)")
+    timeLimit: Optional[int] = Field(None, ge=1, le=480, description="Time limit in minutes (1-480)")
+    maxAttempts: int = Field(2, ge=1, le=5, description="Maximum attempts allowed (1-5)")
+    passingScore: float = Field(75.0, ge=0.0, le=100.0, description="Passing score percentage")
+    shuffleQuestions: bool = False
+    questionsPerAttempt: Optional[int] = Field(None, ge=1, description="Questions drawn from the pool per attempt (all when unset)")
+    showResults: bool = True
+    isPublished: bool = False
+
+class FinalTestInDB(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    title: str
+    description: Optional[str] = None
+    programId: str
+    programName: Optional[str] = None  # Denormalized
+    questions: List[QuestionInDB]
+    timeLimit: Optional[int] = None
+    maxAttempts: int
+    passingScore: float
+    shuffleQuestions: bool
+    questionsPerAttempt: Optional[int] = None
+    showResults: bool
+    isPublished: bool
+    totalPoints: int = 0  # Calculated field
+    questionCount: int = 0  # Calculated field
+    createdBy: str
+    createdByName: str  # Denormalized
+    isActive: bool = True
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class FinalTestResponse(BaseModel):
+    id: str
+    title: str
+    description: Optional[str] = None
+    programId: str
+    programName: Optional[str] = None
+    timeLimit: Optional[int] = None
+    maxAttempts: int
+    passingScore: float
+    shuffleQuestions: bool
+    questionsPerAttempt: Optional[int] = None
+    showResults: bool
+    isPublished: bool
+    totalPoints: int
+    questionCount: int
+    createdBy: str
+    createdByName: str
+    isActive: bool
+    created_at: datetime
+    updated_at: datetime
+
+class FinalTestWithQuestionsResponse(FinalTestResponse):
+    questions: List[QuestionResponse]
+
+class FinalTestUpdate(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    timeLimit: Optional[int] = None
+    maxAttempts: Optional[int] = None
+    passingScore: Optional[float] = None
+    shuffleQuestions: Optional[bool] = None
+    questionsPerAttempt: Optional[int] = Field(None, ge=1)
+    showResults: Optional[bool] = None
+    isPublished: Optional[bool] = None
+
+class FinalTestAttemptCreate(BaseModel):
+    testId: str
+    programId: Optional[str] = None
+    answers: List[Dict[str, Any]] = Field(..., description="Student answers with questionId and answer fields")
+    timeSpent: Optional[int] = None  # Time spent in seconds
+
+class FinalTestAttemptInDB(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    testId: str
+    testTitle: str  # Denormalized
+    programId: str  # Denormalized
+    programName: str  # Denormalized
+    studentId: str
+    studentName: str  # Denormalized
+    answers: List[Dict[str, Any]]  # Student answers with questionId and answer
+    score: float = 0.0  # Percentage
+    pointsEarned: int = 0
+    totalPoints: int = 0
+    isPassed: bool = False
+    timeSpent: Optional[int] = None  # Seconds
+    startedAt: datetime = Field(default_factory=datetime.utcnow)
+    completedAt: Optional[datetime] = None
+    attemptNumber: int = 1
+    status: str = "completed"  # in_progress, completed, timed_out
+    isActive: bool = True
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class FinalTestAttemptResponse(BaseModel):
+    id: str
+    testId: str
+    testTitle: str
+    programId: str
+    programName: str
+    studentId: str
+    studentName: str
+    score: float
+    pointsEarned: int
+    totalPoints: int
+    isPassed: bool
+    timeSpent: Optional[int] = None
+    startedAt: datetime
+    completedAt: Optional[datetime] = None
+    attemptNumber: int
+    status: str
+    isActive: bool
+    created_at: datetime
+
+class FinalTestAttemptWithAnswersResponse(FinalTestAttemptResponse):
+    answers: List[Dict[str, Any]]
+
+
+# =============================================================================
+# FINAL TEST ENDPOINTS (PROGRAM-LEVEL TESTS)
+# =============================================================================
+
+@router.post("/final-tests", response_model=FinalTestWithQuestionsResponse)
+async def create_final_test(
+    test_data: FinalTestCreate,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Create a new final test (instructors and admins only)."""
+    if current_user.role not in ['instructor', 'admin']:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only instructors and admins can create final tests"
+        )
+    
+    # Verify program exists
+    program = await db.programs.find_one({"id": test_data.programId})
+    if not program:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Specified program not found"
+        )
+    
+    # Check if user has permission to create tests for this program
+    if (current_user.role != 'admin' and 
+        program.get('instructorId') != current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only create tests for your own programs"
+        )
+    
+    # Process questions and calculate totals
+    questions_data = []
+    total_points = 0
+    for q_data in test_data.questions:
+        question_dict = q_data.dict()
+        question_dict['id'] = str(uuid.uuid4())
+        question_dict['created_at'] = datetime.utcnow()
+        questions_data.append(QuestionInDB(**question_dict))
+        total_points += q_data.points
+    
+    # Create final test dictionary
+    test_dict = {
+        "id": str(uuid.uuid4()),
+        **test_data.dict(exclude={'questions'}),
+        "programName": program.get('title', 'Unknown Program'),
+        "questions": [q.dict() for q in questions_data],
+        "totalPoints": total_points,
+        "questionCount": len(questions_data),
+        "createdBy": current_user.id,
+        "createdByName": current_user.full_name,
+        "isActive": True,
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow()
+    }
+    
+    # Insert test into database
+    await db.final_tests.insert_one(test_dict)
+    
+    return FinalTestWithQuestionsResponse(**{
+        **test_dict,
+        "questions": [QuestionResponse(**q.dict()) for q in questions_data]
+    })
+
+@router.get("/final-tests", response_model=List[FinalTestResponse])
+async def get_all_final_tests(
+    current_user: UserResponse = Depends(get_current_user),
+    program_id: Optional[str] = None,
+    published_only: bool = True
+):
+    """Get all final tests with optional filtering."""
+    
+    # Base query
+    query = {"isActive": True}
+    
+    # Add program filter if specified
+    if program_id:
+        query["programId"] = program_id
+    
+    # Role-based filtering
+    if current_user.role == 'learner':
+        # Students can only see published tests
+        query["isPublished"] = True
+    elif current_user.role == 'instructor' and published_only:
+        # Instructors can see published tests for all programs, or all tests for their programs
+        instructor_programs = await db.programs.find({"instructorId": current_user.id}).to_list(1000)
+        instructor_program_ids = [p['id'] for p in instructor_programs]
+        
+        query = {
+            "$and": [
+                query,
+                {
+                    "$or": [
+                        {"isPublished": True},
+                        {"programId": {"$in": instructor_program_ids}}
+                    ]
+                }
+            ]
+        }
+    # Admins can see all tests regardless of published status
+    
+    tests = await db.final_tests.find(query).sort("created_at", -1).to_list(1000)
+    
+    # Convert to response objects with proper field mapping
+    response_tests = []
+    for test in tests:
+        # Get program name if programId exists
+        program_name = None
+        if test.get('programId'):
+            program = await db.programs.find_one({"id": test['programId']})
+            if program:
+                program_name = program.get('title', 'Unknown Program')
+        
+        response_test = FinalTestResponse(
+            id=test['id'],
+            title=test['title'],
+            description=test.get('description'),
+            programId=test.get('programId', ''),
+            programName=program_name,
+            timeLimit=test.get('timeLimit'),
+            maxAttempts=test.get('maxAttempts', 2),
+            passingScore=test.get('passingScore', 75.0),
+            shuffleQuestions=test.get('shuffleQuestions', False),
+            questionsPerAttempt=test.get('questionsPerAttempt'),
+            showResults=test.get('showResults', True),
+            isPublished=test.get('isPublished', True),
+            totalPoints=test.get('totalPoints', 0),
+            questionCount=len(test.get('questions', [])),
+            createdBy=test.get('createdBy', ''),
+            createdByName=test.get('createdByName', 'Unknown'),
+            isActive=test.get('isActive', True),
+            created_at=test.get('created_at', datetime.utcnow()),
+            updated_at=test.get('updated_at', datetime.utcnow())
+        )
+        response_tests.append(response_test)
+    
+    return response_tests
+
+@router.get("/final-tests/my-tests", response_model=List[FinalTestResponse])
+async def get_my_final_tests(current_user: UserResponse = Depends(get_current_user)):
+    """Get final tests created by current user."""
+    if current_user.role not in ['instructor', 'admin']:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only instructors and admins can access test management"
+        )
+    
+    tests = await db.final_tests.find({
+        "createdBy": current_user.id,
+        "isActive": True
+    }).sort("created_at", -1).to_list(1000)
+    
+    # Convert to response objects with proper field mapping
+    response_tests = []
+    for test in tests:
+        # Get program name if programId exists
+        program_name = None
+        if test.get('programId'):
+            program = await db.programs.find_one({"id": test['programId']})
+            if program:
+                program_name = program.get('title', 'Unknown Program')
+        
+        response_test = FinalTestResponse(
+            id=test['id'],
+            title=test['title'],
+            description=test.get('description'),
+            programId=test.get('programId', ''),
+            programName=program_name,
+            timeLimit=test.get('timeLimit'),
+            maxAttempts=test.get('maxAttempts', 2),
+            passingScore=test.get('passingScore', 75.0),
+            shuffleQuestions=test.get('shuffleQuestions', False),
+            questionsPerAttempt=test.get('questionsPerAttempt'),
+            showResults=test.get('showResults', True),
+            isPublished=test.get('isPublished', True),
+            totalPoints=test.get('totalPoints', 0),
+            questionCount=len(test.get('questions', [])),
+            createdBy=test.get('createdBy', ''),
+            createdByName=test.get('createdByName', 'Unknown'),
+            isActive=test.get('isActive', True),
+            created_at=test.get('created_at', datetime.utcnow()),
+            updated_at=test.get('updated_at', datetime.utcnow())
+        )
+        response_tests.append(response_test)
+    
+    return response_tests
+
+@router.get("/final-tests/{test_id}", response_model=FinalTestWithQuestionsResponse)
+async def get_final_test(
+    test_id: str,
+    current_user: UserResponse = Depends(get_current_user),
+    include_answers: bool = False
+):
+    """Get a specific final test by ID."""
+    compiled = await assessment_cache.get(db.final_tests, test_id)
+    test = compiled.document if compiled else None
+    if not test or not test.get('isActive', True):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Final test not found"
+        )
+    
+    # Check access permissions
+    if current_user.role == 'learner' and not test.get('isPublished', False):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Test is not published"
+        )
+    
+    # Check if instructor can access (own tests or published tests)
+    if (current_user.role == 'instructor' and 
+        test['createdBy'] != current_user.id and 
+        not test.get('isPublished', False)):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only access your own tests or published tests"
+        )
+    
+    # Learners get the questions of their next attempt, without answers or explanations
+    if current_user.role == 'learner':
+        seed = 0
+        if compiled.is_randomized:
+            summary = await get_summary(db.attempt_summaries, current_user.id, final_test_assessment(db.final_test_attempts, test))
+            seed = attempt_seed(test_id, current_user.id, (summary or {}).get("attemptCount", 0) + 1)
+        return learner_assessment_response(compiled, FinalTestResponse, seed)
+    
+    return FinalTestWithQuestionsResponse(**{
+        **test,
+        "questions": [QuestionResponse(**question) for question in test['questions']]
+    })
+
+@router.put("/final-tests/{test_id}", response_model=FinalTestResponse)
+async def update_final_test(
+    test_id: str,
+    test_data: FinalTestUpdate,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Update a final test (only by test creator or admin)."""
+    # Find the test
+    test = await db.final_tests.find_one({"id": test_id, "isActive": True})
+    if not test:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Final test not found"
+        )
+    
+    # Check permissions
+    if current_user.role != 'admin' and test['createdBy'] != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only edit your own tests"
+        )
+    
+    # Check if test has attempts
+    attempt_count = await db.final_test_attempts.count_documents({"testId": test_id, "isActive": True})
+    if attempt_count > 0 and test_data.passingScore is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot modify passing score - test has {attempt_count} student attempt(s)"
+        )
+    
+    # Update test
+    update_data = {k: v for k, v in test_data.dict().items() if v is not None}
+    update_data["updated_at"] = datetime.utcnow()
+    
+    result = await db.final_tests.update_one(
+        {"id": test_id},
+        {"$set": update_data}
+    )
+    assessment_cache.invalidate(db.final_tests, test_id)
+    
+    if result.modified_count == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Final test not found or no changes made"
+        )
+    
+    # Get updated test
+    updated_test = await db.final_tests.find_one({"id": test_id})
+    
+    # Convert to response object with proper field mapping
+    program_name = None
+    if updated_test.get('programId'):
+        program = await db.programs.find_one({"id": updated_test['programId']})
+        if program:
+            program_name = program.get('title', 'Unknown Program')
+    
+    return FinalTestResponse(
+        id=updated_test['id'],
+        title=updated_test['title'],
+        description=updated_test.get('description'),
+        programId=updated_test.get('programId', ''),
+        programName=program_name,
+        timeLimit=updated_test.get('timeLimit'),
+        maxAttempts=updated_test.get('maxAttempts', 2),
+        passingScore=updated_test.get('passingScore', 75.0),
+        shuffleQuestions=updated_test.get('shuffleQuestions', False),
+        questionsPerAttempt=updated_test.get('questionsPerAttempt'),
+        showResults=updated_test.get('showResults', True),
+        isPublished=updated_test.get('isPublished', True),
+        totalPoints=updated_test.get('totalPoints', 0),
+        questionCount=len(updated_test.get('questions', [])),
+        createdBy=updated_test.get('createdBy', ''),
+        createdByName=updated_test.get('createdByName', 'Unknown'),
+        isActive=updated_test.get('isActive', True),
+        created_at=updated_test.get('created_at', datetime.utcnow()),
+        updated_at=updated_test.get('updated_at', datetime.utcnow())
+    )
+
+@router.delete("/final-tests/{test_id}")
+async def delete_final_test(
+    test_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Delete a final test (only by test creator or admin)."""
+    # Find the test
+    test = await db.final_tests.find_one({"id": test_id, "isActive": True})
+    if not test:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Final test not found"
+        )
+    
+    # Check permissions
+    if current_user.role != 'admin' and test['createdBy'] != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only delete your own tests"
+        )
+    
+    # Check if test has attempts
+    attempt_count = await db.final_test_attempts.count_documents({"testId": test_id, "isActive": True})
+    if attempt_count > 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot delete test with {attempt_count} student attempt(s). Consider unpublishing instead."
+        )
+    
+    # Soft delete the test
+    result = await db.final_tests.update_one(
+        {"id": test_id},
+        {"$set": {"isActive": False, "updated_at": datetime.utcnow()}}
+    )
+    assessment_cache.invalidate(db.final_tests, test_id)
+    
+    if result.modified_count == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Final test not found"
+        )
+    
+    return {"message": f"Final test '{test['title']}' has been successfully deleted"}
+
+@router.get("/final-tests/{test_id}/attempt-check")
+async def check_final_test_attempt_availability(
+    test_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Check if the current user can attempt the final test."""
+    if current_user.role != 'learner':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only learners can attempt tests"
+        )
+    
+    # Find the test
+    test = await db.final_tests.find_one({"id": test_id, "isActive": True})
+    if not test:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Final test not found"
+        )
+    
+    summary = await get_summary(db.attempt_summaries, current_user.id, final_test_assessment(db.final_test_attempts, test))
+    existing_attempts = summary["attemptCount"]
+    
+    max_attempts = test.get('maxAttempts', 2)
+    can_attempt = existing_attempts < max_attempts
+    remaining_attempts = max(0, max_attempts - existing_attempts)
+    
+    return {
+        "canAttempt": can_attempt,
+        "existingAttempts": existing_attempts,
+        "maxAttempts": max_attempts,
+        "remainingAttempts": remaining_attempts,
+        "testTitle": test.get('title', 'Final Test'),
+        "message": f"You have {remaining_attempts} attempt(s) remaining" if can_attempt else f"You have reached the maximum number of attempts ({max_attempts})"
+    }
+
+@router.get("/final-tests/{test_id}/item-analysis")
+async def get_final_test_item_analysis(
+    test_id: str,
+    rebuild: bool = False,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Per-question difficulty, discrimination and option frequencies, plus KR-20 (instructors and admins only)."""
+    if current_user.role not in ['instructor', 'admin']:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only instructors and admins can view item analysis"
+        )
+    
+    test = await assessment_cache.get(db.final_tests, test_id)
+    if not test:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Final test not found"
+        )
+    
+    assessment = final_test_assessment(db.final_test_attempts, test.document)
+    return await analyse(db.item_statistics, assessment, test.questions, rebuild=rebuild)
+
+def score_final_test_answers(questions: List[dict], answer_map: Dict[str, Any]) -> float:
+    """Points earned on a final test, given a questionId -> answer map."""
+    points_earned = 0
+    
+    for question in questions:
+        question_id = question.get('id')
+        student_answer = answer_map.get(question_id)
+        question_points = question.get('points', 1)
+        
+        if question['type'] == 'multiple_choice':
+            try:
+                answer_index = int(student_answer) if str(student_answer).isdigit() else -1
+                correct_index = int(question['correctAnswer']) if str(question['correctAnswer']).isdigit() else -1
+                
+                if answer_index >= 0 and correct_index >= 0 and answer_index == correct_index:
+                    points_earned += question_points
+            except (ValueError, AttributeError, TypeError):
+                pass
+                
+        elif question['type'] == 'true_false':
+            if (student_answer is not None and question.get('correctAnswer') and 
+                str(student_answer).lower().strip() == str(question['correctAnswer']).lower().strip()):
+                points_earned += question_points
+                
+        elif question['type'] in ['short_answer', 'long_form', 'essay']:
+            # **SUBJECTIVE QUESTION FIX**: Give full points by default to allow progression
+            # Instructor can review and adjust scores later via manual grading
+            
+            # Check if student provided an answer (not empty)
+            if student_answer and str(student_answer).strip():
+                # Award full points for any reasonable attempt at subjective questions
+                points_earned += question_points
+                logger.debug(f"Subjective question awarded full points - Type: {question['type']}, Points: {question_points}")
+            else:
+                # No answer provided - give 0 points
+                logger.debug(f"Subjective question received 0 points - no answer provided")
+            
+            # Optional: Auto-grading for short-answer if enabled (kept for compatibility)
+            if (question['type'] == 'short-answer' and 
+                question.get('enableAutoGrading', False) and 
+                student_answer and 
+                question.get('correctAnswer')):
+                # More flexible matching for short answers - but we already awarded points above
+                student_clean = str(student_answer).lower().strip()
+                correct_clean = str(question['correctAnswer']).lower().strip()
+                # Note: Points already awarded above, this is just for logging
+                if student_clean == correct_clean:
+                    logger.debug(f"Short-answer auto-grading: exact match confirmed")
+                else:
+                    logger.debug(f"Short-answer auto-grading: no exact match, but full points already awarded")
+                
+        elif question['type'] == 'select-all-that-apply':
+            # Student answer should be a list of indices
+            if isinstance(student_answer, list) and question.get('correctAnswers'):
+                # Sort both lists to compare regardless of order
+                student_set = set(student_answer) if student_answer else set()
+                correct_set = set(question['correctAnswers']) if question['correctAnswers'] else set()
+                
+                # All-or-nothing scoring: full points if all correct, zero otherwise
+                if student_set == correct_set:
+                    points_earned += question_points
+                    
+        elif question['type'] == 'chronological-order':
+            # Student answer should be a list of indices representing the order
+            if isinstance(student_answer, list) and question.get('correctOrder'):
+                # Compare the order arrays directly
+                if student_answer == question['correctOrder']:
+                    points_earned += question_points
+    
+    return points_earned
+
+@router.post("/final-test-attempts", response_model=FinalTestAttemptResponse)
+async def submit_final_test_attempt(
+    attempt_data: FinalTestAttemptCreate,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Submit a final test attempt (learners only)."""
+    if current_user.role != 'learner':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only learners can submit test attempts"
+        )
+    
+    # Get test
+    compiled = await assessment_cache.get(db.final_tests, attempt_data.testId)
+    test = compiled.document if compiled else None
+    if not test or not test.get('isActive', True):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Final test not found"
+        )
+    
+    if not test.get('isPublished', False):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Test is not published"
+        )
+    
+    # Validate answers count
+    if len(attempt_data.answers) != compiled.draw_count:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Expected {compiled.draw_count} answers, got {len(attempt_data.answers)}"
+        )
+    
+    # Check the attempt limit and claim the attempt in one atomic update
+    assessment = final_test_assessment(db.final_test_attempts, test)
+    summary = await reserve_attempt(db.attempt_summaries, current_user.id, assessment, test.get('maxAttempts', 2))
+    if summary is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Maximum number of attempts ({test.get('maxAttempts', 2)}) reached"
+        )
+    
+    # The questions this attempt was served
+    questions = compiled.draw(attempt_seed(test['id'], current_user.id, summary["attemptCount"]))
+    
+    # Calculate score with support for all question types
+    total_points = drawn_points(compiled, questions)
+    
+    # Create a mapping of question IDs to answers
+    answer_map = {answer.get('questionId'): answer.get('answer') for answer in attempt_data.answers}
+    
+    points_earned = score_final_test_answers(questions, answer_map)
+    
+    # Calculate percentage score
+    score_percentage = (points_earned / total_points * 100) if total_points > 0 else 0
+    is_passed = score_percentage >= test.get('passingScore', 75.0)
+    
+    # Get program info
+    program = await db.programs.find_one({"id": test['programId']})
+    program_name = program.get('title', 'Unknown Program') if program else 'Unknown Program'
+    
+    results = question_results_at_submit(attempt_data.answers, {"id": test['id'], "questions": questions})
+    
+    # Create attempt record
+    attempt_dict = {
+        "id": str(uuid.uuid4()),
+        "testId": attempt_data.testId,
+        "testTitle": test['title'],
+        "programId": test['programId'],
+        "programName": program_name,
+        "studentId": current_user.id,
+        "studentName": current_user.full_name,
+        "answers": attempt_data.answers,
+        "questionIds": [question['id'] for question in questions],
+        "score": round(score_percentage, 2),
+        "pointsEarned": points_earned,
+        "totalPoints": total_points,
+        "isPassed": is_passed,
+        "timeSpent": attempt_data.timeSpent,
+        "status": "completed",
+        "startedAt": datetime.utcnow(),
+        "completedAt": datetime.utcnow(),
+        "attemptNumber": summary["attemptCount"],
+        # Per-question results for the review screens; manual grading updates them
+        "questionResults": results,
+        # This attempt's contribution to the item statistics
+        "itemScores": item_scores(questions, results),
+        "isActive": True,
+        "created_at": datetime.utcnow()
+    }
+    
+    # Insert attempt into database
+    try:
+        await db.final_test_attempts.insert_one(attempt_dict)
+    except Exception:
+        await release_attempt(db.attempt_summaries, current_user.id, assessment)
+        raise
+    await record_attempt_result(db.attempt_summaries, current_user.id, assessment, attempt_dict["score"], is_passed)
+    await add_attempt(
+        db.item_statistics, assessment, attempt_dict["itemScores"], selected_options(questions, attempt_data.answers)
+    )
+    
+    # Create subjective submissions for manual grading, all in one write
+    subjective_submissions = []
+    for question in questions:
+        logger.debug(f"Processing question type: {question['type']}")
+        if question['type'] in ['short_answer', 'long_form', 'essay']:
+            question_id = question.get('id')
+            student_answer = answer_map.get(question_id)
+            logger.debug(f"Question {question_id} has answer: {bool(student_answer)}")
+            
+            if student_answer:  # Only create submission if student provided an answer
+                subjective_submission = {
+                    "id": submission_id("final", attempt_dict['id'], question_id),
+                    "studentId": current_user.id,
+                    "studentName": current_user.full_name,
+                    "courseId": None,  # Final tests are not course-specific
+                    "lessonId": "final-test",
+                    "questionId": question_id,
+                    "questionText": question.get('question', 'Question text not available'),
+                    "questionPoints": question.get('points', 1),
+                    "questionType": question['type'],
+                    "studentAnswer": student_answer,
+                    "submittedAt": datetime.utcnow(),
+                    "gradedAt": None,
+                    "gradedBy": None,
+                    "gradedByName": None,
+                    "score": None,
+                    "feedback": None,
+                    "status": "pending",
+                    "isActive": True,
+                    "created_at": datetime.utcnow(),
+                    # Final test specific fields
+                    "testId": attempt_data.testId,
+                    "testTitle": test['title'],
+                    "programId": test['programId'],
+                    "programName": program_name,
+                    "attemptId": attempt_dict['id']
+                }
+                subjective_submissions.append(subjective_submission)
+    
+    inserted = await insert_submissions(db.subjective_submissions, subjective_submissions)
+    logger.info(f"Created {inserted} subjective submissions for attempt {attempt_dict['id']}")
+    
+    # Return properly constructed response object
+    return FinalTestAttemptResponse(
+        id=attempt_dict['id'],
+        testId=attempt_dict['testId'],
+        testTitle=test['title'],
+        programId=test.get('programId', ''),
+        programName=program_name,
+        studentId=attempt_dict['studentId'],
+        studentName=attempt_dict['studentName'],
+        score=attempt_dict['score'],
+        pointsEarned=attempt_dict['pointsEarned'],
+        totalPoints=attempt_dict['totalPoints'],
+        isPassed=attempt_dict['isPassed'],
+        timeSpent=attempt_dict.get('timeSpent'),
+        startedAt=attempt_dict['startedAt'],
+        completedAt=attempt_dict.get('completedAt'),
+        attemptNumber=attempt_dict['attemptNumber'],
+        status=attempt_dict['status'],
+        isActive=attempt_dict['isActive'],
+        created_at=attempt_dict['created_at']
+    )
+
+@router.get("/final-test-attempts", response_model=List[FinalTestAttemptResponse])
+async def get_final_test_attempts(
+    current_user: UserResponse = Depends(get_current_user),
+    test_id: Optional[str] = None,
+    program_id: Optional[str] = None,
+    student_id: Optional[str] = None
+):
+    """Get final test attempts with optional filtering."""
+    
+    # Base query
+    query = {"isActive": True}
+    
+    # Role-based filtering
+    if current_user.role == 'learner':
+        # Students only see their own attempts
+        query["studentId"] = current_user.id
+    elif current_user.role in ['instructor', 'admin']:
+        # Instructors and admins can filter by student
+        if student_id:
+            query["studentId"] = student_id
+    
+    # Add filters if specified
+    if test_id:
+        query["testId"] = test_id
+    if program_id:
+        query["programId"] = program_id
+    
+    attempts = await db.final_test_attempts.find(query).sort("created_at", -1).to_list(1000)
+    
+    # Convert to response objects with proper field mapping
+    response_attempts = []
+    for attempt in attempts:
+        # Get test and program information
+        test_title = "Unknown Test"
+        program_id = ""
+        program_name = "Unknown Program"
+        
+        if attempt.get('testId'):
+            test = await db.final_tests.find_one({"id": attempt['testId']})
+            if test:
+                test_title = test.get('title', 'Unknown Test')
+                program_id = test.get('programId', '')
+                if program_id:
+                    program = await db.programs.find_one({"id": program_id})
+                    if program:
+                        program_name = program.get('title', 'Unknown Program')
+        
+        response_attempt = FinalTestAttemptResponse(
+            id=attempt['id'],
+            testId=attempt.get('testId', ''),
+            testTitle=test_title,
+            programId=program_id,
+            programName=program_name,
+            studentId=attempt.get('studentId', ''),
+            studentName=attempt.get('studentName', 'Unknown Student'),
+            score=attempt.get('score', 0.0),
+            pointsEarned=attempt.get('pointsEarned', 0),
+            totalPoints=attempt.get('totalPoints', 0),
+            isPassed=attempt.get('isPassed', False),
+            timeSpent=attempt.get('timeSpent'),
+            startedAt=attempt.get('startedAt', attempt.get('created_at', datetime.utcnow())),
+            completedAt=attempt.get('completedAt'),
+            attemptNumber=attempt.get('attemptNumber', 1),
+            status=attempt.get('status', 'completed'),
+            isActive=attempt.get('isActive', True),
+            created_at=attempt.get('created_at', datetime.utcnow())
+        )
+        response_attempts.append(response_attempt)
+    
+    return response_attempts
+
+@router.get("/final-test-attempts/{attempt_id}", response_model=FinalTestAttemptWithAnswersResponse)
+async def get_final_test_attempt(
+    attempt_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Get a specific final test attempt by ID."""
+    attempt = await db.final_test_attempts.find_one({"id": attempt_id, "isActive": True})
+    if not attempt:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Final test attempt not found"
+        )
+    
+    # Check permissions
+    if (current_user.role == 'learner' and 
+        attempt['studentId'] != current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only view your own test attempts"
+        )
+    
+    return FinalTestAttemptWithAnswersResponse(**attempt)
+
+@router.get("/admin/final-test-attempts")
+async def get_all_final_test_attempts_admin(current_user: UserResponse = Depends(get_current_user)):
+    """Get all final test attempts for admin/instructor review."""
+    if current_user.role not in ['instructor', 'admin']:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only instructors and admins can access all final test attempts"
+        )
+    
+    try:
+        # Get all final test attempts
+        attempts = await db.final_test_attempts.find({"isActive": True}, {"_id": 0}).to_list(1000)
+        
+        # Get test and program information for each attempt
+        processed_attempts = []
+        for attempt in attempts:
+            # Get test details
+            test = await db.final_tests.find_one({"id": attempt.get('testId')}, {"_id": 0})
+            if test:
+                attempt['testTitle'] = test.get('title', 'Final Test')
+                attempt['programName'] = test.get('programName', 'Unknown Program')
+            
+            # Get student details
+            student = await db.users.find_one({"id": attempt.get('studentId')}, {"_id": 0})
+            if student:
+                attempt['studentName'] = student.get('full_name', 'Unknown Student')
+            
+            processed_attempts.append(attempt)
+        
+        return {"attempts": processed_attempts}
+    except Exception as e:
+        logger.error(f"Error fetching all final test attempts: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch final test attempts"
+        )
+
+@router.get("/final-test-attempts/{attempt_id}/detailed")
+async def get_final_test_attempt_detailed(
+    attempt_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Get detailed final test attempt with question-by-question breakdown."""
+    if current_user.role not in ['instructor', 'admin']:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only instructors and admins can view detailed attempt breakdowns"
+        )
+    
+    attempt = await db.final_test_attempts.find_one({"id": attempt_id, "isActive": True})
+    if not attempt:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Final test attempt not found"
+        )
+    
+    # Compiled (cached) test with its question index; per-question results come from the attempt
+    test = await assessment_cache.get(db.final_tests, attempt.get('testId'))
+    if not test:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Final test not found for this attempt"
+        )
+    
+    return {
+        "questions": test.questions,
+        "answers": await review_answers(attempt, test, db.submission_grades)
+    }
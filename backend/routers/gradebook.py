@@ -0,0 +1,132 @@
+"""
+Gradebook Endpoints
+===================
+
+Course and classroom gradebooks read from the enrollments, with CSV exports.
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi.responses import Response
+import logging
+from typing import List, Tuple
+from core import db
+from gradebook import (
+    GRADEBOOK_COURSE_PROJECTION, fetch_gradebook_rows, gradebook_columns, gradebook_csv, gradebook_row
+)
+from routers.auth import UserResponse, get_current_user
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# =============================================================================
+# GRADEBOOK HELPERS
+# =============================================================================
+
+def require_gradebook_access(current_user: UserResponse):
+    if current_user.role not in ['instructor', 'admin']:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only instructors and admins can view gradebooks"
+        )
+
+async def load_course_gradebook(course_id: str) -> Tuple[dict, List[dict], List[dict]]:
+    """(course, columns, rows) for a course; raises 404 when the course doesn't exist."""
+    course = await db.courses.find_one({"id": course_id}, GRADEBOOK_COURSE_PROJECTION)
+    if not course:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
+        )
+    columns = gradebook_columns(course)
+    enrollments = await fetch_gradebook_rows(db.enrollments, {"courseId": course_id})
+    return course, columns, [gradebook_row(enrollment, columns) for enrollment in enrollments]
+
+async def load_classroom_gradebook(classroom_id: str) -> Tuple[dict, List[dict], List[dict], List[dict]]:
+    """(classroom, courses, columns, rows) for a classroom's students in its courses."""
+    classroom = await db.classrooms.find_one({"id": classroom_id}, {"_id": 0, "id": 1, "name": 1, "courseIds": 1, "studentIds": 1})
+    if not classroom:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Classroom not found"
+        )
+    course_ids = classroom.get("courseIds") or []
+    student_ids = classroom.get("studentIds") or []
+    if not course_ids or not student_ids:
+        return classroom, [], [], []
+
+    courses = await db.courses.find({"id": {"$in": course_ids}}, GRADEBOOK_COURSE_PROJECTION).to_list(None)
+    # Keep the classroom's course order
+    order = {course_id: index for index, course_id in enumerate(course_ids)}
+    courses.sort(key=lambda course: order[course["id"]])
+    columns = [column for course in courses for column in gradebook_columns(course)]
+    enrollments = await fetch_gradebook_rows(db.enrollments, {
+        "courseId": {"$in": course_ids},
+        "userId": {"$in": student_ids}
+    })
+    return classroom, courses, columns, [gradebook_row(enrollment, columns) for enrollment in enrollments]
+
+def csv_response(content: str, name: str) -> Response:
+    safe_name = "".join(c for c in name if c.isalnum() or c in (' ', '-', '_')).strip().replace(' ', '_') or "gradebook"
+    return Response(
+        content=content,
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={safe_name}_gradebook.csv"}
+    )
+
+# =============================================================================
+# GRADEBOOK ENDPOINTS
+# =============================================================================
+
+@router.get("/gradebook/courses/{course_id}")
+async def get_course_gradebook(
+    course_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """One row per enrolled student with progress, completion and per-quiz-lesson grades."""
+    require_gradebook_access(current_user)
+    course, columns, rows = await load_course_gradebook(course_id)
+    return {
+        "course": {"id": course["id"], "title": course.get("title")},
+        "columns": columns,
+        "rows": rows,
+        "count": len(rows)
+    }
+
+@router.get("/gradebook/courses/{course_id}/export")
+async def export_course_gradebook(
+    course_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """The course gradebook as CSV."""
+    require_gradebook_access(current_user)
+    course, columns, rows = await load_course_gradebook(course_id)
+    content = gradebook_csv(columns, rows, {course["id"]: course.get("title") or course["id"]})
+    return csv_response(content, course.get("title") or course_id)
+
+@router.get("/gradebook/classrooms/{classroom_id}")
+async def get_classroom_gradebook(
+    classroom_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """One row per (course, student) for the classroom's students in its courses."""
+    require_gradebook_access(current_user)
+    classroom, courses, columns, rows = await load_classroom_gradebook(classroom_id)
+    return {
+        "classroom": {"id": classroom["id"], "name": classroom.get("name")},
+        "courses": [{"id": course["id"], "title": course.get("title")} for course in courses],
+        "columns": columns,
+        "rows": rows,
+        "count": len(rows)
+    }
+
+@router.get("/gradebook/classrooms/{classroom_id}/export")
+async def export_classroom_gradebook(
+    classroom_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """The classroom gradebook as CSV."""
+    require_gradebook_access(current_user)
+    classroom, courses, columns, rows = await load_classroom_gradebook(classroom_id)
+    content = gradebook_csv(columns, rows, {course["id"]: course.get("title") or course["id"] for course in courses})
+    return csv_response(content, classroom.get("name") or classroom_id)
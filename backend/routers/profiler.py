@@ -0,0 +1,94 @@
+"""
+Request Profiler Endpoints
+==========================
+
+Admin endpoints for the opt-in request profiler (see request_profiler.py).
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi.responses import FileResponse
+import logging
+from pydantic import BaseModel, Field
+import anyio
+from request_profiler import RequestProfiler, PROFILE_HEADER
+from core import request_profiler
+from routers.auth import UserResponse, get_admin_user
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# =============================================================================
+# REQUEST PROFILER ENDPOINTS
+# =============================================================================
+
+class ProfilerConfigUpdate(BaseModel):
+    sampleRate: float = Field(..., ge=0.0, le=1.0)
+
+class ProfileTokenRequest(BaseModel):
+    method: str = "GET"
+    path: str = Field(..., pattern="^/")
+    ttlSeconds: int = Field(300, ge=1, le=3600)
+
+def get_request_profiler() -> RequestProfiler:
+    if request_profiler is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Request profiler is disabled (set PROFILER_ENABLED=true)"
+        )
+    return request_profiler
+
+@router.get("/admin/profiler")
+async def get_profiler_status(admin_user: UserResponse = Depends(get_admin_user)):
+    """List captured request profiles, newest first per route (admin only)."""
+    profiler = get_request_profiler()
+    profiles = await anyio.to_thread.run_sync(profiler.list_profiles)
+    return {
+        "sampleRate": profiler.sample_rate,
+        "maxProfilesPerRoute": profiler.max_profiles_per_route,
+        "profiles": profiles
+    }
+
+@router.put("/admin/profiler")
+async def update_profiler_config(
+    config: ProfilerConfigUpdate,
+    admin_user: UserResponse = Depends(get_admin_user)
+):
+    """Change the fraction of requests profiled (admin only)."""
+    profiler = get_request_profiler()
+    profiler.sample_rate = config.sampleRate
+    logger.info(f"Profiler sample rate set to {config.sampleRate} by {admin_user.id}")
+    return {"sampleRate": profiler.sample_rate}
+
+@router.post("/admin/profiler/token")
+async def create_profile_token(
+    token_request: ProfileTokenRequest,
+    admin_user: UserResponse = Depends(get_admin_user)
+):
+    """Sign a header that profiles one method+path until it expires (admin only)."""
+    profiler = get_request_profiler()
+    if not profiler.signing_enabled:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Signed profile headers are disabled (set PROFILER_SECRET)"
+        )
+    return {
+        "header": PROFILE_HEADER,
+        "value": profiler.sign(token_request.method, token_request.path, token_request.ttlSeconds),
+        "expiresIn": token_request.ttlSeconds
+    }
+
+@router.get("/admin/profiler/{route}/{profile}")
+async def download_profile(
+    route: str,
+    profile: str,
+    admin_user: UserResponse = Depends(get_admin_user)
+):
+    """Download a profile as folded stacks for flamegraph.pl or speedscope (admin only)."""
+    path = get_request_profiler().profile_path(route, profile)
+    if not path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return FileResponse(path, media_type="text/plain", filename=profile)
@@ -0,0 +1,256 @@
+"""
+Program Endpoints
+=================
+
+Programs: ordered groups of courses with optional deadlines.
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, status
+import logging
+from pydantic import BaseModel, Field
+from typing import List, Optional
+import uuid
+from datetime import datetime
+from core import db
+from routers.auth import UserResponse, get_current_user
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# =============================================================================
+# PROGRAM MODELS
+# =============================================================================
+
+class ProgramCreate(BaseModel):
+    title: str
+    description: str
+    departmentId: Optional[str] = None
+    duration: Optional[str] = None
+    courseIds: List[str] = []
+    nestedProgramIds: List[str] = []
+    
+class ProgramInDB(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    title: str
+    description: str
+    departmentId: Optional[str] = None
+    duration: Optional[str] = None
+    courseIds: List[str] = []
+    nestedProgramIds: List[str] = []
+    instructorId: str
+    instructor: str
+    isActive: bool = True
+    courseCount: int = 0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class ProgramResponse(BaseModel):
+    id: str
+    title: str
+    description: str
+    departmentId: Optional[str] = None
+    duration: Optional[str] = None
+    courseIds: List[str] = []
+    nestedProgramIds: List[str] = []
+    instructorId: str
+    instructor: str
+    isActive: bool
+    courseCount: int
+    created_at: datetime
+    updated_at: datetime
+
+# =============================================================================
+# PROGRAM MANAGEMENT ENDPOINTS
+# =============================================================================
+
+@router.post("/programs", response_model=ProgramResponse)
+async def create_program(
+    program_data: ProgramCreate,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Create a new program."""
+    # Only instructors and admins can create programs
+    if current_user.role not in ['instructor', 'admin']:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only instructors and admins can create programs"
+        )
+    
+    # Create program document
+    program_dict = {
+        "id": str(uuid.uuid4()),
+        **program_data.dict(),
+        "instructorId": current_user.id,
+        "instructor": current_user.full_name,
+        "isActive": True,
+        "courseCount": len(program_data.courseIds),
+        "created_at": datetime.utcnow(),
+        "updated_at": datetime.utcnow()
+    }
+    
+    # Insert program into database
+    await db.programs.insert_one(program_dict)
+    
+    return ProgramResponse(**program_dict)
+
+@router.get("/programs", response_model=List[ProgramResponse])
+async def get_all_programs(current_user: UserResponse = Depends(get_current_user)):
+    """Get all active programs."""
+    programs = await db.programs.find({"isActive": True}).to_list(1000)
+    return [ProgramResponse(**program) for program in programs]
+
+@router.get("/programs/my-programs", response_model=List[ProgramResponse])
+async def get_my_programs(current_user: UserResponse = Depends(get_current_user)):
+    """Get programs created by current user."""
+    if current_user.role not in ['instructor', 'admin']:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only instructors and admins can access program management"
+        )
+    
+    programs = await db.programs.find({"instructorId": current_user.id}).to_list(1000)
+    return [ProgramResponse(**program) for program in programs]
+
+@router.get("/programs/{program_id}", response_model=ProgramResponse)
+async def get_program(
+    program_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Get a specific program by ID."""
+    program = await db.programs.find_one({"id": program_id})
+    if not program:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Program not found"
+        )
+    
+    return ProgramResponse(**program)
+
+@router.put("/programs/{program_id}", response_model=ProgramResponse)
+async def update_program(
+    program_id: str,
+    program_data: ProgramCreate,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Update a program (only by program creator or admin)."""
+    # Find the program
+    program = await db.programs.find_one({"id": program_id})
+    if not program:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Program not found"
+        )
+    
+    # Check permissions
+    if current_user.role != 'admin' and program['instructorId'] != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only edit your own programs"
+        )
+    
+    # Update program
+    update_data = program_data.dict()
+    update_data["updated_at"] = datetime.utcnow()
+    update_data["courseCount"] = len(program_data.courseIds)
+    
+    result = await db.programs.update_one(
+        {"id": program_id},
+        {"$set": update_data}
+    )
+    
+    if result.modified_count == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Program not found or no changes made"
+        )
+    
+    # Get updated program
+    updated_program = await db.programs.find_one({"id": program_id})
+    return ProgramResponse(**updated_program)
+
+@router.get("/programs/{program_id}/access-check", response_model=dict)
+async def check_program_access(
+    program_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Check if the current user can access a program based on classroom end dates."""
+    if current_user.role != 'learner':
+        # Instructors and admins always have access
+        return {"hasAccess": True, "reason": "admin_access"}
+    
+    # Find all classrooms that contain this program and include the current student
+    classrooms = await db.classrooms.find({
+        "programIds": program_id,
+        "studentIds": current_user.id,
+        "isActive": True
+    }).to_list(1000)
+    
+    if not classrooms:
+        return {"hasAccess": False, "reason": "not_enrolled", "message": "You are not enrolled in any classroom that includes this program"}
+    
+    # Check if any classroom allows access (has not passed end date)
+    current_time = datetime.utcnow()
+    active_classrooms = []
+    expired_classrooms = []
+    
+    for classroom in classrooms:
+        end_date = classroom.get('endDate')
+        if not end_date:
+            # No end date means indefinite access
+            active_classrooms.append(classroom)
+        elif end_date > current_time:
+            # End date hasn't passed
+            active_classrooms.append(classroom)
+        else:
+            # End date has passed
+            expired_classrooms.append(classroom)
+    
+    if active_classrooms:
+        # Student has access through at least one active classroom
+        return {
+            "hasAccess": True, 
+            "reason": "classroom_active",
+            "activeClassrooms": len(active_classrooms),
+            "message": f"Access granted through {len(active_classrooms)} active classroom(s)"
+        }
+    else:
+        # All classrooms have expired
+        return {
+            "hasAccess": False, 
+            "reason": "classroom_expired",
+            "expiredClassrooms": len(expired_classrooms),
+            "message": f"Program access has expired in all {len(expired_classrooms)} enrolled classroom(s)"
+        }
+
+@router.delete("/programs/{program_id}")
+async def delete_program(
+    program_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Delete a program (only by program creator or admin)."""
+    # Find the program
+    program = await db.programs.find_one({"id": program_id})
+    if not program:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Program not found"
+        )
+    
+    # Check permissions
+    if current_user.role != 'admin' and program['instructorId'] != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only delete your own programs"
+        )
+    
+    # Delete the program
+    result = await db.programs.delete_one({"id": program_id})
+    
+    if result.deleted_count == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Program not found"
+        )
+    
+    return {"message": f"Program '{program['title']}' has been successfully deleted"}
@@ -0,0 +1,84 @@
+"""
+Report Endpoints
+================
+
+Admin cohort, completion-time and funnel reports computed from the Parquet
+snapshots (see reporting.py), and the endpoint that refreshes the snapshots.
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+import logging
+from functools import partial
+from typing import Optional
+import anyio
+from core import analytics_db, REPORTS_DIR
+from reporting import (
+    PERIODS, SNAPSHOT_TABLES, SnapshotMissing, cohort_report, compact_table, funnel_report, snapshot_all,
+    time_to_completion_report
+)
+from routers.auth import UserResponse, get_admin_user
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# =============================================================================
+# REPORT HELPERS
+# =============================================================================
+
+async def run_report(report, *args):
+    """Run a pandas report off the event loop; 409 until the tables it reads are snapshotted."""
+    try:
+        return await anyio.to_thread.run_sync(partial(report, REPORTS_DIR, *args))
+    except SnapshotMissing as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"No snapshot of {e.args[0]} yet; run POST /api/admin/reports/snapshots first"
+        )
+
+# =============================================================================
+# REPORT ENDPOINTS
+# =============================================================================
+
+@router.post("/admin/reports/snapshots")
+async def refresh_report_snapshots(
+    compact: bool = False,
+    admin_user: UserResponse = Depends(get_admin_user)
+):
+    """Copy documents changed since the last run into the Parquet snapshots (admin only)."""
+    # Report read: served from the analytics handle (secondaries first)
+    written = await snapshot_all(analytics_db, REPORTS_DIR)
+    compacted = {}
+    if compact:
+        for name, table in SNAPSHOT_TABLES.items():
+            if table.incremental:
+                compacted[name] = await anyio.to_thread.run_sync(compact_table, REPORTS_DIR, name)
+    logger.info(f"Report snapshots refreshed by {admin_user.id}: {written}")
+    return {"rowsWritten": written, "partitionsCompacted": compacted}
+
+@router.get("/admin/reports/cohorts")
+async def get_cohort_completion(
+    period: str = Query("month", pattern=f"^({'|'.join(PERIODS)})$"),
+    horizon_weeks: int = Query(12, alias="horizonWeeks", ge=1, le=104),
+    course_id: Optional[str] = Query(None, alias="courseId"),
+    admin_user: UserResponse = Depends(get_admin_user)
+):
+    """Completion curves per enrollment cohort: share completed within k weeks of enrolling."""
+    return await run_report(cohort_report, period, horizon_weeks, course_id)
+
+@router.get("/admin/reports/time-to-completion")
+async def get_time_to_completion(
+    course_id: Optional[str] = Query(None, alias="courseId"),
+    admin_user: UserResponse = Depends(get_admin_user)
+):
+    """Distribution of days from enrolling to completing, overall and per course."""
+    return await run_report(time_to_completion_report, course_id)
+
+@router.get("/admin/reports/funnels")
+async def get_completion_funnel(
+    by: str = Query("department", pattern="^(department|classroom)$"),
+    course_id: Optional[str] = Query(None, alias="courseId"),
+    admin_user: UserResponse = Depends(get_admin_user)
+):
+    """Enrolled, started, attempted a quiz and completed counts per department or classroom."""
+    return await run_report(funnel_report, by, course_id)
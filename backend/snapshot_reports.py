@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Refresh the Parquet snapshots the admin reports read (see reporting.py).
+
+Each run copies only what changed since the previous one, so it can run often
+(e.g. from cron). Compacting rewrites each incremental table as one partition.
+
+    python snapshot_reports.py                      # every table
+    python snapshot_reports.py --table enrollments  # one table (repeatable)
+    python snapshot_reports.py --compact            # snapshot, then compact
+"""
+import argparse
+import asyncio
+import logging
+
+from core import analytics_db, REPORTS_DIR
+from reporting import SNAPSHOT_TABLES, compact_table, snapshot_all
+
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Snapshot enrollments, attempts, users and classrooms to Parquet")
+    parser.add_argument("--table", action="append", choices=list(SNAPSHOT_TABLES), help="Only snapshot this table")
+    parser.add_argument("--compact", action="store_true", help="Compact the incremental tables afterwards")
+    parser.add_argument("--dir", default=REPORTS_DIR, help=f"Snapshot root directory (default {REPORTS_DIR})")
+    args = parser.parse_args()
+
+    written = await snapshot_all(analytics_db, args.dir, tables=args.table)
+    for name, rows in written.items():
+        logger.info(f"{name}: {rows} rows written")
+    if args.compact:
+        for name in args.table or SNAPSHOT_TABLES:
+            if SNAPSHOT_TABLES[name].incremental:
+                compact_table(args.dir, name)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
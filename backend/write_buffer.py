@@ -0,0 +1,103 @@
+"""
+Write-Behind Buffer
+===================
+
+Coalesces high-frequency, last-write-wins field updates (progress heartbeats,
+lastAccessedAt, timeSpent) in memory and flushes them to MongoDB in batches.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Hashable, Optional, Set
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+
+class CoalescingWriteBuffer:
+    """Merge $set updates per document and flush them with a single bulk_write.
+
+    Keys map to the Mongo filter of the target document. Later updates for the same
+    key overwrite earlier fields, so N heartbeats between flushes cost one write.
+    """
+
+    def __init__(self, collection, flush_interval: float = 5.0, max_pending: int = 1000):
+        self.collection = collection
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[Hashable, Dict[str, Any]] = {}
+        self._filters: Dict[Hashable, Dict[str, Any]] = {}
+        # Keys taken by a write-through since the current flush swapped out its batch
+        self._taken: Set[Hashable] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+    def add(self, key: Hashable, document_filter: Dict[str, Any], fields: Dict[str, Any]):
+        """Queue fields to $set on the document matching document_filter."""
+        self._pending.setdefault(key, {}).update(fields)
+        self._filters[key] = document_filter
+        if len(self._pending) >= self.max_pending and not self._flush_lock.locked():
+            asyncio.get_running_loop().create_task(self.flush())
+
+    def pending(self, key: Hashable) -> Dict[str, Any]:
+        """Fields queued for key that haven't been written yet."""
+        return dict(self._pending.get(key, {}))
+
+    def take(self, key: Hashable) -> Dict[str, Any]:
+        """Remove and return queued fields so a write-through can include them.
+
+        Fields already swapped out by a flush in flight can't be taken; if that flush
+        fails they are dropped rather than requeued over the write-through.
+        """
+        self._taken.add(key)
+        self._filters.pop(key, None)
+        return self._pending.pop(key, {})
+
+    async def flush(self) -> int:
+        """Write all queued updates. Returns the number of documents written."""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+            filters, self._filters = self._filters, {}
+            self._taken = set()
+
+            operations = [UpdateOne(filters[key], {"$set": fields}) for key, fields in pending.items()]
+            try:
+                await self.collection.bulk_write(operations, ordered=False)
+            except Exception as e:
+                logger.error(f"Write buffer flush failed ({len(operations)} updates): {str(e)}")
+                # Requeue, without clobbering anything newer that arrived or was written meanwhile
+                for key, fields in pending.items():
+                    if key in self._taken:
+                        continue
+                    self._pending[key] = {**fields, **self._pending.get(key, {})}
+                    self._filters.setdefault(key, filters[key])
+                return 0
+
+            logger.debug(f"Write buffer flushed {len(operations)} updates")
+            return len(operations)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Write buffer flush loop error: {str(e)}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the periodic flush and write whatever is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
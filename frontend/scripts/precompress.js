@@ -0,0 +1,42 @@
+// Write .br and .gz variants next to compressible build assets so the
+// backend can serve them without compressing on every request.
+const fs = require('fs');
+const path = require('path');
+const zlib = require('zlib');
+
+const BUILD_DIR = path.resolve(__dirname, '..', 'build');
+const COMPRESSIBLE = /\.(js|css|html|json|svg|txt|map|ico)$/;
+const MIN_SIZE = 1024;
+
+const walk = (dir) =>
+  fs.readdirSync(dir, { withFileTypes: true }).flatMap((entry) => {
+    const fullPath = path.join(dir, entry.name);
+    return entry.isDirectory() ? walk(fullPath) : [fullPath];
+  });
+
+if (!fs.existsSync(BUILD_DIR)) {
+  console.error(`Build directory not found: ${BUILD_DIR}`);
+  process.exit(1);
+}
+
+let compressed = 0;
+for (const file of walk(BUILD_DIR)) {
+  if (!COMPRESSIBLE.test(file)) continue;
+
+  const content = fs.readFileSync(file);
+  if (content.length < MIN_SIZE) continue;
+
+  fs.writeFileSync(`${file}.gz`, zlib.gzipSync(content, { level: 9 }));
+  fs.writeFileSync(
+    `${file}.br`,
+    zlib.brotliCompressSync(content, {
+      params: {
+        [zlib.constants.BROTLI_PARAM_QUALITY]: zlib.constants.BROTLI_MAX_QUALITY,
+        [zlib.constants.BROTLI_PARAM_SIZE_HINT]: content.length,
+      },
+    })
+  );
+  compressed += 1;
+}
+
+console.log(`Precompressed ${compressed} build assets (.br/.gz)`);
@@ -28,7 +28,7 @@ const AdminDashboard = () => {
       }
 
       // Load courses
-      const coursesResult = await getAllCourses();
+      const coursesResult = await getAllCourses({ summary: true });
       if (coursesResult.success) {
         setCourses(coursesResult.courses);
       }
@@ -16,7 +16,7 @@ const InstructorDashboard = () => {
   useEffect(() => {
     const loadCourses = async () => {
       try {
-        const result = await getAllCourses();
+        const result = await getAllCourses({ summary: true });
         if (result.success) {
           // Filter courses by instructor
           const instructorCourses = result.courses.filter(course => 
@@ -442,12 +442,14 @@ export const AuthProvider = ({ children }) => {
     }
   };
 
-  const getAllCourses = async () => {
+  // Pass { summary: true } for list views that don't need module/lesson content
+  const getAllCourses = async ({ summary = false } = {}) => {
     try {
       const token = localStorage.getItem('auth_token');
+      const path = summary ? '/api/courses/summary' : '/api/courses';
       
       // Use Edge-compatible fetch
-      const response = await edgeCompatibleFetch(`${backendUrl}/api/courses`, {
+      const response = await edgeCompatibleFetch(`${backendUrl}${path}`, {
         method: 'GET',
         headers: {
           'Authorization': `Bearer ${token}`
@@ -473,10 +475,11 @@ export const AuthProvider = ({ children }) => {
     }
   };
 
-  const getMyCourses = async () => {
+  const getMyCourses = async ({ summary = false } = {}) => {
     try {
       const token = localStorage.getItem('auth_token');
-      const response = await fetch(`${backendUrl}/api/courses/my-courses`, {
+      const path = summary ? '/api/courses/my-courses/summary' : '/api/courses/my-courses';
+      const response = await fetch(`${backendUrl}${path}`, {
         headers: {
           'Authorization': `Bearer ${token}`
         }
@@ -1555,6 +1558,38 @@ export const AuthProvider = ({ children }) => {
     }
   }, [backendUrl]);
 
+  // Records progress for one lesson; the backend recomputes overall course progress
+  const updateLessonProgress = useCallback(async (courseId, lessonId, progressData) => {
+    try {
+      const token = localStorage.getItem('auth_token');
+      const response = await fetch(`${backendUrl}/api/enrollments/${courseId}/lessons/${lessonId}/progress`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          'Authorization': `Bearer ${token}`
+        },
+        body: JSON.stringify(progressData),
+      });
+
+      if (response.ok) {
+        const updatedEnrollment = await response.json();
+        return { success: true, enrollment: updatedEnrollment };
+      } else {
+        const errorData = await response.json();
+        return { 
+          success: false, 
+          error: errorData.detail || 'Failed to update lesson progress' 
+        };
+      }
+    } catch (error) {
+      console.error('Update lesson progress error:', error);
+      return { 
+        success: false, 
+        error: 'Network error. Please try again.' 
+      };
+    }
+  }, [backendUrl]);
+
   const uploadFile = async (file) => {
     try {
       const token = localStorage.getItem('auth_token');
@@ -2907,6 +2942,7 @@ export const AuthProvider = ({ children }) => {
     getStudentEnrollments,
     updateEnrollment,
     updateEnrollmentProgress,
+    updateLessonProgress,
     uploadFile,
     migrateEnrollmentProgress,
     deleteEnrollment,
@@ -54,7 +54,7 @@ const Announcements = () => {
 
       // Load courses for the dropdown (if not a learner)
       if (!isLearner) {
-        const courseResult = await getAllCourses();
+        const courseResult = await getAllCourses({ summary: true });
         if (courseResult.success) {
           setCourses(courseResult.courses || []);
         } else {
@@ -146,7 +146,7 @@ const Classrooms = () => {
     setLoadingCourses(true);
     try {
       if (getAllCourses) {
-        const result = await getAllCourses();
+        const result = await getAllCourses({ summary: true });
         if (result.success) {
           setRealCourses(result.courses);
         } else {
@@ -39,6 +39,7 @@ const CourseDetail = () => {
     getCourseById, 
     getMyEnrollments, 
     updateEnrollmentProgress,
+    updateLessonProgress,
     migrateEnrollmentProgress,
     getAllPrograms,
     getAllClassrooms,
@@ -790,14 +791,8 @@ const CourseDetail = () => {
       console.log(`Progress DEBUG: Total lessons: ${totalLessons}, Completed: ${totalCompletedLessons}, Progress: ${overallProgress}%`);
       console.log('Module progress data:', JSON.stringify(moduleProgress, null, 2));
       
-      // Update progress in backend
-      const result = await updateEnrollmentProgress(id, {
-        progress: overallProgress,
-        currentLessonId: lessonId,
-        currentModuleId: moduleId,
-        moduleProgress: moduleProgress,
-        lastAccessedAt: new Date().toISOString()
-      });
+      // Update progress in backend - only this lesson is written, overall progress is computed server-side
+      const result = await updateLessonProgress(id, lessonId, { completed: true });
       
       if (result.success) {
         // Update local state with immediate effect
@@ -927,7 +922,7 @@ const CourseDetail = () => {
       } else {
         toast({
           title: "Error",
-          description: "Failed to update progress. Please try again.",
+          description: result.error || "Failed to update progress. Please try again.",
           variant: "destructive",
         });
         console.error('Failed to update progress:', result.error);
@@ -13,7 +13,7 @@ import { BookOpen, Clock, Users, Search, Filter, Play, Star, Eye, Trash2, Plus }
 import { useToast } from '../hooks/use-toast';
 
 const Courses = () => {
-  const { user, isAdmin, isInstructor, isLearner, getAllCourses, getMyCourses, enrollInCourse, unenrollFromCourse, deleteCourse, getMyEnrollments } = useAuth();
+  const { user, isAdmin, isInstructor, isLearner, getAllCourses, getMyCourses, getCourseById, enrollInCourse, unenrollFromCourse, deleteCourse, getMyEnrollments } = useAuth();
   const navigate = useNavigate();
   const { toast } = useToast();
   const [searchTerm, setSearchTerm] = useState('');
@@ -44,7 +44,7 @@ const Courses = () => {
     setLoading(true);
     try {
       // All users should see all available courses for collaboration
-      const result = await getAllCourses();
+      const result = await getAllCourses({ summary: true });
       if (result.success) {
         setCourses(result.courses);
       } else {
@@ -149,7 +149,7 @@ const Courses = () => {
 
 
 
-  const handleViewCourse = (courseId, action = 'view') => {
+  const handleViewCourse = async (courseId, action = 'view') => {
     const course = courses.find(c => c.id === courseId);
     
     if (!course) {
@@ -167,7 +167,7 @@ const Courses = () => {
     // If it's a preview action or user is not enrolled and not owner, show preview
     if (action === 'preview' || (!isEnrolled && !isOwner && action === 'view')) {
       // Ensure course has required structure for preview
-      if (!course.modules || course.modules.length === 0) {
+      if (!course.totalModules) {
         toast({
           title: "Preview not available",
           description: "This course doesn't have any modules to preview yet.",
@@ -176,7 +176,18 @@ const Courses = () => {
         return;
       }
       
-      setPreviewCourse(course);
+      // The catalog only carries summaries; load the full course for the preview
+      const result = await getCourseById(courseId);
+      if (!result.success) {
+        toast({
+          title: "Preview not available",
+          description: result.error,
+          variant: "destructive",
+        });
+        return;
+      }
+      
+      setPreviewCourse(result.course);
       setIsPreviewOpen(true);
     } else {
       // Otherwise navigate to course detail page
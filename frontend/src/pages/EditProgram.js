@@ -76,7 +76,7 @@ const EditProgram = () => {
         }
 
         // Load courses
-        const coursesResult = await getAllCourses();
+        const coursesResult = await getAllCourses({ summary: true });
         if (coursesResult.success) {
           setCourses(coursesResult.courses);
         } else {
@@ -201,7 +201,7 @@ const FinalTest = () => {
           
           // Also load the courses to verify completion
           if (programResult.program.courseIds?.length > 0) {
-            const coursesResult = await getAllCourses();
+            const coursesResult = await getAllCourses({ summary: true });
             if (coursesResult.success) {
               const programCourses = coursesResult.courses.filter(course => 
                 programResult.program.courseIds.includes(course.id)
@@ -21,6 +21,9 @@ import {
 } from 'lucide-react';
 import { useToast } from '../hooks/use-toast';
 
+const QUEUE_PAGE_SIZE = 50;
+const EMPTY_COUNTS = { pending: 0, graded: 0, total: 0 };
+
 const GradingCenter = () => {
   const { user, getAllCourses } = useAuth();
   const { toast } = useToast();
@@ -36,6 +39,11 @@ const GradingCenter = () => {
   const [selectedAttempt, setSelectedAttempt] = useState(null);
   const [searchTerm, setSearchTerm] = useState('');
   const [filterType, setFilterType] = useState('all'); // 'all', 'quiz', 'final'
+  const [activeTab, setActiveTab] = useState('pending'); // a queue status or 'attempts'
+  const [statusTab, setStatusTab] = useState('pending'); // 'pending', 'graded', 'all'
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [queueCounts, setQueueCounts] = useState(EMPTY_COUNTS);
 
   useEffect(() => {
     if (user && (user.role === 'instructor' || user.role === 'admin')) {
@@ -47,7 +55,7 @@ const GradingCenter = () => {
   const loadInstructorCourses = async () => {
     setLoading(true);
     try {
-      const result = await getAllCourses();
+      const result = await getAllCourses({ summary: true });
       if (result.success) {
         // Filter courses - admins can see all courses, instructors only see their own
         const accessibleCourses = user.role === 'admin' 
@@ -137,12 +145,17 @@ const GradingCenter = () => {
     }
   };
 
-  const loadCourseSubmissions = async (courseId) => {
+  // One page of the server-side grading queue; pass a cursor to append the next page
+  const loadSubmissions = async ({ courseId = null, status = statusTab, cursor = null } = {}) => {
     try {
       const backendUrl = process.env.REACT_APP_BACKEND_URL;
       const token = localStorage.getItem('auth_token');
       
-      const response = await fetch(`${backendUrl}/api/courses/${courseId}/submissions`, {
+      const params = new URLSearchParams({ status, limit: QUEUE_PAGE_SIZE });
+      if (courseId) params.set('courseId', courseId);
+      if (cursor) params.set('cursor', cursor);
+      
+      const response = await fetch(`${backendUrl}/api/grading/queue?${params}`, {
         headers: {
           'Authorization': `Bearer ${token}`,
           'Content-Type': 'application/json'
@@ -151,42 +164,47 @@ const GradingCenter = () => {
       
       if (response.ok) {
         const data = await response.json();
-        setSubmissions(data.submissions || []);
+        const page = data.submissions || [];
+        setSubmissions(prev => (cursor ? [...prev, ...page] : page));
+        setNextCursor(data.nextCursor || null);
+        setQueueCounts(data.counts || EMPTY_COUNTS);
       } else {
         console.error('Failed to load submissions:', response.status);
-        setSubmissions([]);
+        if (!cursor) {
+          setSubmissions([]);
+          setNextCursor(null);
+          setQueueCounts(EMPTY_COUNTS);
+        }
       }
     } catch (error) {
-      console.error('Error loading course submissions:', error);
-      setSubmissions([]);
-    }
-  };
-
-  const loadAllSubmissions = async () => {
-    try {
-      const backendUrl = process.env.REACT_APP_BACKEND_URL;
-      const token = localStorage.getItem('auth_token');
-      
-      const response = await fetch(`${backendUrl}/api/courses/all/submissions`, {
-        headers: {
-          'Authorization': `Bearer ${token}`,
-          'Content-Type': 'application/json'
-        }
-      });
-      
-      if (response.ok) {
-        const data = await response.json();
-        setSubmissions(data.submissions || []);
-      } else {
-        console.error('Failed to load all submissions');
+      console.error('Error loading submissions:', error);
+      if (!cursor) {
         setSubmissions([]);
+        setNextCursor(null);
       }
-    } catch (error) {
-      console.error('Error loading all submissions:', error);
-      setSubmissions([]);
     }
   };
 
+  const loadCourseSubmissions = (courseId, status = statusTab) => loadSubmissions({ courseId, status });
+
+  const loadAllSubmissions = (status = statusTab) => loadSubmissions({ status });
+
+  const reloadSubmissions = (status = statusTab) => (
+    viewMode === 'course' && selectedCourse
+      ? loadCourseSubmissions(selectedCourse.id, status)
+      : loadAllSubmissions(status)
+  );
+
+  const loadMoreSubmissions = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    await loadSubmissions({
+      courseId: viewMode === 'course' ? selectedCourse?.id : null,
+      cursor: nextCursor
+    });
+    setLoadingMore(false);
+  };
+
   const handleCourseChange = async (course) => {
     setSelectedCourse(course);
     if (viewMode === 'course') {
@@ -203,6 +221,14 @@ const GradingCenter = () => {
     }
   };
 
+  const handleTabChange = async (tab) => {
+    setActiveTab(tab);
+    if (tab !== 'attempts' && tab !== statusTab) {
+      setStatusTab(tab);
+      await reloadSubmissions(tab);
+    }
+  };
+
   const startGrading = (submission) => {
     setGradingSubmission(submission);
     setGradeScore('');
@@ -242,12 +268,19 @@ const GradingCenter = () => {
           description: `Successfully graded ${gradingSubmission.studentName}'s answer.`,
         });
         
-        // Update the submission in the list
-        setSubmissions(prev => prev.map(sub => 
-          sub.id === gradingSubmission.id 
-            ? { ...sub, status: 'graded', score: parseFloat(gradeScore), feedback: gradeFeedback }
-            : sub
-        ));
+        // Update the submission in the list; graded work leaves the pending queue
+        const wasPending = gradingSubmission.status === 'pending';
+        setSubmissions(prev => prev
+          .map(sub => 
+            sub.id === gradingSubmission.id 
+              ? { ...sub, status: 'graded', score: parseFloat(gradeScore), feedback: gradeFeedback }
+              : sub
+          )
+          .filter(sub => statusTab !== 'pending' || sub.status === 'pending')
+        );
+        if (wasPending) {
+          setQueueCounts(prev => ({ ...prev, pending: prev.pending - 1, graded: prev.graded + 1 }));
+        }
         
         setGradingSubmission(null);
       } else {
@@ -263,13 +296,10 @@ const GradingCenter = () => {
     }
   };
 
-  const getPendingCount = () => {
-    return submissions.filter(sub => sub.status === 'pending').length;
-  };
+  // Counts come from the server and cover the whole queue, not just the loaded pages
+  const getPendingCount = () => queueCounts.pending;
 
-  const getGradedCount = () => {
-    return submissions.filter(sub => sub.status === 'graded').length;
-  };
+  const getGradedCount = () => queueCounts.graded;
 
   // Filter attempts based on search term and type
   const getFilteredAttempts = () => {
@@ -447,7 +477,7 @@ const GradingCenter = () => {
                 <div className="flex items-center justify-between">
                   <div>
                     <p className="text-blue-600 text-sm font-medium">Total Submissions</p>
-                    <p className="text-2xl font-bold text-blue-700">{submissions.length}</p>
+                    <p className="text-2xl font-bold text-blue-700">{queueCounts.total}</p>
                   </div>
                   <FileText className="h-8 w-8 text-blue-600" />
                 </div>
@@ -501,7 +531,7 @@ const GradingCenter = () => {
               <CardTitle>Student Submissions & Attempt Reviews</CardTitle>
             </CardHeader>
             <CardContent>
-              {submissions.length === 0 && attempts.length === 0 ? (
+              {queueCounts.total === 0 && attempts.length === 0 ? (
                 <div className="text-center py-8">
                   <MessageSquare className="h-12 w-12 text-gray-400 mx-auto mb-4" />
                   <h3 className="text-lg font-medium text-gray-900 mb-2">No Data Available</h3>
@@ -510,43 +540,32 @@ const GradingCenter = () => {
                   </p>
                 </div>
               ) : (
-                <Tabs defaultValue="pending" className="w-full">
+                <Tabs value={activeTab} onValueChange={handleTabChange} className="w-full">
                   <TabsList>
                     <TabsTrigger value="pending">Pending ({getPendingCount()})</TabsTrigger>
                     <TabsTrigger value="graded">Graded ({getGradedCount()})</TabsTrigger>
-                    <TabsTrigger value="all">All ({submissions.length})</TabsTrigger>
+                    <TabsTrigger value="all">All ({queueCounts.total})</TabsTrigger>
                     <TabsTrigger value="attempts">Attempt Reviews ({getFilteredAttempts().length})</TabsTrigger>
                   </TabsList>
                   
-                  <TabsContent value="pending" className="space-y-4">
-                    {submissions.filter(sub => sub.status === 'pending').map((submission) => (
-                      <SubmissionCard 
-                        key={submission.id} 
-                        submission={submission} 
-                        onGrade={() => startGrading(submission)}
-                      />
-                    ))}
-                  </TabsContent>
-                  
-                  <TabsContent value="graded" className="space-y-4">
-                    {submissions.filter(sub => sub.status === 'graded').map((submission) => (
-                      <SubmissionCard 
-                        key={submission.id} 
-                        submission={submission} 
-                        onGrade={() => startGrading(submission)}
-                      />
-                    ))}
-                  </TabsContent>
-                  
-                  <TabsContent value="all" className="space-y-4">
-                    {submissions.map((submission) => (
-                      <SubmissionCard 
-                        key={submission.id} 
-                        submission={submission} 
-                        onGrade={() => startGrading(submission)}
-                      />
-                    ))}
-                  </TabsContent>
+                  {['pending', 'graded', 'all'].map((tab) => (
+                    <TabsContent key={tab} value={tab} className="space-y-4">
+                      {submissions.map((submission) => (
+                        <SubmissionCard 
+                          key={submission.id} 
+                          submission={submission} 
+                          onGrade={() => startGrading(submission)}
+                        />
+                      ))}
+                      {nextCursor && (
+                        <div className="text-center">
+                          <Button variant="outline" onClick={loadMoreSubmissions} disabled={loadingMore}>
+                            {loadingMore ? 'Loading...' : 'Load more'}
+                          </Button>
+                        </div>
+                      )}
+                    </TabsContent>
+                  ))}
                   
                   <TabsContent value="attempts" className="space-y-4">
                     {/* Search and Filter Controls */}
@@ -58,7 +58,7 @@ const ProgramDetail = () => {
           
           // Load courses if program has courseIds
           if (programResult.program.courseIds && programResult.program.courseIds.length > 0) {
-            const coursesResult = await getAllCourses();
+            const coursesResult = await getAllCourses({ summary: true });
             if (coursesResult.success) {
               // Filter courses to only show those in this program
               const programCourses = coursesResult.courses.filter(course => 
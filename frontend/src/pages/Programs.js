@@ -94,7 +94,7 @@ const Programs = () => {
         }
 
         // Load courses
-        const coursesResult = await getAllCourses();
+        const coursesResult = await getAllCourses({ summary: true });
         if (coursesResult.success) {
           setCourses(coursesResult.courses);
         } else {
@@ -76,6 +76,8 @@ const QuizTakingNewFixed = () => {
   // Refs for stable references
   const isMountedRef = useRef(true);
   const timerRef = useRef(null);
+  // One id per quiz attempt, so resending its subjective answers can't store them twice
+  const attemptIdRef = useRef(null);
 
   // Utility function to shuffle array (Fisher-Yates shuffle)
   const shuffleArray = useCallback((array) => {
@@ -629,6 +631,7 @@ const QuizTakingNewFixed = () => {
             'Content-Type': 'application/json'
           },
           body: JSON.stringify({
+            attemptId: attemptIdRef.current,
             submissions: subjectiveSubmissions
           })
         });
@@ -1045,6 +1048,7 @@ const QuizTakingNewFixed = () => {
   // Start quiz
   const handleStartQuiz = useCallback(() => {
     if (!isMountedRef.current) return;
+    attemptIdRef.current = window.crypto?.randomUUID?.() || null;
     setQuizStarted(true);
     console.log('Quiz started');
   }, []);
@@ -0,0 +1,578 @@
+#!/usr/bin/env python3
+"""
+Synthetic data generator for load testing.
+
+Writes production-scale volumes straight to MongoDB (no HTTP): learners, instructors,
+courses with quiz lessons, programs, classrooms, enrollments with lesson progress,
+course quiz attempts and subjective submissions. Documents use the same shapes the
+API writes, including the lesson_contents split and the data submits maintain:
+attempt summaries, gradebook cells on enrollments, item scores and statistics, and
+submissions with deterministic ids, question points and student names.
+
+    python generate_load_test_data.py --drop                 # full scale
+    python generate_load_test_data.py --drop --scale 0.05    # quick local run
+
+Writes load_test_manifest.json for load_test_harness.py (credentials and sizes).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from passlib.context import CryptContext
+
+ROOT_DIR = Path(__file__).parent / 'backend'
+load_dotenv(ROOT_DIR / '.env')
+sys.path.insert(0, str(ROOT_DIR))
+
+# Reuse the server's helpers so generated courses match what the API stores
+from attempt_summaries import course_quiz_assessment  # noqa: E402
+from gradebook import lesson_grade  # noqa: E402
+from grading_queue import submission_id  # noqa: E402
+from item_analysis import item_scores, rebuild_statistics  # noqa: E402
+from routers.courses import compute_course_counts, lesson_content_hash, split_lesson_content  # noqa: E402
+
+LOAD_TEST_PASSWORD = "LoadTest123!"
+EMAIL_DOMAIN = "loadtest.local"
+BATCH_SIZE = 5000
+MANIFEST_PATH = Path(__file__).parent / 'load_test_manifest.json'
+
+COLLECTIONS = [
+    "users", "courses", "lesson_contents", "programs", "classrooms",
+    "enrollments", "quiz_attempts", "subjective_submissions", "categories",
+    "attempt_summaries", "item_statistics"
+]
+CATEGORIES = ["Compliance", "Leadership", "Safety", "Technology", "Sales", "Onboarding"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate synthetic LMS data for load testing")
+    parser.add_argument("--db", default=f"{os.environ.get('DB_NAME', 'learningfwiend')}_loadtest",
+                        help="Target database (default: <DB_NAME>_loadtest)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every volume by this factor")
+    parser.add_argument("--learners", type=int, default=20000)
+    parser.add_argument("--instructors", type=int, default=200)
+    parser.add_argument("--courses", type=int, default=500)
+    parser.add_argument("--programs", type=int, default=50)
+    parser.add_argument("--classrooms", type=int, default=200)
+    parser.add_argument("--enrollments-per-learner", type=int, default=5)
+    parser.add_argument("--progress-events", type=int, default=1_000_000,
+                        help="Lesson progress entries spread across enrollments")
+    parser.add_argument("--attempts", type=int, default=300_000, help="Course quiz attempts")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed, for repeatable datasets")
+    parser.add_argument("--drop", action="store_true", help="Drop the generated collections first")
+    return parser.parse_args()
+
+
+def scaled(args, value: int, minimum: int = 1) -> int:
+    return max(minimum, int(value * args.scale))
+
+
+class Generator:
+    def __init__(self, db, args):
+        self.db = db
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.now = datetime.utcnow()
+        self.hashed_password = CryptContext(schemes=["bcrypt"], deprecated="auto").hash(LOAD_TEST_PASSWORD)
+        self.learners = []
+        self.instructors = []
+        self.courses = []
+        self.quiz_lessons = {}  # courseId -> [(moduleId, lesson)]
+        self.enrollments = {}  # (studentId, courseId) -> enrollment
+        self.summaries = {}  # (studentId, lessonId) -> attempt summary
+
+    def new_id(self) -> str:
+        # Drawn from the seeded RNG so the same seed reproduces the same ids
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def past(self, max_days: int = 365) -> datetime:
+        return self.now - timedelta(seconds=self.rng.randint(0, max_days * 86400))
+
+    async def insert(self, collection: str, documents):
+        """Insert documents in unordered batches, reporting progress."""
+        batch = []
+        total = 0
+        start = time.perf_counter()
+        for document in documents:
+            batch.append(document)
+            if len(batch) >= BATCH_SIZE:
+                await self.db[collection].insert_many(batch, ordered=False)
+                total += len(batch)
+                batch = []
+                print(f"   {collection}: {total:,}", end="\r", flush=True)
+        if batch:
+            await self.db[collection].insert_many(batch, ordered=False)
+            total += len(batch)
+        print(f"✅ {collection}: {total:,} documents in {time.perf_counter() - start:.1f}s")
+        return total
+
+    def user(self, role: str, index: int) -> dict:
+        created = self.past()
+        return {
+            "id": self.new_id(),
+            "email": f"load{role}{index}@{EMAIL_DOMAIN}",
+            "username": f"load{role}{index}",
+            "full_name": f"Load {role.title()} {index}",
+            "role": role,
+            "department": None,
+            "hashed_password": self.hashed_password,
+            "is_temporary_password": False,
+            "first_login_required": False,
+            "is_active": True,
+            "created_at": created,
+            "last_login": None,
+            "password_updated_at": created
+        }
+
+    async def generate_users(self):
+        self.learners = [self.user("learner", i) for i in range(scaled(self.args, self.args.learners))]
+        self.instructors = [self.user("instructor", i) for i in range(scaled(self.args, self.args.instructors))]
+        admin = self.user("admin", 0)
+        await self.insert("users", self.learners + self.instructors + [admin])
+
+    def question(self, course_index: int, number: int) -> dict:
+        kind = self.rng.choices(
+            ["multiple_choice", "true_false", "select-all-that-apply", "chronological-order", "long_form"],
+            weights=[50, 20, 10, 10, 10]
+        )[0]
+        question = {
+            "id": self.new_id(),
+            "type": kind,
+            "question": f"Course {course_index} question {number}",
+            "points": self.rng.choice([1, 1, 2, 5])
+        }
+        if kind == "multiple_choice":
+            question["options"] = [f"Option {i}" for i in range(4)]
+            question["correctAnswer"] = str(self.rng.randrange(4))
+        elif kind == "true_false":
+            question["correctAnswer"] = self.rng.choice(["true", "false"])
+        elif kind == "select-all-that-apply":
+            question["options"] = [f"Option {i}" for i in range(5)]
+            question["correctAnswers"] = sorted(self.rng.sample(range(5), self.rng.randint(1, 3)))
+        elif kind == "chronological-order":
+            question["items"] = [f"Step {i}" for i in range(4)]
+            question["correctOrder"] = self.rng.sample(range(4), 4)
+        return question
+
+    def lesson(self, course_index: int, module_index: int, lesson_index: int, is_quiz: bool) -> dict:
+        lesson = {
+            "id": self.new_id(),
+            "title": f"Lesson {module_index + 1}.{lesson_index + 1}",
+            "duration": f"{self.rng.randint(5, 45)} min"
+        }
+        if is_quiz:
+            lesson["type"] = "quiz"
+            lesson["quiz"] = {
+                "questions": [self.question(course_index, n) for n in range(self.rng.randint(5, 20))],
+                "passingScore": 75,
+                "timeLimit": 30,
+                "maxAttempts": 3
+            }
+        else:
+            lesson["type"] = self.rng.choice(["text", "video", "video", "pdf"])
+            lesson["content"] = f"Lesson body {course_index}.{module_index}.{lesson_index} " * self.rng.randint(20, 200)
+        return lesson
+
+    async def generate_courses(self):
+        lesson_contents = []
+        categories = [{"id": self.new_id(), "name": name, "description": None, "isActive": True,
+                       "courseCount": 0, "created_at": self.now, "updated_at": self.now} for name in CATEGORIES]
+
+        for index in range(scaled(self.args, self.args.courses)):
+            instructor = self.rng.choice(self.instructors)
+            modules = []
+            for module_index in range(self.rng.randint(4, 8)):
+                lessons_in_module = self.rng.randint(3, 6)
+                quiz_at = lessons_in_module - 1 if self.rng.random() < 0.6 else None
+                modules.append({
+                    "id": self.new_id(),
+                    "title": f"Module {module_index + 1}",
+                    "lessons": [
+                        self.lesson(index, module_index, lesson_index, lesson_index == quiz_at)
+                        for lesson_index in range(lessons_in_module)
+                    ]
+                })
+
+            course_id = self.new_id()
+            self.quiz_lessons[course_id] = [
+                (module["id"], lesson) for module in modules for lesson in module["lessons"] if lesson["type"] == "quiz"
+            ]
+            outline_modules, contents, _ = split_lesson_content(modules)
+            for lesson_id, content in contents.items():
+                lesson_contents.append({
+                    "courseId": course_id,
+                    "lessonId": lesson_id,
+                    **content,
+                    "contentHash": lesson_content_hash(content),
+                    "created_at": self.now,
+                    "updated_at": self.now
+                })
+
+            created = self.past()
+            self.courses.append({
+                "id": course_id,
+                "title": f"Load Test Course {index}",
+                "description": f"Synthetic course {index} for load testing",
+                "category": self.rng.choice(CATEGORIES),
+                "duration": f"{len(modules) * 2} hours",
+                "thumbnailUrl": None,
+                "accessType": "open",
+                "learningOutcomes": ["Outcome A", "Outcome B"],
+                "modules": outline_modules,
+                **compute_course_counts(modules),
+                "canvaEmbedCode": None,
+                "instructorId": instructor["id"],
+                "instructor": instructor["full_name"],
+                "status": "published",
+                "enrolledStudents": 0,
+                "rating": 4.5,
+                "reviews": [],
+                "created_at": created,
+                "updated_at": created
+            })
+
+        await self.insert("categories", categories)
+        await self.insert("lesson_contents", lesson_contents)
+
+    async def generate_programs_and_classrooms(self):
+        programs = []
+        for index in range(scaled(self.args, self.args.programs)):
+            instructor = self.rng.choice(self.instructors)
+            course_ids = [c["id"] for c in self.rng.sample(self.courses, min(len(self.courses), self.rng.randint(3, 8)))]
+            programs.append({
+                "id": self.new_id(),
+                "title": f"Load Test Program {index}",
+                "description": "Synthetic program",
+                "departmentId": None,
+                "duration": None,
+                "courseIds": course_ids,
+                "nestedProgramIds": [],
+                "instructorId": instructor["id"],
+                "instructor": instructor["full_name"],
+                "isActive": True,
+                "courseCount": len(course_ids),
+                "created_at": self.now,
+                "updated_at": self.now
+            })
+
+        classrooms = []
+        for index in range(scaled(self.args, self.args.classrooms)):
+            trainer = self.rng.choice(self.instructors)
+            course_ids = [c["id"] for c in self.rng.sample(self.courses, min(len(self.courses), self.rng.randint(2, 5)))]
+            students = self.rng.sample(self.learners, min(len(self.learners), self.rng.randint(50, 150)))
+            program_ids = [self.rng.choice(programs)["id"]] if programs and self.rng.random() < 0.3 else []
+            classrooms.append({
+                "id": self.new_id(),
+                "name": f"Load Test Classroom {index}",
+                "description": None,
+                "trainerId": trainer["id"],
+                "courseIds": course_ids,
+                "programIds": program_ids,
+                "studentIds": [s["id"] for s in students],
+                "batchId": None,
+                "startDate": self.past(90),
+                "endDate": None,
+                "maxStudents": None,
+                "department": None,
+                "trainerName": trainer["full_name"],
+                "isActive": True,
+                "createdBy": trainer["id"],
+                "created_at": self.now,
+                "updated_at": self.now
+            })
+            # Classroom assignment auto-enrolls students, as the API does
+            for student in students:
+                for course_id in course_ids:
+                    self.enroll(student, course_id)
+
+        await self.insert("programs", programs)
+        await self.insert("classrooms", classrooms)
+
+    def enroll(self, student: dict, course_id: str):
+        key = (student["id"], course_id)
+        if key not in self.enrollments:
+            enrolled = self.past(180)
+            self.enrollments[key] = {
+                "id": self.new_id(),
+                "userId": student["id"],
+                "courseId": course_id,
+                "studentId": student["id"],
+                "studentName": student["full_name"],
+                "enrollmentDate": enrolled,
+                "enrolledAt": enrolled,
+                "progress": 0.0,
+                "lastAccessedAt": None,
+                "completedAt": None,
+                "grade": None,
+                "status": "active",
+                "isActive": True,
+                "enrolledBy": student["id"],
+                "created_at": enrolled,
+                "updated_at": enrolled
+            }
+
+    async def generate_enrollments(self):
+        courses_by_id = {course["id"]: course for course in self.courses}
+        per_learner = self.args.enrollments_per_learner
+        for learner in self.learners:
+            count = min(len(self.courses), self.rng.randint(1, per_learner * 2 - 1))
+            for course in self.rng.sample(self.courses, count):
+                self.enroll(learner, course["id"])
+
+        # Spread the lesson progress entries across enrollments
+        events_per_enrollment = scaled(self.args, self.args.progress_events) / max(1, len(self.enrollments))
+        progress_events = 0
+        for enrollment in self.enrollments.values():
+            course = courses_by_id[enrollment["courseId"]]
+            course["enrolledStudents"] += 1
+            course_name = course["title"]
+            enrollment["courseName"] = course_name
+
+            lesson_budget = min(course["totalLessons"], int(self.rng.uniform(0, 2 * events_per_enrollment) + 0.5))
+            if not lesson_budget:
+                continue
+            module_progress = []
+            completed_lessons = 0
+            time_spent = 0
+            last_accessed = enrollment["enrolledAt"]
+            for module in course["modules"]:
+                if lesson_budget <= 0:
+                    break
+                lessons = []
+                for lesson in module["lessons"][:lesson_budget]:
+                    completed = self.rng.random() < 0.85
+                    spent = self.rng.randint(30, 1800)
+                    last_accessed = min(self.now, last_accessed + timedelta(seconds=spent + self.rng.randint(60, 86400)))
+                    lessons.append({
+                        "lessonId": lesson["id"],
+                        "completed": completed,
+                        "completedAt": last_accessed if completed else None,
+                        "timeSpent": spent
+                    })
+                    completed_lessons += completed
+                    time_spent += spent
+                lesson_budget -= len(lessons)
+                progress_events += len(lessons)
+                module_done = len(lessons) == len(module["lessons"]) and all(l["completed"] for l in lessons)
+                module_progress.append({
+                    "moduleId": module["id"],
+                    "lessons": lessons,
+                    "completed": module_done,
+                    "completedAt": last_accessed if module_done else None
+                })
+
+            progress = round(completed_lessons / course["totalLessons"] * 100, 2) if course["totalLessons"] else 0.0
+            enrollment.update({
+                "moduleProgress": module_progress,
+                "progress": progress,
+                "timeSpent": time_spent,
+                "lastAccessedAt": last_accessed,
+                "currentModuleId": module_progress[-1]["moduleId"],
+                "currentLessonId": module_progress[-1]["lessons"][-1]["lessonId"],
+                "updated_at": last_accessed
+            })
+            if progress >= 100:
+                enrollment.update({"status": "completed", "completedAt": last_accessed})
+
+        # Enrollments are inserted with the attempts, once their gradebook cells are known
+        await self.insert("courses", self.courses)
+        print(f"   lesson progress entries: {progress_events:,}")
+
+    def answer(self, question: dict):
+        """A plausible answer: right about 70% of the time."""
+        correct = self.rng.random() < 0.7
+        kind = question["type"]
+        if kind == "multiple_choice":
+            return question["correctAnswer"] if correct else str(self.rng.randrange(4))
+        if kind == "true_false":
+            return question["correctAnswer"] if correct else self.rng.choice(["true", "false"])
+        if kind == "select-all-that-apply":
+            return question["correctAnswers"] if correct else sorted(self.rng.sample(range(5), 2))
+        if kind == "chronological-order":
+            return question["correctOrder"] if correct else self.rng.sample(range(4), 4)
+        return "Synthetic free-text answer " * self.rng.randint(1, 30)
+
+    def is_correct(self, question: dict, answer) -> bool:
+        kind = question["type"]
+        if kind == "select-all-that-apply":
+            return sorted(answer) == sorted(question["correctAnswers"])
+        if kind == "chronological-order":
+            return answer == question["correctOrder"]
+        if kind == "long_form":
+            return bool(answer.strip())
+        return str(answer).lower() == str(question["correctAnswer"]).lower()
+
+    def attempts(self, submissions: list):
+        """Yield course quiz attempts; subjective answers are collected into submissions."""
+        quiz_enrollments = [e for e in self.enrollments.values() if self.quiz_lessons.get(e["courseId"])]
+        if not quiz_enrollments:
+            return
+        for _ in range(scaled(self.args, self.args.attempts, minimum=0)):
+            enrollment = self.rng.choice(quiz_enrollments)
+            _, lesson = self.rng.choice(self.quiz_lessons[enrollment["courseId"]])
+            submitted = min(self.now, enrollment["enrolledAt"] + timedelta(seconds=self.rng.randint(600, 90 * 86400)))
+            attempt_id = self.new_id()
+
+            answers = []
+            points_earned = 0
+            total_points = 0
+            for question in lesson["quiz"]["questions"]:
+                answer = self.answer(question)
+                correct = self.is_correct(question, answer)
+                earned = question["points"] if correct else 0
+                total_points += question["points"]
+                points_earned += earned
+                answer_record = {"questionId": question["id"], "answer": answer, "isCorrect": correct, "pointsEarned": earned}
+                answers.append(answer_record)
+                if question["type"] == "long_form":
+                    graded = self.rng.random() < 0.3
+                    answer_record["submissionId"] = submission_id("quiz", attempt_id, question["id"])
+                    submissions.append({
+                        "_id": answer_record["submissionId"],
+                        "id": answer_record["submissionId"],
+                        "attemptId": attempt_id,
+                        "courseId": enrollment["courseId"],
+                        "lessonId": lesson["id"],
+                        "questionId": question["id"],
+                        "studentId": enrollment["studentId"],
+                        "studentName": enrollment["studentName"],
+                        "questionText": question["question"],
+                        "questionPoints": question["points"],
+                        "studentAnswer": answer,
+                        "questionType": "long_form",
+                        "answer": answer,
+                        "status": "graded" if graded else "pending",
+                        "maxScore": question["points"],
+                        "score": self.rng.randint(0, question["points"]) if graded else None,
+                        "submittedAt": submitted,
+                        "isActive": True,
+                        "created_at": submitted,
+                        "updated_at": submitted
+                    })
+
+            score = round(points_earned / total_points * 100, 2) if total_points else 0
+            is_passed = score >= lesson["quiz"].get("passingScore", 75)
+            self.summarize(enrollment, lesson, score, is_passed, submitted)
+            yield {
+                "id": attempt_id,
+                "courseId": enrollment["courseId"],
+                "lessonId": lesson["id"],
+                "studentId": enrollment["studentId"],
+                "answers": answers,
+                "score": score,
+                "pointsEarned": points_earned,
+                "totalPoints": total_points,
+                "timeSpent": self.rng.randint(60, 1800),
+                "isPassed": is_passed,
+                "itemScores": item_scores(lesson["quiz"]["questions"], answers),
+                "submittedAt": submitted,
+                "isActive": True,
+                "created_at": submitted,
+                "updated_at": submitted
+            }
+
+    def summarize(self, enrollment: dict, lesson: dict, score: float, is_passed: bool, submitted: datetime):
+        """Fold one attempt into the student's summary, as record_attempt_result does."""
+        key = (enrollment["studentId"], lesson["id"])
+        summary = self.summaries.get(key)
+        if summary is None:
+            summary = self.summaries[key] = {
+                "studentId": enrollment["studentId"],
+                "assessmentId": lesson["id"],
+                "kind": "course_quiz",
+                "courseId": enrollment["courseId"],
+                "attemptCount": 0,
+                "bestScore": score,
+                "lastScore": score,
+                "passed": False,
+                "lastAttemptAt": submitted,
+                "updated_at": submitted
+            }
+        summary["attemptCount"] += 1
+        summary["bestScore"] = max(summary["bestScore"], score)
+        summary["passed"] = summary["passed"] or is_passed
+        # Attempts are drawn in random order; the last score is the latest attempt's
+        if submitted >= summary["lastAttemptAt"]:
+            summary["lastScore"] = score
+            summary["lastAttemptAt"] = summary["updated_at"] = submitted
+
+    async def generate_attempts(self):
+        submissions = []
+        await self.insert("quiz_attempts", self.attempts(submissions))
+        await self.insert("subjective_submissions", submissions)
+        await self.insert("attempt_summaries", self.summaries.values())
+
+        for summary in self.summaries.values():
+            enrollment = self.enrollments[(summary["studentId"], summary["courseId"])]
+            enrollment.setdefault("lessonGrades", {})[summary["assessmentId"]] = lesson_grade(summary)
+        await self.insert("enrollments", list(self.enrollments.values()))
+
+    async def generate_item_statistics(self):
+        """Item statistics from the stored attempts, one rebuild per attempted quiz lesson."""
+        start = time.perf_counter()
+        attempted = {(summary["courseId"], summary["assessmentId"]) for summary in self.summaries.values()}
+        for course_id, quiz_lessons in self.quiz_lessons.items():
+            for _, lesson in quiz_lessons:
+                if (course_id, lesson["id"]) in attempted:
+                    assessment = course_quiz_assessment(self.db.quiz_attempts, course_id, lesson["id"], lesson["quiz"])
+                    await rebuild_statistics(self.db.item_statistics, assessment, lesson["quiz"]["questions"])
+        print(f"✅ item_statistics: {len(attempted):,} quiz lessons in {time.perf_counter() - start:.1f}s")
+
+    def write_manifest(self):
+        manifest = {
+            "database": self.args.db,
+            "generatedAt": self.now.isoformat(),
+            "seed": self.args.seed,
+            "password": LOAD_TEST_PASSWORD,
+            "learnerUsernameFormat": "loadlearner{index}",
+            "instructorUsernameFormat": "loadinstructor{index}",
+            "adminUsername": "loadadmin0",
+            "counts": {
+                "learners": len(self.learners),
+                "instructors": len(self.instructors),
+                "courses": len(self.courses),
+                "enrollments": len(self.enrollments)
+            }
+        }
+        MANIFEST_PATH.write_text(json.dumps(manifest, indent=2))
+        print(f"📄 Manifest written to {MANIFEST_PATH}")
+
+
+async def main():
+    args = parse_args()
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[args.db]
+    print(f"🎲 Generating load test data in '{args.db}' (scale {args.scale}, seed {args.seed})")
+
+    if args.drop:
+        for collection in COLLECTIONS:
+            await db[collection].drop()
+        print(f"🗑️  Dropped {len(COLLECTIONS)} collections")
+    elif await db.users.count_documents({"email": {"$regex": f"@{EMAIL_DOMAIN}$"}}, limit=1):
+        print("❌ Load test data already exists in this database; rerun with --drop")
+        return
+
+    start = time.perf_counter()
+    generator = Generator(db, args)
+    await generator.generate_users()
+    await generator.generate_courses()
+    await generator.generate_programs_and_classrooms()
+    await generator.generate_enrollments()
+    await generator.generate_attempts()
+    await generator.generate_item_statistics()
+    generator.write_manifest()
+    client.close()
+    print(f"🎉 Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
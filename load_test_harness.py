@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Load test harness.
+
+Replays the main learner and instructor journeys against a running server with
+closed-loop virtual users, then reports latency percentiles and throughput per
+journey and per step. Run generate_load_test_data.py first and point the server
+at the generated database.
+
+    python load_test_harness.py --base-url http://localhost:8001 --learners 50 --instructors 5 --duration 120
+    python load_test_harness.py --output after.json --baseline before.json --max-regression 10
+
+With --baseline the run exits non-zero when any journey's p95 latency regresses by
+more than --max-regression percent, so a change can be accepted or rejected on numbers.
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+import aiohttp
+
+MANIFEST_PATH = Path(__file__).parent / 'load_test_manifest.json'
+PERCENTILES = (50, 90, 95, 99)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay learner and instructor journeys and report latency")
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--manifest", type=Path, default=MANIFEST_PATH)
+    parser.add_argument("--learners", type=int, default=50, help="Concurrent learner virtual users")
+    parser.add_argument("--instructors", type=int, default=5, help="Concurrent instructor virtual users")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds to run")
+    parser.add_argument("--heartbeats", type=int, default=5, help="Progress heartbeats per learner journey")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Max random pause between steps (seconds)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", type=Path, default=Path("load_test_results.json"))
+    parser.add_argument("--baseline", type=Path, help="Earlier results file to compare against")
+    parser.add_argument("--max-regression", type=float, default=10.0,
+                        help="Allowed p95 regression per journey, in percent")
+    return parser.parse_args()
+
+
+def percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+class StepFailed(Exception):
+    pass
+
+
+class Recorder:
+    """Latency samples and error counts keyed by journey and by journey step."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, name: str, seconds: float):
+        self.samples[name].append(seconds * 1000)
+
+    def error(self, name: str):
+        self.errors[name] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        summary = {}
+        for name in sorted(set(self.samples) | set(self.errors)):
+            values = sorted(self.samples[name])
+            summary[name] = {
+                "count": len(values),
+                "errors": self.errors[name],
+                "throughputPerSec": round(len(values) / elapsed, 2) if elapsed else 0.0,
+                "meanMs": round(sum(values) / len(values), 1) if values else 0.0,
+                **{f"p{pct}Ms": round(percentile(values, pct), 1) for pct in PERCENTILES},
+                "maxMs": round(values[-1], 1) if values else 0.0
+            }
+        return summary
+
+
+class VirtualUser:
+    def __init__(self, session: aiohttp.ClientSession, recorder: Recorder, args, manifest: dict, rng: random.Random):
+        self.session = session
+        self.recorder = recorder
+        self.args = args
+        self.manifest = manifest
+        self.rng = rng
+        self.headers = {}
+
+    async def think(self):
+        if self.args.think_time:
+            await asyncio.sleep(self.rng.uniform(0, self.args.think_time))
+
+    async def step(self, journey: str, name: str, method: str, path: str, **kwargs):
+        """Time one request; non-2xx responses count as errors and abort the journey."""
+        label = f"{journey}.{name}"
+        start = time.perf_counter()
+        try:
+            async with self.session.request(method, f"{self.args.base_url}/api{path}", headers=self.headers, **kwargs) as response:
+                body = await response.read()
+                elapsed = time.perf_counter() - start
+                if response.status >= 400:
+                    self.recorder.error(label)
+                    raise StepFailed(f"{method} {path} -> {response.status}: {body[:200]!r}")
+        except aiohttp.ClientError as e:
+            self.recorder.error(label)
+            raise StepFailed(f"{method} {path} -> {e}")
+        self.recorder.record(label, elapsed)
+        await self.think()
+        return json.loads(body) if body else None
+
+    async def login(self, journey: str, username: str):
+        self.headers = {}
+        result = await self.step(journey, "login", "POST", "/auth/login", json={
+            "username_or_email": username,
+            "password": self.manifest["password"]
+        })
+        self.headers = {"Authorization": f"Bearer {result['access_token']}"}
+
+    async def run(self, deadline: float):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                await self.journey()
+            except StepFailed as e:
+                self.recorder.error(self.name)
+                print(f"⚠️  {self.name}: {e}", file=sys.stderr)
+                await asyncio.sleep(1)
+                continue
+            self.recorder.record(self.name, time.perf_counter() - start)
+
+
+class LearnerUser(VirtualUser):
+    name = "learner_journey"
+
+    async def journey(self):
+        j = self.name
+        index = self.rng.randrange(self.manifest["counts"]["learners"])
+        await self.login(j, self.manifest["learnerUsernameFormat"].format(index=index))
+
+        await self.step(j, "catalog", "GET", "/courses/summary")
+        my_courses = await self.step(j, "my_courses", "GET", "/courses/my-courses/summary")
+        if not my_courses:
+            return
+        course_id = self.rng.choice(my_courses)["id"]
+        course = await self.step(j, "course_open", "GET", f"/courses/{course_id}", params={"include_content": "false"})
+
+        lessons = [(module["id"], lesson) for module in course.get("modules", []) for lesson in module.get("lessons", [])]
+        if not lessons:
+            return
+        module_id, lesson = self.rng.choice(lessons)
+        await self.step(j, "lesson_open", "GET", f"/courses/{course_id}/lessons/{lesson['id']}")
+
+        time_spent = 0
+        for _ in range(self.args.heartbeats):
+            time_spent += 30
+            await self.step(j, "progress_heartbeat", "PUT", f"/enrollments/{course_id}/progress", json={
+                "currentModuleId": module_id,
+                "currentLessonId": lesson["id"],
+                "lastAccessedAt": datetime.utcnow().isoformat(),
+                "timeSpent": time_spent
+            })
+        if lesson.get("type") != "quiz":
+            await self.step(j, "lesson_complete", "POST", f"/enrollments/{course_id}/lessons/{lesson['id']}/progress", json={
+                "completed": True,
+                "timeSpent": time_spent
+            })
+
+        quiz_lessons = [l for _, l in lessons if l.get("type") == "quiz"]
+        if quiz_lessons:
+            quiz_lesson = self.rng.choice(quiz_lessons)
+            content = await self.step(j, "quiz_open", "GET", f"/courses/{course_id}/lessons/{quiz_lesson['id']}")
+            questions = (content.get("quiz") or {}).get("questions", [])
+            await self.step(j, "quiz_submit", "POST", f"/courses/{course_id}/lessons/{quiz_lesson['id']}/quiz/submit", json={
+                "answers": [{"questionId": q.get("id"), "answer": self.answer(q)} for q in questions],
+                "timeSpent": self.rng.randint(60, 900)
+            })
+
+    def answer(self, question: dict):
+        kind = question.get("type")
+        if kind == "select-all-that-apply":
+            return question.get("correctAnswers") or [0]
+        if kind == "chronological-order":
+            return question.get("correctOrder") or []
+        if kind in ("short_answer", "long_form", "essay"):
+            return "Load test answer"
+        return question.get("correctAnswer", "0")
+
+
+class InstructorUser(VirtualUser):
+    name = "instructor_journey"
+
+    async def journey(self):
+        j = self.name
+        index = self.rng.randrange(self.manifest["counts"]["instructors"])
+        await self.login(j, self.manifest["instructorUsernameFormat"].format(index=index))
+
+        catalog = await self.step(j, "catalog", "GET", "/courses/summary")
+        await self.step(j, "grading_center", "GET", "/courses/all/submissions")
+        queue = await self.step(j, "grading_queue", "GET", "/grading/queue", params={"status": "pending"})
+        if queue and queue.get("nextCursor"):
+            await self.step(j, "grading_queue_next", "GET", "/grading/queue",
+                            params={"status": "pending", "cursor": queue["nextCursor"]})
+        if catalog:
+            course_id = self.rng.choice(catalog)["id"]
+            await self.step(j, "course_submissions", "GET", f"/courses/{course_id}/submissions")
+            await self.step(j, "gradebook", "GET", f"/gradebook/courses/{course_id}")
+        await self.step(j, "analytics_dashboard", "GET", "/analytics/dashboard")
+        await self.step(j, "system_stats", "GET", "/analytics/system-stats")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_summary(summary: dict):
+    print(f"\n{'name':42} {'count':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for name, stats in summary.items():
+        print(
+            f"{name:42} {stats['count']:>7} {stats['errors']:>5} {stats['throughputPerSec']:>8.2f} "
+            f"{stats['p50Ms']:>8.1f} {stats['p90Ms']:>8.1f} {stats['p95Ms']:>8.1f} {stats['p99Ms']:>8.1f} {stats['maxMs']:>8.1f}"
+        )
+
+
+def compare(summary: dict, baseline_path: Path, max_regression: float) -> bool:
+    """Print p95 changes against a baseline. Returns False if a journey regressed too far."""
+    baseline = json.loads(baseline_path.read_text())["results"]
+    print(f"\n📊 p95 vs baseline {baseline_path} (allowed regression {max_regression:.0f}%)")
+    accepted = True
+    for name, stats in summary.items():
+        before = baseline.get(name, {}).get("p95Ms")
+        if not before:
+            continue
+        change = (stats["p95Ms"] - before) / before * 100
+        is_journey = "." not in name
+        flag = ""
+        if is_journey and change > max_regression:
+            accepted = False
+            flag = "❌"
+        print(f"{name:42} {before:>8.1f} -> {stats['p95Ms']:>8.1f} ms ({change:+.1f}%) {flag}")
+    print("✅ Accepted" if accepted else "❌ Rejected: p95 regression over threshold")
+    return accepted
+
+
+async def main():
+    args = parse_args()
+    if not args.manifest.exists():
+        print(f"❌ Manifest not found: {args.manifest} (run generate_load_test_data.py first)")
+        sys.exit(1)
+    manifest = json.loads(args.manifest.read_text())
+
+    recorder = Recorder()
+    rng = random.Random(args.seed)
+    connector = aiohttp.TCPConnector(limit=args.learners + args.instructors)
+    timeout = aiohttp.ClientTimeout(total=60)
+
+    print(f"🚀 {args.learners} learners + {args.instructors} instructors against {args.base_url} for {args.duration:.0f}s")
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        users = [LearnerUser(session, recorder, args, manifest, random.Random(rng.random())) for _ in range(args.learners)]
+        users += [InstructorUser(session, recorder, args, manifest, random.Random(rng.random())) for _ in range(args.instructors)]
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(*(user.run(deadline) for user in users))
+        elapsed = time.perf_counter() - start
+
+    summary = recorder.summary(elapsed)
+    print_summary(summary)
+    args.output.write_text(json.dumps({
+        "runAt": datetime.utcnow().isoformat(),
+        "commit": git_commit(),
+        "baseUrl": args.base_url,
+        "dataset": {"database": manifest.get("database"), "seed": manifest.get("seed"), **manifest.get("counts", {})},
+        "config": {
+            "learners": args.learners,
+            "instructors": args.instructors,
+            "duration": args.duration,
+            "heartbeats": args.heartbeats,
+            "thinkTime": args.think_time
+        },
+        "elapsedSeconds": round(elapsed, 2),
+        "results": summary
+    }, indent=2))
+    print(f"\n📄 Results written to {args.output}")
+
+    if args.baseline and not compare(summary, args.baseline, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,259 @@
+"""
+Shared fixtures for the in-process API tests.
+
+The FastAPI app runs in-process through Starlette's TestClient. Mongo is a
+mongomock-motor stand-in by default; set TEST_MONGO_URL to run the same tests
+against a real mongod (each seeded dataset gets its own throwaway database).
+"""
+
+import inspect
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+# core.py reads these at import time; the client it builds is lazy and never used here
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "learningfwiend_test")
+
+TEST_MONGO_URL = os.environ.get("TEST_MONGO_URL")
+
+
+class QueryCounter:
+    """Mongo operations and documents returned while a request is served."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.commands = 0
+        self.documents = 0
+        self.operations = []
+
+    def record(self, collection: str, operation: str, documents: int = 0):
+        self.commands += 1
+        self.documents += documents
+        self.operations.append(f"{collection}.{operation}")
+
+
+def _document_count(result) -> int:
+    if isinstance(result, dict):
+        return 1
+    if isinstance(result, list):
+        return len(result)
+    return 0
+
+
+class CountingCursor:
+    """Wraps a Motor cursor; the round trip is counted when results are read."""
+
+    def __init__(self, cursor, counter: QueryCounter, collection: str, operation: str):
+        self._cursor = cursor
+        self._counter = counter
+        self._collection = collection
+        self._operation = operation
+        self._iterating = False
+
+    def __getattr__(self, name):
+        attr = getattr(self._cursor, name)
+        if not callable(attr):
+            return attr
+
+        def chained(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            # sort/limit/skip return the cursor itself so calls can be chained
+            return self if result is self._cursor else result
+        return chained
+
+    async def to_list(self, length=None):
+        documents = await self._cursor.to_list(length)
+        self._counter.record(self._collection, self._operation, len(documents))
+        return documents
+
+    def __aiter__(self):
+        self._counter.record(self._collection, self._operation)
+        self._iterating = self._cursor.__aiter__()
+        return self
+
+    async def __anext__(self):
+        document = await self._iterating.__anext__()
+        self._counter.documents += 1
+        return document
+
+
+class CountingCollection:
+    """Counts every awaited Motor collection call and the documents it returns."""
+
+    CURSOR_METHODS = ("find", "aggregate", "list_indexes")
+
+    def __init__(self, collection, counter: QueryCounter):
+        self._collection = collection
+        self._counter = counter
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if not callable(attr):
+            return attr
+        collection_name = self._collection.name
+
+        if name in self.CURSOR_METHODS:
+            def cursor(*args, **kwargs):
+                return CountingCursor(attr(*args, **kwargs), self._counter, collection_name, name)
+            return cursor
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if not inspect.isawaitable(result):
+                return result
+
+            async def counted():
+                value = await result
+                self._counter.record(collection_name, name, _document_count(value))
+                return value
+            return counted()
+        return call
+
+
+class CountingDatabase:
+    """Stand-in for core.db that hands out counting collections."""
+
+    def __init__(self, database, counter: QueryCounter):
+        self._database = database
+        self._counter = counter
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return CountingCollection(self._database[name], self._counter)
+
+    def __getitem__(self, name):
+        return CountingCollection(self._database[name], self._counter)
+
+    async def list_collection_names(self, *args, **kwargs):
+        self._counter.record("$db", "list_collection_names")
+        return await self._database.list_collection_names(*args, **kwargs)
+
+
+def make_user(role: str, index: int = 0, **fields) -> dict:
+    """A user document as the app stores it; index keeps emails and usernames unique."""
+    from routers.auth import UserInDB
+
+    return UserInDB(**{
+        "email": f"{role}{index}@example.com",
+        "username": f"{role}{index}",
+        "full_name": f"{role.title()} {index}",
+        "role": role,
+        "hashed_password": "not-used",
+        **fields
+    }).dict()
+
+
+def auth_headers(user: dict) -> dict:
+    """Bearer headers for a user document."""
+    from routers.auth import create_access_token
+
+    return {"Authorization": f"Bearer {create_access_token({'sub': user['id']})}"}
+
+
+@pytest.fixture(scope="session")
+def server_module():
+    import server
+    return server
+
+
+@pytest.fixture(scope="session")
+def api_client(server_module):
+    """One TestClient (and event loop) for the whole session, without the startup hooks.
+
+    Startup pings the configured MONGO_URL and starts background tasks, neither of
+    which these tests want.
+    """
+    from fastapi.testclient import TestClient
+
+    router = server_module.app.router
+    on_startup, on_shutdown = router.on_startup, router.on_shutdown
+    router.on_startup, router.on_shutdown = [], []
+    try:
+        with TestClient(server_module.app) as client:
+            yield client
+    finally:
+        router.on_startup, router.on_shutdown = on_startup, on_shutdown
+
+
+@pytest.fixture(scope="session")
+def run_async(api_client):
+    """Run a coroutine function on the app's event loop."""
+    def run(func, *args, **kwargs):
+        return api_client.portal.call(lambda: func(*args, **kwargs))
+    return run
+
+
+@pytest.fixture(scope="session")
+def mongo_client(run_async):
+    if TEST_MONGO_URL:
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        async def connect():
+            return AsyncIOMotorClient(TEST_MONGO_URL)
+        client = run_async(connect)
+    else:
+        mongomock_motor = pytest.importorskip("mongomock_motor")
+        client = mongomock_motor.AsyncMongoMockClient()
+    yield client
+    if TEST_MONGO_URL:
+        client.close()
+
+
+@pytest.fixture(scope="session")
+def database_factory(mongo_client, run_async):
+    """Create empty, uniquely named databases that are dropped at session end."""
+    created = []
+
+    def create():
+        name = f"lms_test_{uuid.uuid4().hex[:12]}"
+        created.append(name)
+        return mongo_client[name]
+
+    yield create
+
+    for name in created:
+        run_async(mongo_client.drop_database, name)
+
+
+@pytest.fixture(scope="session")
+def use_database(server_module):
+    """Point the app at a database and count the queries it receives from then on.
+
+    Router modules bind core.db and core.analytics_db when they are imported, so every
+    module holding either original handle is repointed, not just core.
+    """
+    import core
+
+    originals = {name: getattr(core, name) for name in ("db", "analytics_db")}
+    original_buffer_collection = core.progress_write_buffer.collection
+    bindings = [
+        (module, name)
+        for module in list(sys.modules.values())
+        for name, original in originals.items()
+        if vars(module).get(name) is original
+    ]
+    counter = QueryCounter()
+
+    def use(database):
+        counting = CountingDatabase(database, counter)
+        for module, name in bindings:
+            setattr(module, name, counting)
+        core.progress_write_buffer.collection = counting.enrollments
+        counter.reset()
+        return counter
+
+    yield use
+
+    for module, name in bindings:
+        setattr(module, name, originals[name])
+    core.progress_write_buffer.collection = original_buffer_collection
@@ -0,0 +1,89 @@
+"""
+Analytics read routing.
+
+The analytics handle must prefer secondaries with a staleness bound and use its own
+pool. The routing test needs a replica set with at least one secondary; a local one:
+
+    for port in 27017 27018 27019; do
+        mkdir -p /tmp/rs0-$port && mongod --replSet rs0 --port $port --dbpath /tmp/rs0-$port --fork --logpath /tmp/rs0-$port.log
+    done
+    mongosh --port 27017 --eval 'rs.initiate({_id: "rs0", members: [
+        {_id: 0, host: "localhost:27017"}, {_id: 1, host: "localhost:27018"}, {_id: 2, host: "localhost:27019"}]})'
+
+    TEST_MONGO_REPLICA_SET_URL="mongodb://localhost:27017,localhost:27018,localhost:27019/?replicaSet=rs0" \\
+        python -m pytest tests/test_analytics_reads.py
+"""
+
+import os
+import uuid
+
+import pytest
+from pymongo import monitoring
+
+from mongo_pool import analytics_options_from_env
+
+TEST_MONGO_REPLICA_SET_URL = os.environ.get("TEST_MONGO_REPLICA_SET_URL")
+
+
+def test_analytics_handle_prefers_secondaries_with_own_pool():
+    import core
+
+    read_preference = core.analytics_db.read_preference
+    assert read_preference.mongos_mode == "secondaryPreferred"
+    assert read_preference.max_staleness == 120
+    assert core.analytics_client is not core.client
+    assert core.analytics_client.options.pool_options.max_pool_size == 5
+
+
+def test_analytics_options_overrides():
+    options = analytics_options_from_env("mongodb://localhost:27017", environ={
+        "ANALYTICS_MAX_POOL_SIZE": "2",
+        "ANALYTICS_MAX_STALENESS_SECONDS": "300",
+        "ANALYTICS_COMPRESSORS": "zlib"
+    })
+    assert options["maxPoolSize"] == 2
+    assert options["maxStalenessSeconds"] == 300
+    assert options["compressors"] == "zlib"
+
+    primary = analytics_options_from_env("mongodb://localhost:27017", environ={"ANALYTICS_READ_PREFERENCE": "primary"})
+    assert "maxStalenessSeconds" not in primary
+
+
+class CommandAddresses(monitoring.CommandListener):
+    def __init__(self):
+        self.addresses = {}
+
+    def started(self, event):
+        self.addresses.setdefault(event.command_name, []).append(event.connection_id)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+@pytest.mark.skipif(not TEST_MONGO_REPLICA_SET_URL, reason="set TEST_MONGO_REPLICA_SET_URL to a replica set")
+def test_analytics_reads_are_served_by_a_secondary():
+    from pymongo import MongoClient, WriteConcern
+
+    name = f"lms_test_{uuid.uuid4().hex[:12]}"
+    primary = MongoClient(TEST_MONGO_REPLICA_SET_URL)
+    listener = CommandAddresses()
+    analytics = MongoClient(
+        TEST_MONGO_REPLICA_SET_URL,
+        event_listeners=[listener],
+        **analytics_options_from_env(TEST_MONGO_REPLICA_SET_URL)
+    )
+    try:
+        collection = primary[name].get_collection("enrollments", write_concern=WriteConcern(w="majority"))
+        collection.insert_one({"id": "e1", "progress": 50})
+        analytics[name].enrollments.count_documents({})
+
+        secondaries = analytics.secondaries
+        assert secondaries, "the replica set has no secondary to read from"
+        assert set(listener.addresses["aggregate"]) <= secondaries
+    finally:
+        primary.drop_database(name)
+        primary.close()
+        analytics.close()
@@ -0,0 +1,93 @@
+"""
+Detailed attempt views: cached question index and per-question results stored on the attempt.
+"""
+
+import pytest
+
+from tests.conftest import auth_headers, make_user
+
+QUESTION_COUNT = 150
+
+
+def make_questions() -> list:
+    questions = []
+    for index in range(QUESTION_COUNT):
+        if index % 10 == 0:
+            questions.append({"id": f"q{index}", "type": "long_form", "question": "Explain", "points": 5})
+        else:
+            questions.append({"id": f"q{index}", "type": "multiple_choice", "question": "Pick",
+                              "options": ["a", "b"], "correctAnswer": "0", "points": 1})
+    return questions
+
+
+@pytest.fixture
+def review_data(database_factory, use_database, run_async):
+    database = database_factory()
+    instructor, learner = make_user("instructor"), make_user("learner")
+    run_async(database.users.insert_many, [instructor, learner])
+    questions = make_questions()
+    run_async(database.programs.insert_one, {"id": "program-1", "title": "Program"})
+    run_async(database.final_tests.insert_one, {
+        "id": "review-test",
+        "title": "Review test",
+        "programId": "program-1",
+        "questions": questions,
+        "totalPoints": sum(q["points"] for q in questions),
+        "maxAttempts": 3,
+        "isPublished": True,
+        "isActive": True
+    })
+    counter = use_database(database)
+    headers = {
+        role: auth_headers(user)
+        for role, user in (("instructor", instructor), ("learner", learner))
+    }
+    return database, counter, headers, questions
+
+
+def test_final_test_review_reads_attempt_and_cached_test(api_client, run_async, review_data):
+    database, counter, headers, questions = review_data
+    answers = [{"questionId": q["id"], "answer": "Because" if q["type"] == "long_form" else "1"} for q in questions]
+    response = api_client.post("/api/final-test-attempts", headers=headers["learner"], json={
+        "testId": "review-test", "programId": "program-1", "answers": answers
+    })
+    assert response.status_code == 200, response.text
+    attempt_id = response.json()["id"]
+
+    graded = api_client.post(f"/api/submissions/final-{attempt_id}-q0/grade", headers=headers["instructor"],
+                             json={"score": 2, "feedback": "Thin"})
+    assert graded.status_code == 200, graded.text
+
+    counter.reset()
+    response = api_client.get(f"/api/final-test-attempts/{attempt_id}/detailed", headers=headers["instructor"])
+    assert response.status_code == 200, response.text
+    # The user and the attempt; the test comes from the cache and the grades from the attempt
+    assert counter.operations == ["users.find_one", "final_test_attempts.find_one"]
+
+    reviewed = {answer["questionId"]: answer for answer in response.json()["answers"]}
+    assert len(reviewed) == QUESTION_COUNT
+    assert (reviewed["q0"]["manualScore"], reviewed["q0"]["feedback"]) == (2, "Thin")
+    assert reviewed["q10"]["isCorrect"] is True and "manualScore" not in reviewed["q10"]
+    assert reviewed["q1"]["isCorrect"] is False
+
+
+def test_attempts_without_stored_results_fetch_grades_in_one_query(api_client, run_async, review_data):
+    database, counter, headers, questions = review_data
+    run_async(database.final_test_attempts.insert_one, {
+        "id": "legacy-attempt",
+        "testId": "review-test",
+        "answers": [{"questionId": q["id"], "answer": "Because" if q["type"] == "long_form" else "0"} for q in questions],
+        "isActive": True
+    })
+    run_async(database.submission_grades.insert_many, [
+        {"submissionId": f"final-legacy-attempt-q{index}", "score": 1, "feedback": None}
+        for index in range(0, QUESTION_COUNT, 10)
+    ])
+
+    counter.reset()
+    response = api_client.get("/api/final-test-attempts/legacy-attempt/detailed", headers=headers["instructor"])
+    assert response.status_code == 200, response.text
+    assert counter.operations.count("submission_grades.find") == 1
+    assert "submission_grades.find_one" not in counter.operations
+    reviewed = response.json()["answers"]
+    assert sum(1 for answer in reviewed if answer.get("manualScore") == 1) == QUESTION_COUNT // 10
@@ -0,0 +1,84 @@
+"""
+Attempt summaries: attempt checks are one point read and limits hold under concurrent submits.
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from attempt_summaries import ensure_summary_indexes, final_test_assessment, reserve_attempt
+from tests.conftest import auth_headers, make_user
+
+TEST = {"id": "summary-test", "passingScore": 50.0, "maxAttempts": 2}
+
+
+@pytest.fixture
+def summary_data(database_factory, use_database, run_async):
+    database = database_factory()
+    learner = make_user("learner")
+    run_async(database.users.insert_one, learner)
+    run_async(ensure_summary_indexes, database.attempt_summaries)
+    run_async(database.programs.insert_one, {"id": "program-1", "title": "Program"})
+    run_async(database.final_tests.insert_one, {
+        **TEST,
+        "title": "Summary test",
+        "programId": "program-1",
+        "questions": [{"id": "q1", "type": "true_false", "question": "?", "correctAnswer": "true", "points": 1}],
+        "totalPoints": 1,
+        "isPublished": True,
+        "isActive": True
+    })
+    counter = use_database(database)
+    headers = auth_headers(learner)
+    return database, counter, headers, learner
+
+
+def submit(api_client, headers, answer: str):
+    return api_client.post("/api/final-test-attempts", headers=headers, json={
+        "testId": TEST["id"], "programId": "program-1", "answers": [{"questionId": "q1", "answer": answer}]
+    })
+
+
+def test_submits_maintain_the_summary_and_enforce_the_limit(api_client, run_async, summary_data):
+    database, counter, headers, learner = summary_data
+    assert submit(api_client, headers, "false").json()["attemptNumber"] == 1
+    assert submit(api_client, headers, "true").json()["attemptNumber"] == 2
+    assert submit(api_client, headers, "true").status_code == 400
+    assert run_async(database.final_test_attempts.count_documents, {}) == 2
+
+    summary = run_async(database.attempt_summaries.find_one, {"studentId": learner["id"]})
+    assert (summary["attemptCount"], summary["bestScore"], summary["lastScore"], summary["passed"]) == (2, 100, 100, True)
+
+    counter.reset()
+    response = api_client.get(f"/api/final-tests/{TEST['id']}/attempt-check", headers=headers)
+    assert (response.json()["existingAttempts"], response.json()["canAttempt"]) == (2, False)
+    assert "final_test_attempts.count_documents" not in counter.operations
+    assert counter.operations.count("attempt_summaries.find_one") == 1
+
+
+def test_summaries_are_seeded_from_existing_attempts(api_client, run_async, summary_data):
+    database, _, headers, learner = summary_data
+    run_async(database.final_test_attempts.insert_one, {
+        "id": "legacy", "testId": TEST["id"], "studentId": learner["id"], "score": 40.0,
+        "isPassed": False, "isActive": True, "created_at": datetime.utcnow()
+    })
+
+    response = api_client.get(f"/api/final-tests/{TEST['id']}/attempt-check", headers=headers)
+    assert response.json()["remainingAttempts"] == 1
+    summary = run_async(database.attempt_summaries.find_one, {"studentId": learner["id"]})
+    assert (summary["attemptCount"], summary["bestScore"], summary["passed"]) == (1, 40.0, False)
+
+
+def test_concurrent_reservations_never_exceed_the_limit(run_async, summary_data):
+    database, _, _, learner = summary_data
+    assessment = final_test_assessment(database.final_test_attempts, TEST)
+
+    async def reserve_many():
+        return await asyncio.gather(*[
+            reserve_attempt(database.attempt_summaries, learner["id"], assessment, TEST["maxAttempts"])
+            for _ in range(6)
+        ])
+
+    reserved = [summary for summary in run_async(reserve_many) if summary is not None]
+    assert sorted(summary["attemptCount"] for summary in reserved) == [1, 2]
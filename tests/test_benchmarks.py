@@ -0,0 +1,231 @@
+"""
+Micro-benchmarks for CPU hot spots: quiz scoring, certificate rendering, response
+serialization and the lesson scans behind progress updates.
+
+Results are saved as JSON under .benchmarks/ so runs can be compared across commits:
+
+    python -m pytest tests/test_benchmarks.py --benchmark-autosave
+    python -m pytest tests/test_benchmarks.py --benchmark-compare --benchmark-compare-fail=mean:10%
+
+or written to a specific file with --benchmark-json=<path>. Pass --benchmark-skip to
+leave them out of a regular test run, or --benchmark-disable to run each just once.
+"""
+
+import random
+import uuid
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from routers.courses import CourseResponse
+from routers.enrollments import collect_quiz_lessons, count_completed_lessons, is_lesson_marked_complete
+from routers.final_tests import score_final_test_answers
+from routers.quizzes import QuizAttemptResponse, score_course_quiz_answers
+
+QUESTION_COUNTS = (10, 100, 1000)
+LESSON_COUNTS = (10, 100, 1000)
+RESPONSE_COUNTS = (100, 1000)
+
+QUESTION_TYPES = ["multiple_choice", "true_false", "select-all-that-apply", "chronological-order", "long_form"]
+
+
+def make_question(rng: random.Random, kind: str) -> dict:
+    question = {"id": str(uuid.UUID(int=rng.getrandbits(128))), "type": kind, "question": "Q", "points": rng.choice([1, 2, 5])}
+    if kind == "multiple_choice":
+        question.update(options=["a", "b", "c", "d"], correctAnswer=str(rng.randrange(4)))
+    elif kind == "true_false":
+        question["correctAnswer"] = rng.choice(["true", "false"])
+    elif kind == "select-all-that-apply":
+        question.update(options=["a", "b", "c", "d", "e"], correctAnswers=sorted(rng.sample(range(5), 2)))
+    elif kind == "chronological-order":
+        question.update(items=["1", "2", "3", "4"], correctOrder=rng.sample(range(4), 4))
+    return question
+
+
+def make_answer(rng: random.Random, question: dict):
+    kind = question["type"]
+    if kind == "multiple_choice":
+        return str(rng.randrange(4))
+    if kind == "true_false":
+        return rng.choice(["true", "false"])
+    if kind == "select-all-that-apply":
+        return sorted(rng.sample(range(5), 2))
+    if kind == "chronological-order":
+        return rng.sample(range(4), 4)
+    return "A considered free-text answer"
+
+
+def make_quiz(count: int):
+    rng = random.Random(count)
+    questions = [make_question(rng, QUESTION_TYPES[i % len(QUESTION_TYPES)]) for i in range(count)]
+    answers = [{"questionId": q["id"], "answer": make_answer(rng, q)} for q in questions]
+    return questions, answers
+
+
+def make_course_and_enrollment(lesson_count: int):
+    lessons_per_module = 10
+    modules = []
+    module_progress = []
+    for module_index in range(max(1, lesson_count // lessons_per_module)):
+        lessons = [
+            {
+                "id": f"lesson-{module_index}-{i}",
+                "title": f"Lesson {i}",
+                "type": "quiz" if i == lessons_per_module - 1 else "text",
+                "quiz": {"questions": [{"id": "q"}], "passingScore": 70} if i == lessons_per_module - 1 else None
+            }
+            for i in range(lessons_per_module)
+        ]
+        modules.append({"id": f"module-{module_index}", "title": f"Module {module_index}", "lessons": lessons})
+        module_progress.append({
+            "moduleId": f"module-{module_index}",
+            "lessons": [{"lessonId": lesson["id"], "completed": lesson["type"] != "quiz", "timeSpent": 60} for lesson in lessons],
+            "completed": False
+        })
+    return {"id": "course", "modules": modules}, {"moduleProgress": module_progress}
+
+
+def make_course_docs(count: int) -> list:
+    now = datetime.utcnow()
+    return [
+        {
+            "id": f"course-{i}",
+            "title": f"Course {i}",
+            "description": "Benchmark course",
+            "category": "Benchmarks",
+            "accessType": "open",
+            "learningOutcomes": ["One", "Two"],
+            "modules": [
+                {"id": f"m{m}", "title": f"Module {m}", "lessons": [{"id": f"l{m}-{n}", "title": "Lesson", "type": "text"} for n in range(5)]}
+                for m in range(5)
+            ],
+            "totalModules": 5,
+            "totalLessons": 25,
+            "instructorId": "instructor",
+            "instructor": "Instructor",
+            "status": "published",
+            "enrolledStudents": 10,
+            "rating": 4.5,
+            "reviews": [],
+            "created_at": now,
+            "updated_at": now
+        }
+        for i in range(count)
+    ]
+
+
+def make_attempt_docs(count: int) -> list:
+    now = datetime.utcnow()
+    return [
+        {
+            "id": f"attempt-{i}",
+            "quizId": "quiz",
+            "quizTitle": "Quiz",
+            "studentId": f"student-{i}",
+            "studentName": f"Student {i}",
+            "score": 80.0,
+            "pointsEarned": 8,
+            "totalPoints": 10,
+            "isPassed": True,
+            "timeSpent": 300,
+            "startedAt": now,
+            "completedAt": now,
+            "attemptNumber": 1,
+            "isActive": True,
+            "created_at": now
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("count", QUESTION_COUNTS)
+def test_score_course_quiz_answers(benchmark, count):
+    questions, answers = make_quiz(count)
+    benchmark.group = "course quiz scoring"
+    points_earned, total_points, processed, _ = benchmark(score_course_quiz_answers, questions, answers)
+    assert len(processed) == count
+    assert 0 < points_earned <= total_points
+
+
+@pytest.mark.parametrize("count", QUESTION_COUNTS)
+def test_score_final_test_answers(benchmark, count):
+    questions, answers = make_quiz(count)
+    answer_map = {answer["questionId"]: answer["answer"] for answer in answers}
+    benchmark.group = "final test scoring"
+    points_earned = benchmark(score_final_test_answers, questions, answer_map)
+    assert 0 < points_earned <= sum(q["points"] for q in questions)
+
+
+@pytest.mark.parametrize("count", LESSON_COUNTS)
+def test_enrollment_progress_lesson_scans(benchmark, count):
+    course, enrollment = make_course_and_enrollment(count)
+
+    def scan():
+        # The scans update_enrollment_progress runs when completion is requested
+        quiz_lessons = collect_quiz_lessons(course)
+        marked = [is_lesson_marked_complete(enrollment, q["lessonId"]) for q in quiz_lessons]
+        return quiz_lessons, marked, count_completed_lessons(enrollment)
+
+    benchmark.group = "progress lesson scans"
+    quiz_lessons, marked, completed = benchmark(scan)
+    assert len(quiz_lessons) == max(1, count // 10)
+    assert not any(marked)
+    assert completed == len(quiz_lessons) * 9
+
+
+@pytest.fixture(scope="module")
+def certificate_generator(tmp_path_factory):
+    from PIL import Image
+    from certificate_generator import CertificateGenerator
+
+    # A local template of the production template's size, so nothing is downloaded
+    template = tmp_path_factory.mktemp("certificates") / "template.png"
+    Image.new("RGB", (2000, 1414), "white").save(template)
+    generator = CertificateGenerator()
+    generator.template_path = template
+    return generator
+
+
+CERTIFICATE_DATA = {
+    "type": "completion",
+    "studentName": "Benchmark Learner",
+    "courseName": "Benchmark Course",
+    "completionDate": datetime(2025, 1, 1),
+    "grade": "A",
+    "score": 95.0,
+    "certificateNumber": "CERT-0001",
+    "verificationCode": "VERIFY01",
+    "issueDate": datetime(2025, 1, 2)
+}
+
+
+def test_generate_certificate_pdf(benchmark, certificate_generator):
+    benchmark.group = "certificate pdf"
+    pdf = benchmark(certificate_generator.generate_certificate_pdf, CERTIFICATE_DATA)
+    assert pdf.startswith(b"%PDF")
+
+
+def test_generate_fallback_certificate_pdf(benchmark, certificate_generator):
+    import io
+
+    benchmark.group = "certificate pdf"
+    pdf = benchmark(lambda: certificate_generator._generate_fallback_certificate(CERTIFICATE_DATA, io.BytesIO()))
+    assert pdf.startswith(b"%PDF")
+
+
+@pytest.mark.parametrize("count", RESPONSE_COUNTS)
+def test_course_response_list(benchmark, count):
+    docs = make_course_docs(count)
+    benchmark.group = "response models"
+    courses = benchmark(lambda: [CourseResponse(**doc) for doc in docs])
+    assert len(courses) == count
+
+
+@pytest.mark.parametrize("count", RESPONSE_COUNTS)
+def test_quiz_attempt_response_list(benchmark, count):
+    docs = make_attempt_docs(count)
+    benchmark.group = "response models"
+    attempts = benchmark(lambda: [QuizAttemptResponse(**doc) for doc in docs])
+    assert len(attempts) == count
@@ -0,0 +1,137 @@
+"""
+Exports: streamed in batches from one aggregation, with filters, date ranges and joined columns.
+"""
+
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import exports
+from tests.conftest import auth_headers, make_user
+
+START = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def export_data(database_factory, use_database, run_async, monkeypatch):
+    monkeypatch.setattr(exports, "EXPORT_BATCH_SIZE", 3)
+    database = database_factory()
+    admin = make_user("admin")
+    learners = [make_user("learner", index) for index in range(2)]
+    run_async(database.users.insert_many, [admin] + learners)
+    run_async(database.final_test_attempts.insert_many, [
+        {"id": f"attempt-{day:02d}", "testId": "test-1" if day % 2 else "test-2", "programId": "program-1",
+         "studentId": learners[day % 2]["id"], "studentName": learners[day % 2]["full_name"], "score": float(day),
+         "isPassed": day > 5, "answers": [{"questionId": "q1", "answer": "x"}], "isActive": True,
+         "created_at": START + timedelta(days=day)}
+        for day in range(10)
+    ])
+    counter = use_database(database)
+    headers = auth_headers(admin)
+    return database, counter, headers, learners
+
+
+def test_csv_export_streams_one_aggregation_with_joined_columns(api_client, export_data):
+    _, counter, headers, learners = export_data
+    counter.reset()
+    response = api_client.get("/api/exports/final-test-attempts", headers=headers, params={
+        "testId": "test-1", "start": (START + timedelta(days=2)).isoformat(), "end": (START + timedelta(days=9)).isoformat()
+    })
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"].startswith("text/csv")
+    assert counter.operations == ["users.find_one", "final_test_attempts.aggregate"]
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["id"] for row in rows] == ["attempt-03", "attempt-05", "attempt-07"]
+    assert {row["studentEmail"] for row in rows} == {learners[1]["email"]}
+    assert "answers" not in rows[0]
+
+
+def test_ndjson_export_is_gzipped_for_clients_that_accept_it(api_client, export_data):
+    _, _, headers, _ = export_data
+    with api_client.stream("GET", "/api/exports/final-test-attempts", params={"format": "ndjson"},
+                           headers={**headers, "Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        body = gzip.decompress(b"".join(response.iter_raw()))
+    rows = [json.loads(line) for line in body.decode().splitlines()]
+    assert [row["id"] for row in rows] == [f"attempt-{day:02d}" for day in range(10)]
+
+
+def test_unsupported_filters_are_rejected(api_client, export_data):
+    _, _, headers, _ = export_data
+    response = api_client.get("/api/exports/certificates", headers=headers, params={"quizId": "quiz-1"})
+    assert response.status_code == 400
+    assert api_client.get("/api/exports/unknown", headers=headers).status_code == 404
+
+
+def test_instructors_export_only_their_courses_and_programs(api_client, run_async, export_data):
+    database, _, _, learners = export_data
+    instructor, other = make_user("instructor"), make_user("instructor", 1)
+    run_async(database.users.insert_many, [instructor, other])
+    run_async(database.courses.insert_many, [
+        {"id": "course-mine", "title": "Mine", "instructorId": instructor["id"]},
+        {"id": "course-theirs", "title": "Theirs", "instructorId": other["id"]}
+    ])
+    run_async(database.programs.insert_one, {"id": "program-1", "name": "Program", "instructorId": instructor["id"]})
+    run_async(database.enrollments.insert_many, [
+        {"id": f"enrollment-{course_id}", "userId": learners[0]["id"], "courseId": course_id, "progress": 0.0,
+         "status": "active", "enrolledAt": START}
+        for course_id in ("course-mine", "course-theirs")
+    ])
+    run_async(database.certificates.insert_many, [
+        {"id": f"certificate-{owner}", "studentId": learners[0]["id"], "isActive": True, "issueDate": START,
+         "courseId": owner if owner.startswith("course") else None, "programId": owner if owner.startswith("program") else None}
+        for owner in ("course-mine", "course-theirs", "program-1")
+    ])
+
+    def exported(user, dataset, **params):
+        headers = auth_headers(user)
+        response = api_client.get(f"/api/exports/{dataset}", headers=headers, params={"format": "ndjson", **params})
+        assert response.status_code == 200, response.text
+        return [json.loads(line)["id"] for line in response.text.splitlines()]
+
+    assert exported(instructor, "enrollments") == ["enrollment-course-mine"]
+    assert exported(instructor, "enrollments", courseId="course-theirs") == []
+    assert exported(other, "enrollments") == ["enrollment-course-theirs"]
+    assert len(exported(instructor, "final-test-attempts")) == 10
+    assert exported(other, "final-test-attempts") == []
+    assert exported(instructor, "certificates") == ["certificate-course-mine", "certificate-program-1"]
+
+
+def test_instructors_export_attempts_of_their_standalone_quizzes(api_client, run_async, export_data):
+    database, _, _, learners = export_data
+    instructor, other = make_user("instructor"), make_user("instructor", 1)
+    run_async(database.users.insert_many, [instructor, other])
+    run_async(database.courses.insert_one, {"id": "course-mine", "title": "Mine", "instructorId": instructor["id"]})
+    run_async(database.quizzes.insert_many, [
+        {"id": "quiz-mine", "title": "Mine", "createdBy": instructor["id"]},
+        {"id": "quiz-theirs", "title": "Theirs", "createdBy": other["id"]}
+    ])
+    run_async(database.quiz_attempts.insert_many, [
+        {"id": "attempt-course", "quizId": "lesson-quiz", "courseId": "course-mine", "studentId": learners[0]["id"],
+         "isActive": True, "created_at": START},
+        {"id": "attempt-quiz-mine", "quizId": "quiz-mine", "studentId": learners[0]["id"], "isActive": True,
+         "created_at": START + timedelta(days=1)},
+        {"id": "attempt-quiz-theirs", "quizId": "quiz-theirs", "studentId": learners[1]["id"], "isActive": True,
+         "created_at": START + timedelta(days=2)}
+    ])
+
+    def exported(user):
+        response = api_client.get("/api/exports/quiz-attempts", headers=auth_headers(user), params={"format": "ndjson"})
+        assert response.status_code == 200, response.text
+        return [json.loads(line)["id"] for line in response.text.splitlines()]
+
+    assert exported(instructor) == ["attempt-course", "attempt-quiz-mine"]
+    assert exported(other) == ["attempt-quiz-theirs"]
+
+
+def test_export_indexes_cover_the_owner_filters(run_async, database_factory):
+    database = database_factory()
+    run_async(exports.ensure_export_indexes, database)
+    indexes = run_async(database.quiz_attempts.index_information)
+    keys = {tuple(field for field, _ in index["key"]) for index in indexes.values()}
+    assert {("created_at", "id"), ("courseId", "created_at", "id"), ("quizId", "created_at", "id")} <= keys
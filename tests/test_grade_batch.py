@@ -0,0 +1,111 @@
+"""
+Batch grading: one bulk write per collection and one rescore per attempt.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from tests.conftest import auth_headers, make_user
+
+COURSE_ID = "course-batch"
+LESSON_ID = "lesson-essays"
+ESSAYS = ["essay-1", "essay-2"]
+
+
+@pytest.fixture
+def grading_data(database_factory, use_database, run_async):
+    database = database_factory()
+    grader = make_user("instructor")
+    learners = [make_user("learner", i) for i in range(2)]
+    run_async(database.users.insert_many, [grader] + learners)
+    run_async(database.courses.insert_one, {
+        "id": COURSE_ID,
+        "title": "Essays",
+        "modules": [{"id": "m1", "lessons": [{
+            "id": LESSON_ID,
+            "type": "quiz",
+            "quiz": {
+                "passingScore": 50,
+                "totalPoints": 10,
+                "questions": [{"id": q, "type": "long_form", "question": q, "points": 5} for q in ESSAYS]
+            }
+        }]}]
+    })
+    run_async(database.final_tests.insert_one, {
+        "id": "test-1",
+        "totalPoints": 10,
+        "questions": [{"id": q, "type": "long_form", "question": q, "points": 5} for q in ESSAYS]
+    })
+
+    submissions, attempts, enrollments = [], [], []
+    for learner in learners:
+        attempts.append({"id": f"quiz-attempt-{learner['id']}", "courseId": COURSE_ID, "lessonId": LESSON_ID,
+                         "studentId": learner["id"], "answers": [], "isActive": True, "created_at": datetime.utcnow()})
+        enrollments.append({"id": f"enrollment-{learner['id']}", "userId": learner["id"], "courseId": COURSE_ID,
+                            "progress": 50.0, "status": "active"})
+        for question_id in ESSAYS:
+            submissions.append({"id": f"quiz-{learner['id']}-{question_id}", "courseId": COURSE_ID,
+                                "lessonId": LESSON_ID, "questionId": question_id, "studentId": learner["id"],
+                                "questionPoints": 5, "status": "pending", "isActive": True,
+                                "submittedAt": datetime.utcnow()})
+    run_async(database.final_test_attempts.insert_one, {"id": "final-attempt", "testId": "test-1", "answers": []})
+    for question_id in ESSAYS:
+        submissions.append({"id": f"final-final-attempt-{question_id}", "testId": "test-1",
+                            "attemptId": "final-attempt", "questionId": question_id, "status": "pending",
+                            "isActive": True, "submittedAt": datetime.utcnow()})
+    run_async(database.quiz_attempts.insert_many, attempts)
+    run_async(database.enrollments.insert_many, enrollments)
+    run_async(database.subjective_submissions.insert_many, submissions)
+
+    counter = use_database(database)
+    headers = auth_headers(grader)
+    return database, counter, headers, learners
+
+
+def test_batch_rescores_each_attempt_once(api_client, run_async, grading_data):
+    database, counter, headers, learners = grading_data
+    grades = [{"submissionId": f"quiz-{learner['id']}-{q}", "score": 4, "feedback": "ok"}
+              for learner in learners for q in ESSAYS]
+    grades += [{"submissionId": f"final-final-attempt-{q}", "score": 5} for q in ESSAYS]
+
+    counter.reset()
+    response = api_client.post("/api/submissions/grade-batch", json={"grades": grades}, headers=headers)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["graded"], body["created"], body["attemptsRescored"], body["completionChecks"]) == (6, 6, 3, 2)
+
+    operations = counter.operations
+    assert operations.count("submission_grades.bulk_write") == 1
+    assert operations.count("subjective_submissions.bulk_write") == 1
+    assert operations.count("quiz_attempts.update_one") == 2
+    assert operations.count("final_test_attempts.update_one") == 1
+    # The completion check reads the enrollment once per (student, course)
+    assert operations.count("enrollments.find_one") == 2
+
+    final_attempt = run_async(database.final_test_attempts.find_one, {"id": "final-attempt"})
+    assert final_attempt["pointsEarned"] == 10
+    quiz_attempt = run_async(database.quiz_attempts.find_one, {"studentId": learners[0]["id"]})
+    assert (quiz_attempt["pointsEarned"], quiz_attempt["isPassed"]) == (8, True)
+    enrollment = run_async(database.enrollments.find_one, {"userId": learners[0]["id"]})
+    assert enrollment["status"] == "completed"
+
+    # Regrading updates the existing grade documents
+    response = api_client.post("/api/submissions/grade-batch", json={"grades": grades[:1]}, headers=headers)
+    assert (response.json()["created"], response.json()["updated"]) == (0, 1)
+    assert run_async(database.submission_grades.count_documents, {}) == 6
+
+
+def test_batch_is_rejected_as_a_whole(api_client, run_async, grading_data):
+    database, _, headers, learners = grading_data
+    valid = {"submissionId": f"quiz-{learners[0]['id']}-essay-1", "score": 3}
+
+    response = api_client.post("/api/submissions/grade-batch", headers=headers, json={
+        "grades": [valid, {"submissionId": "missing", "score": 1}]
+    })
+    assert response.status_code == 404
+    response = api_client.post("/api/submissions/grade-batch", headers=headers, json={
+        "grades": [valid, {"submissionId": f"quiz-{learners[1]['id']}-essay-1", "score": 6}]
+    })
+    assert response.status_code == 400
+    assert run_async(database.submission_grades.count_documents, {}) == 0
@@ -0,0 +1,101 @@
+"""
+Gradebook: cells maintained on the enrollments by quiz submits, read back in one query.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from gradebook import rebuild_course_gradebook
+from tests.conftest import auth_headers, make_user
+
+COURSE_ID = "course-gradebook"
+LESSON_ID = "lesson-quiz"
+QUESTIONS = [{"id": "q1", "type": "true_false", "question": "?", "correctAnswer": "true", "points": 1}]
+
+
+@pytest.fixture
+def gradebook_data(database_factory, use_database, run_async):
+    database = database_factory()
+    instructor = make_user("instructor")
+    learners = [make_user("learner", i) for i in range(3)]
+    run_async(database.users.insert_many, [instructor] + learners)
+    run_async(database.courses.insert_one, {
+        "id": COURSE_ID,
+        "title": "Gradebook course",
+        "modules": [{"id": "m1", "title": "Module", "lessons": [
+            {"id": "lesson-text", "type": "text", "title": "Reading"},
+            {"id": LESSON_ID, "type": "quiz", "title": "Checkpoint",
+             "quiz": {"passingScore": 50, "questions": QUESTIONS}}
+        ]}]
+    })
+    run_async(database.classrooms.insert_one, {
+        "id": "classroom-1", "name": "Morning", "courseIds": [COURSE_ID],
+        "studentIds": [learner["id"] for learner in learners[:2]]
+    })
+    run_async(database.enrollments.insert_many, [
+        {"id": f"enrollment-{learner['id']}", "userId": learner["id"], "courseId": COURSE_ID,
+         "studentName": learner["full_name"], "progress": 40.0, "status": "active", "completedAt": None}
+        for learner in learners
+    ])
+    counter = use_database(database)
+    headers = {
+        user["id"]: auth_headers(user)
+        for user in [instructor] + learners
+    }
+    return database, counter, headers, instructor, learners
+
+
+def submit(api_client, headers, answer: str):
+    response = api_client.post(f"/api/courses/{COURSE_ID}/lessons/{LESSON_ID}/quiz/submit", headers=headers,
+                               json={"answers": [{"questionId": "q1", "answer": answer}]})
+    assert response.status_code == 200, response.text
+
+
+def test_submits_update_the_gradebook_read_in_one_query(api_client, gradebook_data):
+    database, counter, headers, instructor, learners = gradebook_data
+    submit(api_client, headers[learners[0]["id"]], "false")
+    submit(api_client, headers[learners[0]["id"]], "true")
+    submit(api_client, headers[learners[1]["id"]], "false")
+
+    counter.reset()
+    response = api_client.get(f"/api/gradebook/courses/{COURSE_ID}", headers=headers[instructor["id"]])
+    assert response.status_code == 200, response.text
+    assert counter.operations == ["users.find_one", "courses.find_one", "enrollments.find"]
+
+    body = response.json()
+    assert [column["lessonId"] for column in body["columns"]] == [LESSON_ID]
+    cells = {row["studentId"]: row["lessons"][LESSON_ID] for row in body["rows"]}
+    assert (cells[learners[0]["id"]]["bestScore"], cells[learners[0]["id"]]["passed"],
+            cells[learners[0]["id"]]["attempts"]) == (100, True, 2)
+    assert (cells[learners[1]["id"]]["passed"], cells[learners[1]["id"]]["attempts"]) == (False, 1)
+    assert cells[learners[2]["id"]]["attempts"] == 0
+
+    response = api_client.get("/api/gradebook/classrooms/classroom-1", headers=headers[instructor["id"]])
+    assert {row["studentId"] for row in response.json()["rows"]} == {learners[0]["id"], learners[1]["id"]}
+
+    export = api_client.get(f"/api/gradebook/courses/{COURSE_ID}/export", headers=headers[instructor["id"]])
+    assert export.headers["content-type"].startswith("text/csv")
+    lines = export.text.strip().splitlines()
+    assert lines[0].startswith("Course,Student,Progress,Status,Completed At,Checkpoint best score")
+    assert len(lines) == 1 + len(learners)
+
+
+def test_rebuild_fills_cells_from_existing_attempts(api_client, run_async, gradebook_data):
+    database, _, headers, instructor, learners = gradebook_data
+    run_async(database.quiz_attempts.insert_many, [
+        {"id": f"legacy-{score}", "courseId": COURSE_ID, "lessonId": LESSON_ID, "studentId": learners[2]["id"],
+         "score": score, "isPassed": score >= 50, "isActive": True, "created_at": datetime.utcnow()}
+        for score in (80.0, 20.0)
+    ])
+
+    assert run_async(rebuild_course_gradebook, database, COURSE_ID) == 1
+    response = api_client.get(f"/api/gradebook/courses/{COURSE_ID}", headers=headers[instructor["id"]])
+    cell = next(row for row in response.json()["rows"] if row["studentId"] == learners[2]["id"])["lessons"][LESSON_ID]
+    assert (cell["bestScore"], cell["lastScore"], cell["passed"], cell["attempts"]) == (80.0, 20.0, True, 2)
+
+
+def test_learners_cannot_view_gradebooks(api_client, gradebook_data):
+    _, _, headers, _, learners = gradebook_data
+    response = api_client.get(f"/api/gradebook/courses/{COURSE_ID}", headers=headers[learners[0]["id"]])
+    assert response.status_code == 403
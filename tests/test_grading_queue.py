@@ -0,0 +1,182 @@
+"""
+Grading queue: one write per submit, keyset pagination, filters, server-side counts and the backfill.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import pytest
+
+from backfill_grading_queue import backfill
+from grading_queue import ensure_queue_indexes, insert_submissions
+from tests.conftest import auth_headers, make_user
+
+
+def make_submission(index: int, **fields) -> dict:
+    doc = {
+        "id": f"sub-{index:03d}",
+        "studentId": f"learner-{index}",
+        "studentName": f"Learner {index}",
+        "courseId": "course-a",
+        "lessonId": "lesson-1",
+        "questionId": "essay",
+        "questionText": "Explain",
+        "questionPoints": 5,
+        "studentAnswer": "Because",
+        "submittedAt": datetime(2024, 1, 1) + timedelta(minutes=index // 2),
+        "status": "pending"
+    }
+    doc.update(fields)
+    return doc
+
+
+@dataclass
+class QueueDatabase:
+    database: object
+    headers: dict
+    counter: object
+
+
+@pytest.fixture
+def queue_database(database_factory, use_database, run_async):
+    database = database_factory()
+    admin = make_user("admin", full_name="Grader")
+    run_async(database.users.insert_one, admin)
+    run_async(ensure_queue_indexes, database.subjective_submissions)
+    return QueueDatabase(
+        database=database,
+        headers=auth_headers(admin),
+        counter=use_database(database)
+    )
+
+
+def test_course_quiz_submit_stores_enriched_submissions_in_one_write(api_client, run_async, queue_database):
+    database = queue_database.database
+    questions = [
+        {"id": f"essay-{index}", "type": "essay", "question": f"Explain {index}", "points": 3 + index}
+        for index in range(2)
+    ]
+    run_async(database.courses.insert_one, {"id": "course-a", "modules": [{"id": "m1", "lessons": [
+        {"id": "lesson-1", "type": "quiz", "quiz": {"passingScore": 50, "questions": questions}}
+    ]}]})
+
+    queue_database.counter.reset()
+    response = api_client.post("/api/courses/course-a/lessons/lesson-1/quiz/submit", headers=queue_database.headers,
+                               json={"answers": [{"questionId": q["id"], "answer": "Because"} for q in questions]})
+    assert response.status_code == 200, response.text
+    assert queue_database.counter.operations.count("subjective_submissions.insert_many") == 1
+    assert not any(op.startswith("subjective_submissions.insert_one") for op in queue_database.counter.operations)
+
+    attempt_id = response.json()["attemptId"]
+    stored = run_async(database.subjective_submissions.find({}, {"_id": 0}).sort("id", 1).to_list, None)
+    assert [(doc["id"], doc["questionText"], doc["questionPoints"], doc["studentName"]) for doc in stored] == [
+        (f"quiz-{attempt_id}-essay-0", "Explain 0", 3, "Grader"),
+        (f"quiz-{attempt_id}-essay-1", "Explain 1", 4, "Grader")
+    ]
+    attempt = run_async(database.quiz_attempts.find_one, {"id": attempt_id})
+    assert [answer["submissionId"] for answer in attempt["answers"]] == [doc["id"] for doc in stored]
+
+    # A retried write stores nothing new
+    assert run_async(insert_submissions, database.subjective_submissions, stored) == 0
+    assert run_async(database.subjective_submissions.count_documents, {}) == 2
+
+    retry = {"attemptId": "client-attempt", "submissions": [{
+        "questionId": "essay-0", "questionText": "Edited by the client", "studentAnswer": "Because",
+        "courseId": "course-a", "lessonId": "lesson-1", "questionType": "essay"
+    }]}
+    for _ in range(2):
+        assert api_client.post("/api/quiz-submissions/subjective", json=retry, headers=queue_database.headers).status_code == 200
+    [stored] = run_async(database.subjective_submissions.find({"attemptId": "client-attempt"}).to_list, None)
+    # The grader sees the stored question, not the text the client sent
+    assert (stored["questionText"], stored["questionPoints"]) == ("Explain 0", 3)
+
+    # Another student reusing the attempt id stores their own submission
+    other = make_user("learner")
+    run_async(database.users.insert_one, other)
+    assert api_client.post("/api/quiz-submissions/subjective", json=retry, headers=auth_headers(other)).status_code == 200
+    stored = run_async(database.subjective_submissions.find({"attemptId": "client-attempt"}).to_list, None)
+    grader = run_async(database.users.find_one, {"role": "admin"})
+    assert sorted(doc["studentId"] for doc in stored) == sorted([grader["id"], other["id"]])
+
+
+def test_queue_pages_through_pending_work_in_order(api_client, run_async, queue_database):
+    # Pairs share a submittedAt, so the id tie-break decides their order
+    submissions = [make_submission(i) for i in range(7)]
+    # Stored before submissions had a status: still pending work
+    del submissions[6]["status"]
+    submissions += [make_submission(i, status="graded", gradedBy="grader-1") for i in range(7, 10)]
+    submissions.append(make_submission(10, courseId=None, testId="test-1", programId="program-1"))
+    run_async(queue_database.database.subjective_submissions.insert_many, [dict(s) for s in submissions])
+
+    seen, cursor = [], None
+    while True:
+        params = {"courseId": "course-a", "limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        queue_database.counter.reset()
+        response = api_client.get("/api/grading/queue", params=params, headers=queue_database.headers)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        # user lookup, the page and the counts
+        assert queue_database.counter.commands == 3, queue_database.counter.operations
+        assert body["counts"] == {"pending": 7, "graded": 3, "needs_review": 0, "total": 10}
+        seen += [item["id"] for item in body["submissions"]]
+        assert {item["status"] for item in body["submissions"]} == {"pending"}
+        cursor = body["nextCursor"]
+        if cursor is None:
+            break
+    assert seen == [f"sub-{i:03d}" for i in range(7)]
+
+    graded = api_client.get("/api/grading/queue", params={"status": "graded", "gradedBy": "grader-1"},
+                            headers=queue_database.headers).json()
+    assert [item["id"] for item in graded["submissions"]] == ["sub-007", "sub-008", "sub-009"]
+
+    final = api_client.get("/api/grading/queue", params={"programId": "program-1", "testId": "test-1"},
+                           headers=queue_database.headers).json()
+    assert [(item["id"], item["source"], item["questionPoints"]) for item in final["submissions"]] == [
+        ("sub-010", "final_test", 5)
+    ]
+
+
+def test_queue_rejects_bad_cursor_and_learners(api_client, run_async, queue_database):
+    response = api_client.get("/api/grading/queue", params={"cursor": "not-a-cursor"}, headers=queue_database.headers)
+    assert response.status_code == 400
+
+    learner = make_user("learner")
+    run_async(queue_database.database.users.insert_one, learner)
+    headers = auth_headers(learner)
+    assert api_client.get("/api/grading/queue", headers=headers).status_code == 403
+
+
+def test_backfill_fills_queue_fields(run_async, queue_database):
+    run_async(queue_database.database.final_tests.insert_one, {
+        "id": "test-1",
+        "questions": [{"id": "essay", "question": "Describe", "points": 8}]
+    })
+    grader = run_async(queue_database.database.users.find_one, {"role": "admin"})
+    legacy = [
+        # /quiz-submissions/subjective stored an ISO string
+        make_submission(0, submittedAt="2024-01-02T03:04:05.678000+00:00"),
+        # course quiz submissions stored the answer under "answer" with maxScore, and no student name
+        {"id": "sub-001", "studentId": grader["id"], "courseId": "course-a", "lessonId": "lesson-1", "questionId": "essay",
+         "answer": "Because", "maxScore": 4, "status": "pending", "submittedAt": datetime(2024, 1, 1)},
+        {"id": "sub-002", "testId": "test-1", "questionId": "essay", "studentAnswer": "Because",
+         "status": "pending", "submittedAt": datetime(2024, 1, 1)},
+        make_submission(3)
+    ]
+    run_async(queue_database.database.subjective_submissions.insert_many, legacy)
+
+    assert run_async(backfill, queue_database.database, dry_run=True) == 3
+    assert run_async(backfill, queue_database.database) == 3
+    assert run_async(backfill, queue_database.database) == 0
+
+    docs = {
+        doc["id"]: doc
+        for doc in run_async(queue_database.database.subjective_submissions.find({}, {"_id": 0}).to_list, None)
+    }
+    assert docs["sub-000"]["submittedAt"] == datetime(2024, 1, 2, 3, 4, 5, 678000)
+    assert docs["sub-001"]["questionPoints"] == 4
+    assert docs["sub-001"]["studentAnswer"] == "Because"
+    assert docs["sub-002"]["questionPoints"] == 8
+    assert docs["sub-002"]["questionText"] == "Describe"
+    assert docs["sub-001"]["studentName"] == "Grader"
@@ -0,0 +1,72 @@
+"""
+Import-time checks for cold starts.
+
+Each check runs in a fresh interpreter with ``python -X importtime`` so nothing
+already imported by the test session skews it. Importing the app must stay under
+IMPORT_TIME_BUDGET_MS (default 3000) and must not pull in the heavy modules that
+are only needed on rare paths. When a check fails, the slowest imports are listed
+in the failure message.
+"""
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+IMPORT_TIME_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "3000"))
+
+# Loaded on first use only: certificate PDFs, request profiling, report snapshots, item analysis
+LAZY_MODULES = ("reportlab", "PIL", "certificate_generator", "pyinstrument", "pandas", "pyarrow", "numpy")
+
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_profile(statement: str):
+    """Run statement in a fresh interpreter; returns {module: cumulative_us} for every module imported."""
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2))
+    return modules
+
+
+def slowest(modules: dict, count: int = 15) -> str:
+    ranked = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:count]
+    return "\n".join(f"{us / 1000:9.1f} ms  {name}" for name, us in ranked)
+
+
+def test_app_import_time_budget():
+    modules = import_profile("import server")
+    total_ms = modules["server"] / 1000
+    assert total_ms <= IMPORT_TIME_BUDGET_MS, (
+        f"importing server took {total_ms:.0f} ms (budget {IMPORT_TIME_BUDGET_MS:.0f} ms):\n{slowest(modules)}"
+    )
+
+
+def test_app_import_skips_lazy_modules():
+    modules = import_profile("import server")
+    loaded = sorted(name for name in modules if name.split(".")[0] in LAZY_MODULES)
+    assert not loaded, f"importing server loaded {loaded}; import them where they are used"
+
+
+@pytest.mark.parametrize("name", ["health", "courses", "certificates", "analytics"])
+def test_router_module_imports_in_isolation(name):
+    modules = import_profile(f"import routers.{name}")
+    other_routers = sorted(
+        module for module in modules
+        if module.startswith("routers.") and module not in (f"routers.{name}", "routers.auth", "routers.courses")
+    )
+    assert "server" not in modules
+    assert not other_routers, f"routers.{name} imported {other_routers}"
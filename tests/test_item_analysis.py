@@ -0,0 +1,126 @@
+"""
+Item analysis: running sums kept by submits and regrades match a rebuild from the attempts.
+"""
+
+import numpy as np
+import pytest
+
+from item_analysis import attempt_increments, item_analysis
+from tests.conftest import auth_headers, make_user
+
+TEST_ID = "analysis-test"
+QUESTIONS = [
+    {"id": f"mc{index}", "type": "multiple_choice", "question": f"Pick {index}",
+     "options": ["a", "b", "c"], "correctAnswer": "0", "points": 1}
+    for index in range(3)
+] + [{"id": "essay", "type": "long_form", "question": "Explain", "points": 4}]
+
+# Options picked per learner for mc0..mc2; everyone answers the essay
+PICKS = [
+    ("0", "0", "0"), ("0", "0", "1"), ("0", "1", "2"), ("1", "0", "0"),
+    ("0", "2", "1"), ("2", "1", "1"), ("0", "0", "2"), ("1", "1", "1")
+]
+
+
+@pytest.fixture
+def analysis_data(database_factory, use_database, run_async):
+    database = database_factory()
+    instructor = make_user("instructor")
+    learners = [make_user("learner", index) for index in range(len(PICKS))]
+    run_async(database.users.insert_many, [instructor] + learners)
+    run_async(database.programs.insert_one, {"id": "program-1", "title": "Program"})
+    run_async(database.final_tests.insert_one, {
+        "id": TEST_ID, "title": "Analysis", "programId": "program-1", "questions": QUESTIONS,
+        "totalPoints": 7, "maxAttempts": 2, "isPublished": True, "isActive": True
+    })
+    counter = use_database(database)
+    return database, counter, auth_headers(instructor), learners
+
+
+def submit(api_client, learner, picks):
+    answers = [{"questionId": f"mc{index}", "answer": pick} for index, pick in enumerate(picks)]
+    answers.append({"questionId": "essay", "answer": "Because"})
+    response = api_client.post("/api/final-test-attempts", headers=auth_headers(learner), json={
+        "testId": TEST_ID, "programId": "program-1", "answers": answers
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def analysis(api_client, headers, rebuild=False):
+    response = api_client.get(f"/api/final-tests/{TEST_ID}/item-analysis", headers=headers,
+                              params={"rebuild": rebuild})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_running_sums_match_a_rebuild(api_client, run_async, analysis_data):
+    database, counter, headers, learners = analysis_data
+    for learner, picks in zip(learners[:4], PICKS[:4]):
+        submit(api_client, learner, picks)
+    analysis(api_client, headers)  # builds the sums from the first attempts
+    attempt_ids = [submit(api_client, learner, picks) for learner, picks in zip(learners[4:], PICKS[4:])]
+
+    # Regrading the essay of one later attempt applies the score difference
+    graded = api_client.post(f"/api/submissions/final-{attempt_ids[0]}-essay/grade", headers=headers,
+                             json={"score": 1, "feedback": "Thin"})
+    assert graded.status_code == 200, graded.text
+
+    counter.reset()
+    incremental = analysis(api_client, headers)
+    assert "final_test_attempts.find" not in counter.operations
+    rebuilt = analysis(api_client, headers, rebuild=True)
+    assert incremental["attempts"] == rebuilt["attempts"] == len(PICKS)
+    for mine, theirs in zip(incremental["questions"], rebuilt["questions"]):
+        assert mine["pValue"] == pytest.approx(theirs["pValue"])
+        assert mine["discrimination"] == pytest.approx(theirs["discrimination"], abs=1e-3)
+    assert incremental["kr20"] == pytest.approx(rebuilt["kr20"], abs=1e-3)
+    essay = next(question for question in incremental["questions"] if question["questionId"] == "essay")
+    assert essay["pValue"] == pytest.approx((len(PICKS) - 1 + 0.25) / len(PICKS), abs=1e-4)
+
+
+def test_statistics_match_the_textbook_formulas(api_client, analysis_data):
+    _, _, headers, learners = analysis_data
+    for learner, picks in zip(learners, PICKS):
+        submit(api_client, learner, picks)
+    result = analysis(api_client, headers)
+
+    scores = np.array([[1.0 if pick == "0" else 0.0 for pick in picks] + [1.0] for picks in PICKS])
+    totals = scores.sum(axis=1)
+    p_values = scores.mean(axis=0)
+    k = scores.shape[1]
+    expected_kr20 = k / (k - 1) * (1 - (p_values * (1 - p_values)).sum() / totals.var())
+    rest = totals - scores[:, 0]
+    expected_discrimination = np.corrcoef(scores[:, 0], rest)[0, 1]
+
+    by_question = {question["questionId"]: question for question in result["questions"]}
+    assert [by_question[f"mc{index}"]["pValue"] for index in range(3)] == pytest.approx(p_values[:3].tolist(), abs=1e-4)
+    assert by_question["mc0"]["discrimination"] == pytest.approx(expected_discrimination, abs=1e-3)
+    assert result["kr20"] == pytest.approx(expected_kr20, abs=1e-3)
+    # Everyone gets the essay's default credit, so it can't discriminate
+    assert by_question["essay"]["discrimination"] is None and "too_easy" in by_question["essay"]["flags"]
+
+    options = by_question["mc1"]["options"]
+    assert [option["count"] for option in options] == [4, 3, 1]
+    assert options[0]["isCorrect"] and options[0]["frequency"] == 0.5
+
+
+
+def test_kr20_is_omitted_when_totals_include_incomplete_items(database_factory, run_async):
+    statistics = database_factory().item_statistics
+    questions = [{"id": question_id, "type": "true_false"} for question_id in ("a", "b", "c")]
+
+    def analysed(assessment_id, attempts):
+        for scores in attempts:
+            run_async(statistics.update_one, {"assessmentId": assessment_id},
+                      {"$inc": attempt_increments(scores, {})}, upsert=True)
+        return item_analysis(run_async(statistics.find_one, {"assessmentId": assessment_id}), questions)
+
+    complete = [{"a": 1.0, "b": 1.0, "c": 1.0}, {"a": 1.0, "b": 0.0, "c": 0.0}, {"a": 0.0, "b": 0.0, "c": 1.0}]
+    assert analysed("complete", complete)["kr20"] is not None
+
+    # c drawn from a pool: a and b are complete, but the totals still count c
+    pooled = [{"a": 1.0, "b": 1.0, "c": 1.0}, {"a": 1.0, "b": 0.0}, {"a": 0.0, "b": 0.0, "c": 1.0}]
+    result = analysed("pooled", pooled)
+    assert result["reliabilityItems"] == 2
+    assert result["kr20"] is None
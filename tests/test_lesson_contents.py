@@ -0,0 +1,99 @@
+"""
+Lesson content stored outside the course document: edits replace the stored fields,
+unchanged lessons aren't rewritten, and the migration moves what's left on outlines.
+"""
+
+from routers.courses import hydrate_course_lessons, store_course_modules
+from tests.conftest import auth_headers, make_user
+
+COURSE_ID = "course-content"
+
+
+def course_with(lesson: dict) -> dict:
+    return {"id": COURSE_ID, "modules": [{"id": "m1", "title": "Module", "lessons": [lesson]}]}
+
+
+def test_removed_content_fields_are_not_merged_back(database_factory, use_database, run_async):
+    use_database(database_factory())
+    quiz_lesson = {"id": "lesson-1", "type": "quiz", "title": "Check", "content": "Intro",
+                   "quiz": {"questions": [{"id": "q1"}]}}
+    run_async(store_course_modules, COURSE_ID, course_with(quiz_lesson)["modules"])
+
+    # Turned into a text lesson: the quiz goes away
+    text_lesson = {"id": "lesson-1", "type": "text", "title": "Check", "content": "Reading"}
+    outline, _ = run_async(store_course_modules, COURSE_ID, course_with(text_lesson)["modules"])
+
+    course = run_async(hydrate_course_lessons, {"id": COURSE_ID, "modules": outline})
+    lesson = course["modules"][0]["lessons"][0]
+    assert lesson["content"] == "Reading"
+    assert "quiz" not in lesson
+
+
+def test_only_changed_lessons_are_rewritten(database_factory, use_database, run_async):
+    database = database_factory()
+    counter = use_database(database)
+    lessons = [
+        {"id": "lesson-1", "type": "text", "title": "One", "content": "<p>First</p>"},
+        {"id": "lesson-2", "type": "presentation", "title": "Two", "embedCode": "<iframe src='slides'></iframe>"}
+    ]
+    modules = [{"id": "m1", "title": "Module", "lessons": lessons}]
+    outline, written = run_async(store_course_modules, COURSE_ID, modules)
+    assert written == 2
+    # The HTML stays out of the outline
+    assert [set(lesson) for lesson in outline[0]["lessons"]] == [{"id", "type", "title", "contentExternal"}] * 2
+    stored_before = {doc["lessonId"]: doc for doc in run_async(database.lesson_contents.find({}).to_list, None)}
+
+    # Saving the same course again writes nothing
+    counter.reset()
+    assert run_async(store_course_modules, COURSE_ID, modules)[1] == 0
+    assert counter.operations == ["lesson_contents.find"]
+
+    changed = [lessons[0], {**lessons[1], "embedCode": "<iframe src='slides-v2'></iframe>"}]
+    counter.reset()
+    _, written = run_async(store_course_modules, COURSE_ID, [{**modules[0], "lessons": changed}])
+    assert written == 1
+    assert counter.operations == ["lesson_contents.find", "lesson_contents.bulk_write"]
+    stored = {doc["lessonId"]: doc for doc in run_async(database.lesson_contents.find({}).to_list, None)}
+    assert stored["lesson-1"]["updated_at"] == stored_before["lesson-1"]["updated_at"]
+    assert stored["lesson-2"]["embedCode"] == "<iframe src='slides-v2'></iframe>"
+    assert stored["lesson-2"]["contentHash"] != stored_before["lesson-2"]["contentHash"]
+
+
+def test_migration_moves_embedded_and_newly_external_fields(api_client, database_factory, use_database, run_async):
+    database = database_factory()
+    admin = make_user("admin")
+    run_async(database.users.insert_one, admin)
+    quiz = {"questions": [{"id": "q1", "question": "Why?", "correctAnswer": "Because"}]}
+    run_async(database.courses.insert_many, [
+        # Predates the split: everything embedded
+        course_with({"id": "lesson-1", "type": "quiz", "title": "Check", "content": "Intro", "quiz": quiz}),
+        # Split before embedCode moved: the body is stored, the embed HTML is still on the outline
+        {**course_with({"id": "lesson-1", "type": "presentation", "title": "Slides", "contentExternal": True,
+                        "embedCode": "<iframe></iframe>"}), "id": "course-split"},
+        {**course_with({"id": "lesson-1", "type": "text", "title": "Done", "contentExternal": True}), "id": "course-done"}
+    ])
+    run_async(database.lesson_contents.insert_many, [
+        {"courseId": "course-split", "lessonId": "lesson-1", "content": "Speaker notes"},
+        {"courseId": "course-done", "lessonId": "lesson-1", "content": "Already moved"}
+    ])
+    use_database(database)
+
+    response = api_client.post("/api/courses/migrate-lesson-content", headers=auth_headers(admin))
+    assert response.status_code == 200, response.text
+    assert (response.json()["migratedCourses"], response.json()["migratedLessons"]) == (2, 2)
+
+    for course in run_async(database.courses.find({}).to_list, None):
+        lesson = course["modules"][0]["lessons"][0]
+        assert lesson["contentExternal"] and not set(lesson) & {"content", "quiz", "questions", "embedCode"}
+    stored = {
+        doc["courseId"]: {field: doc.get(field) for field in ("content", "quiz", "embedCode")}
+        for doc in run_async(database.lesson_contents.find({}).to_list, None)
+    }
+    assert stored == {
+        COURSE_ID: {"content": "Intro", "quiz": quiz, "embedCode": None},
+        "course-split": {"content": "Speaker notes", "quiz": None, "embedCode": "<iframe></iframe>"},
+        "course-done": {"content": "Already moved", "quiz": None, "embedCode": None}
+    }
+
+    again = api_client.post("/api/courses/migrate-lesson-content", headers=auth_headers(admin))
+    assert (again.json()["migratedCourses"], again.json()["migratedLessons"]) == (0, 0)
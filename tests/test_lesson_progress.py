@@ -0,0 +1,162 @@
+"""
+Per-lesson progress: entries created on the first event, repeat calls, course completion and the quiz gate.
+
+Lesson updates use arrayFilters, which mongomock doesn't implement; the tests that
+write through them need a real mongod (TEST_MONGO_URL).
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+
+import pytest
+
+import routers.enrollments
+from routers.enrollments import apply_lesson_progress
+from tests.conftest import auth_headers, make_user
+
+requires_array_filters = pytest.mark.skipif(
+    not os.environ.get("TEST_MONGO_URL"), reason="mongomock doesn't implement arrayFilters; set TEST_MONGO_URL"
+)
+
+COURSE_ID = "course-lessons"
+QUIZ = {"passingScore": 50, "questions": [
+    {"id": "q1", "type": "true_false", "question": "?", "correctAnswer": "true", "points": 1}
+]}
+
+
+@pytest.fixture
+def lesson_data(database_factory, use_database, run_async):
+    database = database_factory()
+    learner = make_user("learner")
+    run_async(database.users.insert_one, learner)
+    run_async(database.courses.insert_one, {
+        "id": COURSE_ID,
+        "title": "Lessons course",
+        "totalLessons": 3,
+        "modules": [
+            {"id": "m1", "title": "Reading", "lessons": [
+                {"id": "lesson-1", "type": "text", "title": "One"},
+                {"id": "lesson-2", "type": "text", "title": "Two"}
+            ]},
+            {"id": "m2", "title": "Check", "lessons": [
+                {"id": "lesson-quiz", "type": "quiz", "title": "Checkpoint", "quiz": QUIZ}
+            ]}
+        ]
+    })
+    run_async(database.enrollments.insert_one, {
+        "id": "enrollment-1", "userId": learner["id"], "courseId": COURSE_ID, "progress": 0.0,
+        "status": "active", "moduleProgress": None, "timeSpent": 600, "enrolledAt": datetime(2024, 1, 1)
+    })
+    use_database(database)
+    headers = auth_headers(learner)
+    return database, headers, learner
+
+
+def post_progress(api_client, headers, lesson_id: str, body: dict):
+    return api_client.post(f"/api/enrollments/{COURSE_ID}/lessons/{lesson_id}/progress", headers=headers, json=body)
+
+
+def lesson_entry(enrollment: dict, lesson_id: str) -> dict:
+    return next(
+        lesson for module in enrollment["moduleProgress"] for lesson in module["lessons"]
+        if lesson["lessonId"] == lesson_id
+    )
+
+
+class RecordingEnrollments:
+    def __init__(self):
+        self.calls = []
+
+    async def find_one_and_update(self, query, update, array_filters=None, **kwargs):
+        self.calls.append((update, array_filters))
+        return {"id": "enrollment-1"}
+
+
+@pytest.mark.parametrize("completed, time_spent", [(False, None), (False, 0), (False, 30), (True, None), (True, 30)])
+def test_array_filters_are_only_sent_when_used(run_async, monkeypatch, completed, time_spent):
+    # MongoDB rejects an update whose arrayFilters name an identifier it doesn't use
+    enrollments = RecordingEnrollments()
+    monkeypatch.setattr(routers.enrollments, "db", type("Database", (), {"enrollments": enrollments})())
+    run_async(apply_lesson_progress, {"userId": "learner"}, "m1", "lesson-1", completed=completed, time_spent=time_spent)
+
+    update, array_filters = enrollments.calls[0]
+    used = set(re.findall(r"\$\[(\w+)\]", json.dumps(update, default=str)))
+    declared = {next(iter(array_filter)).split(".")[0] for array_filter in array_filters or []}
+    assert declared == used
+
+
+def test_visits_create_entries_without_completing(api_client, lesson_data):
+    _, headers, _ = lesson_data
+    for body in ({}, {"completed": False}, {"timeSpent": 0}):
+        response = post_progress(api_client, headers, "lesson-1", body)
+        assert response.status_code == 200, response.text
+
+    enrollment = response.json()
+    assert [module["moduleId"] for module in enrollment["moduleProgress"]] == ["m1"]
+    assert lesson_entry(enrollment, "lesson-1")["completed"] is False
+    assert (enrollment["currentModuleId"], enrollment["currentLessonId"]) == ("m1", "lesson-1")
+    assert enrollment["progress"] == 0.0
+
+
+def test_quiz_lesson_cannot_be_completed_before_passing(api_client, run_async, lesson_data):
+    database, headers, _ = lesson_data
+    blocked = post_progress(api_client, headers, "lesson-quiz", {"completed": True})
+    assert blocked.status_code == 400
+    assert "Checkpoint" in blocked.json()["detail"]
+
+    failed = api_client.post(f"/api/courses/{COURSE_ID}/lessons/lesson-quiz/quiz/submit", headers=headers,
+                             json={"answers": [{"questionId": "q1", "answer": "false"}]})
+    assert failed.status_code == 200, failed.text
+    assert post_progress(api_client, headers, "lesson-quiz", {"completed": True}).status_code == 400
+    enrollment = run_async(database.enrollments.find_one, {"id": "enrollment-1"})
+    assert (enrollment["status"], enrollment["moduleProgress"]) == ("active", None)
+
+
+@requires_array_filters
+def test_repeat_events_accumulate_time_and_keep_the_first_completion(api_client, lesson_data):
+    _, headers, _ = lesson_data
+    post_progress(api_client, headers, "lesson-1", {"timeSpent": 30})
+    enrollment = post_progress(api_client, headers, "lesson-1", {"timeSpent": 45}).json()
+    assert lesson_entry(enrollment, "lesson-1")["timeSpent"] == 75
+    # The enrollment total is the client's running total from PUT /progress
+    assert enrollment["timeSpent"] == 600
+
+    first = post_progress(api_client, headers, "lesson-1", {"completed": True}).json()
+    again = post_progress(api_client, headers, "lesson-1", {"completed": True}).json()
+    assert lesson_entry(again, "lesson-1")["completedAt"] == lesson_entry(first, "lesson-1")["completedAt"]
+    assert again["progress"] == pytest.approx(33.33)
+
+
+@requires_array_filters
+def test_course_completes_once_its_quiz_is_passed(api_client, run_async, lesson_data):
+    database, headers, learner = lesson_data
+    for lesson_id in ("lesson-1", "lesson-2"):
+        assert post_progress(api_client, headers, lesson_id, {"completed": True}).status_code == 200
+    assert post_progress(api_client, headers, "lesson-quiz", {"completed": True}).status_code == 400
+
+    passed = api_client.post(f"/api/courses/{COURSE_ID}/lessons/lesson-quiz/quiz/submit", headers=headers,
+                             json={"answers": [{"questionId": "q1", "answer": "true"}]})
+    assert passed.status_code == 200, passed.text
+    enrollment = post_progress(api_client, headers, "lesson-quiz", {"completed": True}).json()
+    assert (enrollment["status"], enrollment["progress"]) == ("completed", 100.0)
+    assert run_async(database.certificates.count_documents, {"studentId": learner["id"], "courseId": COURSE_ID}) == 1
+
+    post_progress(api_client, headers, "lesson-quiz", {"completed": True})
+    assert run_async(database.certificates.count_documents, {"studentId": learner["id"]}) == 1
+
+
+@requires_array_filters
+def test_quiz_marked_complete_elsewhere_does_not_complete_the_course(api_client, run_async, lesson_data):
+    database, headers, learner = lesson_data
+    # Stored by the old whole-moduleProgress writes, without a passing attempt
+    run_async(database.enrollments.update_one, {"userId": learner["id"]}, {"$set": {"moduleProgress": [
+        {"moduleId": "m2", "completed": True, "completedAt": None, "lessons": [
+            {"lessonId": "lesson-quiz", "completed": True, "completedAt": None, "timeSpent": 0}
+        ]}
+    ]}})
+    post_progress(api_client, headers, "lesson-1", {"completed": True})
+    enrollment = post_progress(api_client, headers, "lesson-2", {"completed": True}).json()
+    assert (enrollment["status"], enrollment["progress"]) == ("active", 95.0)
+    assert run_async(database.certificates.count_documents, {}) == 0
@@ -0,0 +1,90 @@
+"""
+Log pipeline: sampling, rate limiting and the background formatting thread.
+"""
+
+import io
+import json
+import logging
+import logging.handlers
+import queue
+
+from log_pipeline import (
+    BackgroundQueueHandler,
+    JsonFormatter,
+    RateLimitFilter,
+    SamplingFilter,
+    TextFormatter,
+    parse_sample_rates
+)
+
+
+def make_record(name="routers.quizzes", level=logging.INFO, msg="hello %s", args=("world",), lineno=10):
+    return logging.LogRecord(name, level, "quizzes.py", lineno, msg, args, None)
+
+
+def test_parse_sample_rates():
+    assert parse_sample_rates("") == {}
+    assert parse_sample_rates("routers.quizzes=0.1, uvicorn.access=0.01") == {"routers.quizzes": 0.1, "uvicorn.access": 0.01}
+
+
+def test_sampling_uses_longest_prefix_and_keeps_warnings():
+    sampling = SamplingFilter({"routers": 1.0, "routers.quizzes": 0.0})
+    assert not sampling.filter(make_record("routers.quizzes"))
+    assert sampling.filter(make_record("routers.courses"))
+    assert sampling.filter(make_record("routers.quizzes", level=logging.WARNING))
+    # "routers.quizzesx" is a different logger, not a child of routers.quizzes
+    assert sampling.filter(make_record("routers.quizzesx"))
+
+
+def test_rate_limit_is_per_call_site_and_reports_suppressed():
+    limiter = RateLimitFilter(per_second=0.0, burst=2)
+    kept = [limiter.filter(make_record()) for _ in range(5)]
+    assert kept == [True, True, False, False, False]
+    assert limiter.filter(make_record(lineno=11))
+
+    # Refill the bucket: the next record through carries the suppressed count
+    limiter.per_second = 1e9
+    record = make_record()
+    assert limiter.filter(record)
+    assert record.suppressed == 3
+    assert "[3 similar records suppressed]" in TextFormatter("%(message)s").format(record)
+
+
+def test_rate_limit_keeps_warnings_and_the_access_log():
+    limiter = RateLimitFilter(per_second=0.0, burst=1)
+    assert limiter.filter(make_record())
+    assert not limiter.filter(make_record())
+    assert all(limiter.filter(make_record(level=logging.ERROR)) for _ in range(3))
+    assert all(limiter.filter(make_record("uvicorn.access")) for _ in range(3))
+
+
+def test_records_are_formatted_on_the_listener_thread():
+    log_queue = queue.SimpleQueue()
+    stream = io.StringIO()
+    output = logging.StreamHandler(stream)
+    output.setFormatter(JsonFormatter())
+    listener = logging.handlers.QueueListener(log_queue, output)
+
+    logger = logging.getLogger("tests.log_pipeline")
+    logger.propagate = False
+    handler = BackgroundQueueHandler(log_queue)
+    logger.addHandler(handler)
+    try:
+        payload = {"value": 1}
+        logger.warning("payload %s", payload, extra={"course_id": "c1"})
+        payload["value"] = 2  # arguments are merged before the call returns
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("failed")
+        listener.start()
+    finally:
+        listener.stop()
+        logger.removeHandler(handler)
+
+    first, second = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert first["message"] == "payload {'value': 1}"
+    assert first["level"] == "WARNING"
+    assert first["course_id"] == "c1"
+    assert second["message"] == "failed"
+    assert "ValueError: boom" in second["exception"]
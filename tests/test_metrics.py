@@ -0,0 +1,94 @@
+"""
+Request metrics: route-template labels, status classes, the in-flight gauge, response sizes and /metrics.
+"""
+
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from metrics import MetricsMiddleware
+from tests.conftest import auth_headers, make_user
+
+COURSE_ID = "course-metrics"
+COURSE_ROUTE = "/api/courses/{course_id}"
+COURSE = {
+    "id": COURSE_ID, "title": "Metrics", "description": "Measured", "category": "Ops", "accessType": "open",
+    "modules": [], "instructorId": "instructor", "instructor": "Instructor", "status": "published",
+    "enrolledStudents": 0, "rating": 0.0, "created_at": datetime(2024, 1, 1), "updated_at": datetime(2024, 1, 1)
+}
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def request_count(route: str, status_class: str, method: str = "GET") -> float:
+    return sample("http_requests_total", method=method, route=route, status_class=status_class)
+
+
+@pytest.fixture
+def learner_headers(database_factory, use_database, run_async):
+    database = database_factory()
+    learner = make_user("learner")
+    run_async(database.users.insert_one, learner)
+    run_async(database.courses.insert_one, dict(COURSE))
+    use_database(database)
+    # Identity encoding, so the recorded size is the body the client receives
+    return {**auth_headers(learner), "Accept-Encoding": "identity"}
+
+
+def test_requests_are_labelled_by_route_template_and_status_class(api_client, learner_headers):
+    ok_before = request_count(COURSE_ROUTE, "2xx")
+    missing_before = request_count(COURSE_ROUTE, "4xx")
+    size_sum_before = sample("http_response_size_bytes_sum", method="GET", route=COURSE_ROUTE)
+    size_count_before = sample("http_response_size_bytes_count", method="GET", route=COURSE_ROUTE)
+
+    response = api_client.get(f"/api/courses/{COURSE_ID}?include_content=false", headers=learner_headers)
+    assert response.status_code == 200, response.text
+    assert request_count(COURSE_ROUTE, "2xx") == ok_before + 1
+    assert sample("http_response_size_bytes_sum", method="GET", route=COURSE_ROUTE) == size_sum_before + len(response.content)
+    assert sample("http_response_size_bytes_count", method="GET", route=COURSE_ROUTE) == size_count_before + 1
+
+    assert api_client.get("/api/courses/no-such-course", headers=learner_headers).status_code == 404
+    assert request_count(COURSE_ROUTE, "4xx") == missing_before + 1
+    # The concrete path never becomes a label
+    assert sample("http_requests_total", method="GET", route=f"/api/courses/{COURSE_ID}", status_class="2xx") == 0
+    assert sample("http_requests_in_progress", method="GET") == 0
+
+
+def test_in_flight_gauge_counts_the_request_and_returns_to_zero_on_errors():
+    app = FastAPI()
+
+    @app.get("/metrics-test/in-flight")
+    async def in_flight():
+        return {"inFlight": sample("http_requests_in_progress", method="GET")}
+
+    @app.get("/metrics-test/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    app.add_middleware(MetricsMiddleware)
+    client = TestClient(app, raise_server_exceptions=False)
+
+    assert client.get("/metrics-test/in-flight").json() == {"inFlight": 1}
+    assert sample("http_requests_in_progress", method="GET") == 0
+
+    errors_before = request_count("/metrics-test/boom", "5xx")
+    assert client.get("/metrics-test/boom").status_code == 500
+    assert request_count("/metrics-test/boom", "5xx") == errors_before + 1
+    assert sample("http_requests_in_progress", method="GET") == 0
+
+
+def test_metrics_endpoint_exposes_the_registry(api_client, learner_headers):
+    api_client.get(f"/api/courses/{COURSE_ID}?include_content=false", headers=learner_headers)
+
+    response = api_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert f'http_requests_total{{method="GET",route="{COURSE_ROUTE}",status_class="2xx"}}' in response.text
+    assert "http_request_duration_seconds_bucket" in response.text
+    # Scrapes aren't measured themselves
+    assert 'route="/metrics"' not in response.text
@@ -0,0 +1,93 @@
+"""
+Mongo pool options, pool telemetry, warm-up and the in-process keep-alive.
+"""
+
+from pymongo import monitoring
+
+from metrics import (
+    MONGO_POOL_CHECKED_OUT,
+    MONGO_POOL_CHECKOUT_WAIT,
+    MONGO_POOL_MAX_SIZE,
+    MONGO_POOL_SATURATION,
+    PoolMetricsListener
+)
+from mongo_pool import DatabaseKeepAlive, pool_options_from_env, warm_up_pool
+
+ADDRESS = ("pool-test", 27017)
+LABEL = "pool-test:27017"
+
+
+def test_pool_options_defaults_and_overrides():
+    assert pool_options_from_env("mongodb://localhost:27017", environ={}) == {}
+
+    atlas = pool_options_from_env("mongodb+srv://cluster0.abc.mongodb.net", environ={})
+    assert atlas["maxPoolSize"] == 10
+    assert atlas["socketTimeoutMS"] == 5000
+
+    options = pool_options_from_env("mongodb+srv://cluster0.abc.mongodb.net", environ={
+        "MONGO_MAX_POOL_SIZE": "50",
+        "MONGO_MIN_POOL_SIZE": "5",
+        "MONGO_MAX_IDLE_TIME_MS": "300000",
+        "MONGO_COMPRESSORS": "zstd,snappy,zlib"
+    })
+    assert options["maxPoolSize"] == 50
+    assert options["minPoolSize"] == 5
+    assert options["maxIdleTimeMS"] == 300000
+    assert options["compressors"] == "zstd,snappy,zlib"
+    assert options["retryWrites"] is True
+
+
+def sample(metric, **labels) -> float:
+    for family in metric.collect():
+        for s in family.samples:
+            if s.labels == labels and not s.name.endswith("_created"):
+                return s.value
+    return 0.0
+
+
+def test_pool_listener_reports_saturation_and_checkout_wait():
+    listener = PoolMetricsListener("primary")
+    listener.pool_created(monitoring.PoolCreatedEvent(ADDRESS, {"maxPoolSize": 4}))
+    assert sample(MONGO_POOL_MAX_SIZE, pool="primary", address=LABEL) == 4
+
+    waits_before = sample(MONGO_POOL_CHECKOUT_WAIT, pool="primary", address=LABEL, le="+Inf")
+    for connection_id in range(3):
+        listener.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(ADDRESS))
+        listener.connection_checked_out(monitoring.ConnectionCheckedOutEvent(ADDRESS, connection_id))
+    assert sample(MONGO_POOL_CHECKED_OUT, pool="primary", address=LABEL) == 3
+    assert sample(MONGO_POOL_SATURATION, pool="primary", address=LABEL) == 0.75
+    assert sample(MONGO_POOL_CHECKOUT_WAIT, pool="primary", address=LABEL, le="+Inf") == waits_before + 3
+
+    listener.connection_checked_in(monitoring.ConnectionCheckedInEvent(ADDRESS, 0))
+    assert sample(MONGO_POOL_SATURATION, pool="primary", address=LABEL) == 0.5
+
+    listener.pool_closed(monitoring.PoolClosedEvent(ADDRESS))
+    assert sample(MONGO_POOL_SATURATION, pool="primary", address=LABEL) == 0
+
+
+def test_pools_on_the_same_address_report_separately():
+    primary = PoolMetricsListener("primary")
+    analytics = PoolMetricsListener("analytics")
+    primary.pool_created(monitoring.PoolCreatedEvent(ADDRESS, {"maxPoolSize": 10}))
+    analytics.pool_created(monitoring.PoolCreatedEvent(ADDRESS, {"maxPoolSize": 5}))
+
+    analytics.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(ADDRESS))
+    analytics.connection_checked_out(monitoring.ConnectionCheckedOutEvent(ADDRESS, 1))
+    assert sample(MONGO_POOL_MAX_SIZE, pool="primary", address=LABEL) == 10
+    assert sample(MONGO_POOL_SATURATION, pool="analytics", address=LABEL) == 0.2
+    assert sample(MONGO_POOL_CHECKED_OUT, pool="primary", address=LABEL) == 0
+
+    analytics.pool_closed(monitoring.PoolClosedEvent(ADDRESS))
+    primary.pool_closed(monitoring.PoolClosedEvent(ADDRESS))
+
+
+def test_warm_up_and_keep_alive(mongo_client, database_factory, run_async):
+    assert run_async(warm_up_pool, mongo_client, 0) == 0
+    assert run_async(warm_up_pool, mongo_client, 3) == 3
+
+    database = database_factory()
+    keep_alive = DatabaseKeepAlive(mongo_client, database, interval=60, health_every=2)
+    run_async(keep_alive.ping, 1)
+    assert run_async(database.system_health.find_one, {"service": "keep_alive"}) is None
+    run_async(keep_alive.ping, 2)
+    assert run_async(database.system_health.find_one, {"service": "keep_alive"})["status"] == "active"
@@ -0,0 +1,310 @@
+"""
+Query-count regression tests.
+
+Every read route is called against two seeded datasets of different sizes. A
+route fails when it issues more Mongo commands than its budget, returns more
+documents than its per-row budget allows, or when its command count grows with
+the dataset size (a per-row lookup).
+
+Routes that still do per-row lookups are marked xfail(strict=True): fixing one
+makes its test pass, which fails the run until the marker is removed, so the
+budget can only ratchet down.
+"""
+
+from dataclasses import dataclass, field
+from typing import Callable, Dict
+
+import pytest
+
+from tests.conftest import auth_headers, make_user
+
+SMALL, LARGE = 5, 20
+
+# Documents a route may read beyond what scales with the dataset (current user, parent records, ...)
+BASE_DOCUMENTS = 10
+
+KNOWN_PER_ROW_LOOKUPS = "issues one or more queries per row; remove the marker once batched"
+
+
+@dataclass
+class Route:
+    path: str
+    role: str = "admin"
+    max_commands: int = 8
+    documents_per_row: int = 5
+    # Rows the route legitimately returns for a dataset of size N
+    rows: Callable[[int], int] = lambda size: size
+    known_per_row: bool = False
+
+    @property
+    def param(self):
+        marks = [pytest.mark.xfail(strict=True, reason=KNOWN_PER_ROW_LOOKUPS)] if self.known_per_row else []
+        return pytest.param(self, id=f"{self.role}:{self.path}", marks=marks)
+
+
+ROUTES = [
+    Route("/api/auth/me", role="learner", max_commands=1),
+    Route("/api/auth/admin/users"),
+    Route("/api/courses"),
+    Route("/api/courses/summary", max_commands=2),
+    Route("/api/courses/my-courses", role="learner"),
+    Route("/api/courses/my-courses/summary", role="learner"),
+    Route("/api/courses/{course_id}", role="learner"),
+    Route("/api/courses/{course_id}/lessons/{quiz_lesson_id}", role="learner"),
+    Route("/api/enrollments", role="learner"),
+    # Every learner is enrolled in every course through the classroom program
+    Route("/api/admin/enrollments", rows=lambda size: size * size),
+    Route("/api/programs"),
+    Route("/api/programs/my-programs", role="instructor"),
+    Route("/api/programs/{program_id}"),
+    Route("/api/programs/{program_id}/access-check", role="learner"),
+    Route("/api/categories"),
+    Route("/api/categories/{category_id}"),
+    Route("/api/departments"),
+    Route("/api/departments/{department_id}"),
+    Route("/api/classrooms"),
+    Route("/api/classrooms/my-classrooms", role="learner"),
+    Route("/api/classrooms/{classroom_id}"),
+    Route("/api/classrooms/{classroom_id}/students", known_per_row=True),
+    Route("/api/announcements"),
+    Route("/api/announcements/{announcement_id}"),
+    Route("/api/certificates"),
+    Route("/api/certificates/my-certificates", role="learner"),
+    Route("/api/certificates/{certificate_id}"),
+    Route("/api/certificates/verify/{verification_code}"),
+    Route("/api/quizzes"),
+    Route("/api/quizzes/{quiz_id}"),
+    Route("/api/quizzes/{quiz_id}/attempt-check", role="learner"),
+    Route("/api/quizzes/{quiz_id}/item-analysis", role="instructor"),
+    Route("/api/quiz-attempts"),
+    Route("/api/quiz-attempts/{quiz_attempt_id}"),
+    Route("/api/quiz-attempts/{quiz_attempt_id}/detailed"),
+    Route("/api/admin/quiz-attempts", known_per_row=True),
+    Route("/api/final-tests"),
+    Route("/api/final-tests/my-tests", role="instructor"),
+    Route("/api/final-tests/{final_test_id}"),
+    Route("/api/final-tests/{final_test_id}/attempt-check", role="learner"),
+    Route("/api/final-tests/{final_test_id}/item-analysis", role="instructor"),
+    Route("/api/final-test-attempts", known_per_row=True),
+    Route("/api/final-test-attempts/{final_test_attempt_id}"),
+    Route("/api/final-test-attempts/{final_test_attempt_id}/detailed"),
+    Route("/api/admin/final-test-attempts", known_per_row=True),
+    Route("/api/analytics/system-stats", max_commands=30),
+    Route("/api/analytics/user/{learner_id}", max_commands=10),
+    Route("/api/analytics/dashboard"),
+    Route("/api/courses/all/submissions"),
+    Route("/api/courses/{course_id}/submissions"),
+    Route("/api/grading/queue", max_commands=3),
+    Route("/api/submissions/{submission_id}/grade", role="learner"),
+    Route("/api/gradebook/courses/{course_id}", max_commands=3),
+    Route("/api/gradebook/courses/{course_id}/export", max_commands=3),
+    Route("/api/gradebook/classrooms/{classroom_id}", max_commands=4),
+    Route("/api/gradebook/classrooms/{classroom_id}/export", max_commands=4),
+    Route("/api/exports/quiz-attempts", max_commands=2),
+    Route("/api/exports/final-test-attempts", max_commands=2),
+    Route("/api/exports/enrollments", max_commands=2, rows=lambda size: size * size),
+    Route("/api/exports/submissions", max_commands=2),
+    Route("/api/exports/certificates", max_commands=2),
+]
+
+# Read routes the seeded data can't reach yet, so they have no budget:
+# - /announcements/my-announcements and /quizzes/my-quizzes are shadowed by the
+#   /{announcement_id} and /{quiz_id} routes registered before them
+# - /analytics/course/{course_id} filters courses on an is_active field they don't carry
+
+
+@dataclass
+class Dataset:
+    size: int
+    database: object
+    headers: Dict[str, dict] = field(default_factory=dict)
+    ids: Dict[str, str] = field(default_factory=dict)
+
+
+def _quiz_lesson(title: str) -> dict:
+    return {
+        "id": f"lesson-{title}",
+        "title": title,
+        "type": "quiz",
+        "quiz": {
+            "questions": [
+                {
+                    "id": f"{title}-mc",
+                    "type": "multiple_choice",
+                    "question": "Pick the first option",
+                    "options": ["a", "b"],
+                    "correctAnswer": "0",
+                    "points": 1
+                },
+                {
+                    "id": f"{title}-essay",
+                    "type": "long_form",
+                    "question": "Explain your answer",
+                    "points": 5
+                }
+            ]
+        }
+    }
+
+
+def _course_payload(index: int, category: str) -> dict:
+    return {
+        "title": f"Course {index}",
+        "description": "Seeded course",
+        "category": category,
+        "modules": [
+            {
+                "title": "Module 1",
+                "lessons": [
+                    {"id": f"lesson-{index}-text", "title": "Reading", "type": "text", "content": "x" * 200},
+                    _quiz_lesson(f"{index}-quiz")
+                ]
+            },
+            {
+                "title": "Module 2",
+                "lessons": [
+                    {"id": f"lesson-{index}-video", "title": "Video", "type": "video", "content": "https://example.com"}
+                ]
+            }
+        ]
+    }
+
+
+def _questions() -> list:
+    return [
+        {"type": "multiple_choice", "question": "Pick a", "options": ["a", "b"], "correctAnswer": "0", "points": 1},
+        {"type": "true_false", "question": "True?", "correctAnswer": "true", "points": 1}
+    ]
+
+
+def seed_dataset(client, run_async, database, size: int) -> Dataset:
+    """Build a dataset through the API so documents match what the app writes itself."""
+    dataset = Dataset(size=size, database=database)
+
+    def user(role: str, index: int = 0) -> dict:
+        return make_user(role, index, first_login_required=False, is_temporary_password=False)
+
+    admin, instructor = user("admin"), user("instructor")
+    learners = [user("learner", i) for i in range(size)]
+    run_async(database.users.insert_many, [admin, instructor] + learners)
+
+    learner_headers = [auth_headers(learner) for learner in learners]
+    dataset.headers = {"admin": auth_headers(admin), "instructor": auth_headers(instructor), "learner": learner_headers[0]}
+
+    def post(path, payload, role="admin", headers=None):
+        response = client.post(path, json=payload, headers=headers or dataset.headers[role])
+        assert response.status_code == 200, f"seeding {path} failed: {response.text}"
+        return response.json()
+
+    category = post("/api/categories", {"name": "Seeded"})
+    department = post("/api/departments", {"name": "Seeded"})
+    courses = [post("/api/courses", _course_payload(i, category["name"]), role="instructor") for i in range(size)]
+    course = courses[0]
+    quiz_lesson = course["modules"][0]["lessons"][1]
+
+    program = post("/api/programs", {
+        "title": "Seeded program",
+        "description": "Seeded",
+        "courseIds": [c["id"] for c in courses]
+    }, role="instructor")
+    classroom = post("/api/classrooms", {
+        "name": "Seeded classroom",
+        "trainerId": instructor["id"],
+        "courseIds": [course["id"]],
+        "programIds": [program["id"]],
+        "studentIds": [learner["id"] for learner in learners]
+    })
+
+    quiz = post("/api/quizzes", {
+        "title": "Seeded quiz",
+        "courseId": course["id"],
+        "questions": _questions(),
+        "attempts": 10,
+        "isPublished": True
+    }, role="instructor")
+    final_test = post("/api/final-tests", {
+        "title": "Seeded final test",
+        "programId": program["id"],
+        "questions": _questions(),
+        "maxAttempts": 5,
+        "isPublished": True
+    }, role="instructor")
+
+    for index, headers in enumerate(learner_headers):
+        post("/api/announcements", {"title": f"Notice {index}", "content": "Seeded"}, role="instructor")
+        progress = client.put(f"/api/enrollments/{course['id']}/progress", json={"progress": 50.0}, headers=headers)
+        assert progress.status_code == 200, progress.text
+        quiz_attempt = post("/api/quiz-attempts", {"quizId": quiz["id"], "answers": ["0", "true"]}, headers=headers)
+        final_test_attempt = post("/api/final-test-attempts", {
+            "testId": final_test["id"],
+            "programId": program["id"],
+            "answers": [{"questionId": q["id"], "answer": "0"} for q in final_test["questions"]]
+        }, headers=headers)
+        post("/api/quiz-submissions/subjective", {"submissions": [{
+            "questionId": quiz_lesson["quiz"]["questions"][1]["id"],
+            "questionText": "Explain your answer",
+            "studentAnswer": "Because",
+            "courseId": course["id"],
+            "lessonId": quiz_lesson["id"],
+            "questionType": "long_form"
+        }]}, headers=headers)
+        certificate = post("/api/certificates", {"studentId": learners[index]["id"], "courseId": course["id"]})
+        if index == 0:
+            dataset.ids.update({
+                "quiz_attempt_id": quiz_attempt["id"],
+                "final_test_attempt_id": final_test_attempt["id"],
+                "certificate_id": certificate["id"],
+                "verification_code": certificate["verificationCode"]
+            })
+
+    submission = run_async(database.subjective_submissions.find_one, {"studentId": learners[0]["id"]})
+    announcement = run_async(database.announcements.find_one, {})
+    dataset.ids.update({
+        "learner_id": learners[0]["id"],
+        "course_id": course["id"],
+        "quiz_lesson_id": quiz_lesson["id"],
+        "program_id": program["id"],
+        "category_id": category["id"],
+        "department_id": department["id"],
+        "classroom_id": classroom["id"],
+        "announcement_id": announcement["id"],
+        "quiz_id": quiz["id"],
+        "final_test_id": final_test["id"],
+        "submission_id": submission["id"]
+    })
+    return dataset
+
+
+@pytest.fixture(scope="module")
+def datasets(api_client, run_async, database_factory, use_database):
+    seeded = {}
+    for size in (SMALL, LARGE):
+        database = database_factory()
+        use_database(database)
+        seeded[size] = seed_dataset(api_client, run_async, database, size)
+    return seeded
+
+
+def measure(api_client, use_database, dataset: Dataset, route: Route):
+    counter = use_database(dataset.database)
+    response = api_client.get(route.path.format(**dataset.ids), headers=dataset.headers[route.role])
+    assert response.status_code == 200, f"{route.path} returned {response.status_code}: {response.text}"
+    return counter.commands, counter.documents, list(counter.operations)
+
+
+@pytest.mark.parametrize("route", [route.param for route in ROUTES])
+def test_route_query_budget(route, datasets, api_client, use_database):
+    small_commands, small_documents, _ = measure(api_client, use_database, datasets[SMALL], route)
+    large_commands, large_documents, operations = measure(api_client, use_database, datasets[LARGE], route)
+
+    assert large_commands <= route.max_commands, (
+        f"{route.path} issued {large_commands} Mongo commands (budget {route.max_commands}): {operations}"
+    )
+    assert large_commands == small_commands, (
+        f"{route.path} issued {small_commands} commands at N={SMALL} but {large_commands} at N={LARGE}: {operations}"
+    )
+    for size, documents in ((SMALL, small_documents), (LARGE, large_documents)):
+        budget = route.documents_per_row * route.rows(size) + BASE_DOCUMENTS
+        assert documents <= budget, (
+            f"{route.path} read {documents} documents at N={size} (budget {budget})"
+        )
@@ -0,0 +1,123 @@
+"""
+Per-request query statistics: command counts and DB time, debug-only headers, the threshold log line.
+
+mongomock-motor doesn't emit pymongo command events, so each operation the counting
+database records is fed to QueryStatsListener as one started/succeeded pair.
+"""
+
+import itertools
+import json
+import logging
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from prometheus_client import REGISTRY
+
+from query_stats import REQUEST_ID_HEADER, QueryStatsListener, QueryStatsMiddleware
+from tests.conftest import QueryCounter, auth_headers, make_user
+
+COURSE_ID = "course-query-stats"
+COURSE_ROUTE = "/api/courses/{course_id}"
+COURSE_PATH = f"/api/courses/{COURSE_ID}?include_content=false"
+COURSE = {
+    "id": COURSE_ID, "title": "Stats", "description": "Counted", "category": "Ops", "accessType": "open",
+    "modules": [], "instructorId": "instructor", "instructor": "Instructor", "status": "published",
+    "enrolledStudents": 0, "rating": 0.0, "created_at": datetime(2024, 1, 1), "updated_at": datetime(2024, 1, 1)
+}
+COMMAND_MICROS = 1500
+
+
+@pytest.fixture
+def command_events(monkeypatch):
+    """Publish a command event pair, 1.5 ms long, for every recorded operation."""
+    listener = QueryStatsListener()
+    request_ids = itertools.count(1)
+    record = QueryCounter.record
+
+    def record_and_publish(self, collection, operation, documents=0):
+        record(self, collection, operation, documents)
+        request_id = next(request_ids)
+        listener.started(SimpleNamespace(command={operation: collection}, command_name=operation, request_id=request_id))
+        listener.succeeded(SimpleNamespace(command_name=operation, request_id=request_id, duration_micros=COMMAND_MICROS))
+
+    monkeypatch.setattr(QueryCounter, "record", record_and_publish)
+
+
+@pytest.fixture
+def stats_middleware(api_client, server_module):
+    api_client.get("/health")  # builds the middleware stack
+    app = server_module.app.middleware_stack
+    while not isinstance(app, QueryStatsMiddleware):
+        app = app.app
+    return app
+
+
+@pytest.fixture
+def course_data(database_factory, use_database, run_async, command_events):
+    database = database_factory()
+    learner = make_user("learner")
+    run_async(database.users.insert_one, learner)
+    run_async(database.courses.insert_one, dict(COURSE))
+    counter = use_database(database)
+    return counter, auth_headers(learner)
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_commands_are_counted_and_timed_per_request(api_client, course_data):
+    counter, headers = course_data
+    count_before = sample("http_request_db_commands_sum", method="GET", route=COURSE_ROUTE)
+    time_before = sample("http_request_db_seconds_sum", method="GET", route=COURSE_ROUTE)
+
+    counter.reset()
+    response = api_client.get(COURSE_PATH, headers=headers)
+    assert response.status_code == 200, response.text
+    assert counter.operations == ["users.find_one", "courses.find_one"]
+
+    assert sample("http_request_db_commands_sum", method="GET", route=COURSE_ROUTE) == count_before + 2
+    assert sample("http_request_db_seconds_sum", method="GET", route=COURSE_ROUTE) == pytest.approx(
+        time_before + 2 * COMMAND_MICROS / 1_000_000
+    )
+    # Commands issued outside a request aren't attributed to anything
+    QueryCounter().record("courses", "find_one")
+    assert sample("http_request_db_commands_sum", method="GET", route=COURSE_ROUTE) == count_before + 2
+
+
+def test_debug_headers_only_in_debug_mode(api_client, course_data, stats_middleware, monkeypatch):
+    _, headers = course_data
+    response = api_client.get(COURSE_PATH, headers={**headers, REQUEST_ID_HEADER: "req-1"})
+    assert response.headers[REQUEST_ID_HEADER] == "req-1"
+    assert "X-DB-Query-Count" not in response.headers
+    assert "X-DB-Time-Ms" not in response.headers
+
+    monkeypatch.setattr(stats_middleware, "expose_headers", True)
+    response = api_client.get(COURSE_PATH, headers=headers)
+    assert response.headers[REQUEST_ID_HEADER]
+    assert response.headers["X-DB-Query-Count"] == "2"
+    assert response.headers["X-DB-Time-Ms"] == "3.0"
+
+
+def test_threshold_log_line(api_client, course_data, stats_middleware, monkeypatch, caplog):
+    _, headers = course_data
+    caplog.set_level(logging.WARNING, logger="query_stats")
+
+    api_client.get(COURSE_PATH, headers=headers)
+    assert not [record for record in caplog.records if record.name == "query_stats"]
+
+    monkeypatch.setattr(stats_middleware, "count_threshold", 1)
+    api_client.get(COURSE_PATH, headers={**headers, REQUEST_ID_HEADER: "req-slow"})
+    [record] = [record for record in caplog.records if record.name == "query_stats"]
+    line = json.loads(record.getMessage())
+    assert line["event"] == "request_db_threshold_exceeded"
+    assert (line["request_id"], line["route"], line["path"]) == ("req-slow", COURSE_ROUTE, f"/api/courses/{COURSE_ID}")
+    assert (line["db_commands"], line["db_time_ms"]) == (2, 3.0)
+    assert sorted(command["collection"] for command in line["slowest"]) == ["courses", "users"]
+
+    caplog.clear()
+    monkeypatch.setattr(stats_middleware, "count_threshold", 50)
+    monkeypatch.setattr(stats_middleware, "time_threshold_ms", 2.0)
+    api_client.get(COURSE_PATH, headers=headers)
+    assert [record.name for record in caplog.records if record.name == "query_stats"] == ["query_stats"]
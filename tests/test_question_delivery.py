@@ -0,0 +1,79 @@
+"""
+Question delivery: learners get answer-free questions drawn per attempt, and submits grade exactly those.
+"""
+
+import pytest
+
+from assessment_cache import ANSWER_KEY_FIELDS
+from tests.conftest import auth_headers, make_user
+
+TEST_ID = "pooled-test"
+QUIZ_ID = "plain-quiz"
+POOL = [
+    {"id": f"q{index}", "type": "true_false", "question": f"Statement {index}", "correctAnswer": "true",
+     "explanation": "Because", "points": index + 1, "created_at": "2024-01-01T00:00:00"}
+    for index in range(6)
+]
+
+
+@pytest.fixture
+def delivery_data(database_factory, use_database, run_async):
+    database = database_factory()
+    learner = make_user("learner")
+    run_async(database.users.insert_one, learner)
+    run_async(database.programs.insert_one, {"id": "program-1", "title": "Program"})
+    common = {
+        "questions": POOL, "totalPoints": 21, "questionCount": len(POOL), "passingScore": 50.0,
+        "showResults": True, "isPublished": True, "isActive": True, "createdBy": "instructor",
+        "createdByName": "Instructor", "created_at": "2024-01-01T00:00:00", "updated_at": "2024-01-01T00:00:00"
+    }
+    run_async(database.final_tests.insert_one, {
+        **common, "id": TEST_ID, "title": "Pooled", "programId": "program-1", "maxAttempts": 3,
+        "shuffleQuestions": True, "questionsPerAttempt": 3
+    })
+    run_async(database.quizzes.insert_one, {
+        **common, "id": QUIZ_ID, "title": "Plain", "attempts": 2, "shuffleQuestions": False
+    })
+    counter = use_database(database)
+    headers = auth_headers(learner)
+    return database, counter, headers, learner
+
+
+def test_pooled_attempts_are_served_and_graded_on_the_same_draw(api_client, run_async, delivery_data):
+    database, counter, headers, learner = delivery_data
+    served = api_client.get(f"/api/final-tests/{TEST_ID}", headers=headers).json()
+    assert len(served["questions"]) == served["questionCount"] == 3
+    assert served["totalPoints"] == sum(question["points"] for question in served["questions"])
+    assert not any(field in question for question in served["questions"] for field in ANSWER_KEY_FIELDS)
+
+    counter.reset()
+    again = api_client.get(f"/api/final-tests/{TEST_ID}", headers=headers).json()
+    assert again["questions"] == served["questions"]
+    assert counter.operations == ["users.find_one", "attempt_summaries.find_one"]
+
+    served_ids = [question["id"] for question in served["questions"]]
+    response = api_client.post("/api/final-test-attempts", headers=headers, json={
+        "testId": TEST_ID, "programId": "program-1",
+        "answers": [{"questionId": question_id, "answer": "true"} for question_id in served_ids]
+    })
+    assert response.status_code == 200, response.text
+    assert (response.json()["score"], response.json()["totalPoints"]) == (100.0, served["totalPoints"])
+
+    attempt = run_async(database.final_test_attempts.find_one, {"studentId": learner["id"]})
+    assert attempt["questionIds"] == served_ids
+    assert sorted(attempt["itemScores"]) == sorted(served_ids)
+
+
+def test_fixed_quizzes_serve_one_encoded_payload(api_client, delivery_data):
+    _, counter, headers, _ = delivery_data
+    first = api_client.get(f"/api/quizzes/{QUIZ_ID}", headers=headers, params={"include_answers": True})
+    assert [question["id"] for question in first.json()["questions"]] == [question["id"] for question in POOL]
+    assert not any(field in question for question in first.json()["questions"] for field in ANSWER_KEY_FIELDS)
+
+    counter.reset()
+    second = api_client.get(f"/api/quizzes/{QUIZ_ID}", headers=headers)
+    assert second.content == first.content
+    assert counter.operations == ["users.find_one"]
+
+    response = api_client.post("/api/quiz-attempts", headers=headers, json={"quizId": QUIZ_ID, "answers": ["true"] * 5})
+    assert response.status_code == 400
@@ -0,0 +1,139 @@
+"""
+Reporting: incremental Parquet snapshots and the cohort, completion-time and funnel reports over them.
+"""
+
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+import reporting
+from reporting import SNAPSHOT_TABLES, batches, compact_table, load_table, snapshot_table, table_directory, table_lock
+from tests.conftest import auth_headers, make_user
+
+COURSE_ID = "course-1"
+
+
+def enrollment(learner: dict, enrolled: datetime, completed_after_days=None, progress=100.0) -> dict:
+    completed = enrolled + timedelta(days=completed_after_days) if completed_after_days is not None else None
+    return {
+        "id": f"enrollment-{learner['id']}", "userId": learner["id"], "courseId": COURSE_ID, "progress": progress,
+        "status": "completed" if completed else "active", "enrolledAt": enrolled, "completedAt": completed,
+        "updated_at": completed or enrolled
+    }
+
+
+@pytest.fixture
+def report_data(database_factory, use_database, run_async, tmp_path, monkeypatch):
+    import routers.reports
+    monkeypatch.setattr(routers.reports, "REPORTS_DIR", str(tmp_path))
+    database = database_factory()
+    admin = make_user("admin")
+    learners = [
+        make_user("learner", index, department=department)
+        for index, department in enumerate(("Sales", "Sales", "Ops"))
+    ]
+    run_async(database.users.insert_many, [admin] + learners)
+    run_async(database.enrollments.insert_many, [
+        enrollment(learners[0], datetime(2024, 1, 5), 10),
+        enrollment(learners[1], datetime(2024, 1, 20), 25),
+        enrollment(learners[2], datetime(2024, 2, 3), progress=30.0)
+    ])
+    run_async(database.quiz_attempts.insert_one, {
+        "id": "attempt-1", "studentId": learners[2]["id"], "courseId": COURSE_ID, "lessonId": "lesson-quiz",
+        "score": 40.0, "isPassed": False, "isActive": True, "created_at": datetime(2024, 2, 10)
+    })
+    run_async(database.classrooms.insert_one, {
+        "id": "classroom-1", "name": "Morning", "courseIds": [COURSE_ID],
+        "studentIds": [learners[0]["id"], learners[2]["id"]]
+    })
+    use_database(database)
+    headers = auth_headers(admin)
+    return database, headers, learners, tmp_path
+
+
+def test_snapshots_are_incremental_and_keep_the_latest_copy(run_async, report_data):
+    database, _, learners, root = report_data
+    table = SNAPSHOT_TABLES["enrollments"]
+    assert run_async(snapshot_table, database, table, str(root), datetime(2024, 6, 1)) == 3
+
+    run_async(database.enrollments.update_one, {"userId": learners[2]["id"]}, {"$set": {
+        "progress": 100.0, "status": "completed", "completedAt": datetime(2024, 6, 20), "updated_at": datetime(2024, 6, 20)
+    }})
+    assert run_async(snapshot_table, database, table, str(root), datetime(2024, 7, 1)) == 1
+
+    enrollments = load_table(str(root), "enrollments").set_index("userId")
+    assert len(enrollments) == 3
+    assert enrollments.loc[learners[2]["id"], "progress"] == 100.0
+
+    assert compact_table(str(root), "enrollments") == 2
+    assert len(batches(table_directory(str(root), "enrollments"))) == 1
+    assert load_table(str(root), "enrollments").sort_values("id").equals(
+        enrollments.reset_index()[table.columns].sort_values("id")
+    )
+
+
+def test_reports_read_the_snapshots(api_client, report_data):
+    _, headers, learners, _ = report_data
+    assert api_client.get("/api/admin/reports/cohorts", headers=headers).status_code == 409
+    refreshed = api_client.post("/api/admin/reports/snapshots", headers=headers)
+    assert refreshed.status_code == 200, refreshed.text
+    assert refreshed.json()["rowsWritten"]["enrollments"] == 3
+
+    cohorts = api_client.get("/api/admin/reports/cohorts", headers=headers, params={"horizonWeeks": 4}).json()["cohorts"]
+    january = next(cohort for cohort in cohorts if cohort["cohort"] == "2024-01")
+    assert january["enrolled"] == 2
+    assert [point["completed"] for point in january["curve"]] == [0.0, 0.5, 0.5, 1.0, 1.0]
+
+    timing = api_client.get("/api/admin/reports/time-to-completion", headers=headers).json()
+    assert (timing["completed"], timing["enrolled"], timing["medianDays"]) == (2, 3, 17.5)
+
+    departments = api_client.get("/api/admin/reports/funnels", headers=headers).json()["groups"]
+    by_department = {group["group"]: group for group in departments}
+    assert [by_department["Sales"][stage] for stage in ("enrolled", "started", "attemptedQuiz", "completed")] == [2, 2, 0, 2]
+    assert [by_department["Ops"][stage] for stage in ("enrolled", "started", "attemptedQuiz", "completed")] == [1, 1, 1, 0]
+
+    classrooms = api_client.get("/api/admin/reports/funnels", headers=headers, params={"by": "classroom"}).json()["groups"]
+    assert [(group["group"], group["enrolled"], group["completed"], group["completionRate"]) for group in classrooms] == [
+        ("Morning", 2, 1, 0.5)
+    ]
+
+
+def test_snapshot_conversion_runs_off_the_event_loop(run_async, report_data, monkeypatch):
+    database, _, _, root = report_data
+    converted_on = []
+    snapshot_frame = reporting.snapshot_frame
+
+    def recording_frame(table, rows):
+        converted_on.append(threading.current_thread())
+        return snapshot_frame(table, rows)
+
+    monkeypatch.setattr(reporting, "snapshot_frame", recording_frame)
+
+    async def snapshot():
+        loop_thread = threading.current_thread()
+        await snapshot_table(database, SNAPSHOT_TABLES["enrollments"], str(root))
+        return loop_thread
+
+    loop_thread = run_async(snapshot)
+    assert converted_on and loop_thread not in converted_on
+
+
+def test_compaction_waits_for_readers(run_async, report_data):
+    database, _, _, root = report_data
+    table = SNAPSHOT_TABLES["enrollments"]
+    for run in (datetime(2024, 6, 1), datetime(2024, 7, 1)):
+        run_async(database.enrollments.update_many, {}, {"$set": {"updated_at": run}})
+        run_async(snapshot_table, database, table, str(root), run)
+    directory = table_directory(str(root), "enrollments")
+
+    # Hold the lock as a report reading the table would
+    with table_lock(directory):
+        compaction = threading.Thread(target=compact_table, args=(str(root), "enrollments"))
+        compaction.start()
+        compaction.join(timeout=0.2)
+        assert compaction.is_alive()
+        assert len(batches(directory)) == 2
+    compaction.join(timeout=10)
+    assert len(batches(directory)) == 1
+    assert len(load_table(str(root), "enrollments")) == 3
@@ -0,0 +1,92 @@
+"""
+Request profiler: signed headers, sampling, the per-route profile ring, and staying out when disabled.
+"""
+
+import itertools
+
+import pytest
+
+import request_profiler
+import routers.profiler
+from request_profiler import PROFILE_HEADER, ProfilerMiddleware, RequestProfiler
+from tests.conftest import auth_headers, make_user
+
+
+def http_scope(method: str = "GET", path: str = "/api/courses", token: str = None) -> dict:
+    headers = [(PROFILE_HEADER.lower().encode(), token.encode())] if token else []
+    return {"type": "http", "method": method, "path": path, "headers": headers}
+
+
+def test_signed_headers_verify_only_for_their_request_until_they_expire(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), secret="profiler-secret")
+    token = profiler.sign("get", "/api/courses")
+    assert profiler.verify("GET", "/api/courses", token)
+    assert not profiler.verify("GET", "/api/courses/other", token)
+    assert not profiler.verify("POST", "/api/courses", token)
+
+    expires, _, signature = token.partition(".")
+    assert not profiler.verify("GET", "/api/courses", f"{int(expires) + 60}.{signature}")
+    assert not profiler.verify("GET", "/api/courses", f"{expires}.{'0' * len(signature)}")
+    assert not profiler.verify("GET", "/api/courses", "not-a-token")
+    assert not profiler.verify("GET", "/api/courses", profiler.sign("GET", "/api/courses", ttl_seconds=-1))
+    # Another key can't produce a valid header
+    assert not RequestProfiler(str(tmp_path), secret="other").verify("GET", "/api/courses", token)
+
+
+def test_signed_headers_are_disabled_without_a_secret(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), secret=None, sample_rate=0.0)
+    with pytest.raises(ValueError):
+        profiler.sign("GET", "/api/courses")
+    forged = RequestProfiler(str(tmp_path), secret="guessed").sign("GET", "/api/courses")
+    assert not profiler.should_profile(http_scope(token=forged))
+
+
+def test_sampling_decision(tmp_path, monkeypatch):
+    profiler = RequestProfiler(str(tmp_path), secret="profiler-secret", sample_rate=0.0)
+    assert not profiler.should_profile(http_scope())
+    assert profiler.should_profile(http_scope(token=profiler.sign("GET", "/api/courses")))
+
+    profiler.sample_rate = 0.25
+    monkeypatch.setattr(request_profiler.random, "random", lambda: 0.2)
+    assert profiler.should_profile(http_scope())
+    monkeypatch.setattr(request_profiler.random, "random", lambda: 0.3)
+    assert not profiler.should_profile(http_scope())
+    # A header that doesn't verify is never profiled, whatever the sample rate
+    profiler.sample_rate = 1.0
+    assert not profiler.should_profile(http_scope(token="1.bad"))
+
+
+def test_profile_ring_keeps_the_newest_per_route(tmp_path, monkeypatch):
+    clock = itertools.count(1_700_000_000)
+    monkeypatch.setattr(request_profiler.time, "time", lambda: next(clock))
+    profiler = RequestProfiler(str(tmp_path), max_profiles_per_route=3)
+    for index in range(5):
+        profiler.save("/api/courses/{course_id}", f"request-{index}", 12.5, "main 1\n")
+    profiler.save("/api/health", "request-health", 1.0, "main 1\n")
+
+    profiles = profiler.list_profiles()
+    by_route = {}
+    for profile in profiles:
+        by_route.setdefault(profile["route"], []).append(profile["requestId"])
+    assert by_route == {
+        "api_courses_course_id": ["request-4", "request-3", "request-2"],
+        "api_health": ["request-health"]
+    }
+    assert profiler.profile_path("api_health", "../../etc/passwd") is None
+
+
+def test_middleware_is_not_installed_when_disabled(api_client, server_module, database_factory, use_database, run_async,
+                                                  tmp_path, monkeypatch):
+    assert server_module.request_profiler is None
+    assert ProfilerMiddleware not in [middleware.cls for middleware in server_module.app.user_middleware]
+
+    database = database_factory()
+    admin = make_user("admin")
+    run_async(database.users.insert_one, admin)
+    use_database(database)
+    assert api_client.get("/api/admin/profiler", headers=auth_headers(admin)).status_code == 404
+
+    # Enabled without PROFILER_SECRET: sampling works, signing headers is refused
+    monkeypatch.setattr(routers.profiler, "request_profiler", RequestProfiler(str(tmp_path)))
+    response = api_client.post("/api/admin/profiler/token", headers=auth_headers(admin), json={"path": "/api/courses"})
+    assert response.status_code == 409
@@ -0,0 +1,57 @@
+"""
+Static assets: precompressed variants picked by Accept-Encoding q-values, with conditional requests.
+"""
+
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from server import IMMUTABLE_CACHE_CONTROL, PrecompressedStaticFiles, accepted_encodings
+
+ASSET = "main.3f9a1b2c.js"
+SOURCE = b"console.log('hello');" * 20
+
+
+@pytest.fixture
+def static_client(tmp_path):
+    (tmp_path / ASSET).write_bytes(SOURCE)
+    (tmp_path / f"{ASSET}.gz").write_bytes(gzip.compress(SOURCE))
+    (tmp_path / f"{ASSET}.br").write_bytes(b"not-really-brotli")
+    app = FastAPI()
+    app.mount("/static", PrecompressedStaticFiles(directory=str(tmp_path)), name="static")
+    return TestClient(app)
+
+
+def test_accept_encoding_q_values_are_parsed():
+    assert accepted_encodings("gzip, br;q=0.5, *;q=0") == {"gzip": 1.0, "br": 0.5, "*": 0.0}
+    assert accepted_encodings("BR ; q=bogus") == {"br": 0.0}
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("br, gzip", "br"),
+    ("gzip, br;q=0", "gzip"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("xbr", None),
+    ("identity", None)
+])
+def test_precompressed_variant_follows_accept_encoding(static_client, accept_encoding, expected):
+    response = static_client.get(f"/static/{ASSET}", headers={"Accept-Encoding": accept_encoding})
+    assert response.status_code == 200
+    assert response.headers.get("content-encoding") == expected
+    assert "javascript" in response.headers["content-type"]
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_precompressed_variant_answers_conditional_requests(static_client):
+    headers = {"Accept-Encoding": "gzip"}
+    first = static_client.get(f"/static/{ASSET}", headers=headers)
+    assert first.content == SOURCE
+
+    revalidated = static_client.get(f"/static/{ASSET}", headers={**headers, "If-None-Match": first.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+    since = static_client.get(f"/static/{ASSET}", headers={**headers, "If-Modified-Since": first.headers["last-modified"]})
+    assert since.status_code == 304
@@ -0,0 +1,114 @@
+"""
+Write-behind buffer: heartbeats merge per document, failures requeue, write-throughs win.
+"""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from pymongo.errors import PyMongoError
+
+import core
+from tests.conftest import auth_headers, make_user
+from write_buffer import CoalescingWriteBuffer
+
+COURSE_ID = "course-buffered"
+
+
+class StalledCollection:
+    """bulk_write waits until released, then fails."""
+
+    def __init__(self):
+        self.entered = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def bulk_write(self, operations, ordered=True):
+        self.entered.set()
+        await self.release.wait()
+        raise PyMongoError("primary stepped down")
+
+
+def test_updates_merge_per_document(database_factory, run_async):
+    enrollments = database_factory().enrollments
+    run_async(enrollments.insert_many, [{"id": "e1", "timeSpent": 0}, {"id": "e2", "timeSpent": 0}])
+    buffer = CoalescingWriteBuffer(enrollments)
+    buffer.add("e1", {"id": "e1"}, {"timeSpent": 30, "currentLessonId": "lesson-1"})
+    buffer.add("e1", {"id": "e1"}, {"timeSpent": 60})
+    buffer.add("e2", {"id": "e2"}, {"timeSpent": 5})
+    assert buffer.pending("e1") == {"timeSpent": 60, "currentLessonId": "lesson-1"}
+
+    assert run_async(buffer.flush) == 2
+    stored = run_async(enrollments.find_one, {"id": "e1"})
+    assert (stored["timeSpent"], stored["currentLessonId"]) == (60, "lesson-1")
+    assert buffer.pending("e1") == {}
+    assert run_async(buffer.flush) == 0
+
+
+def test_failed_flush_requeues_all_but_what_was_written_through(run_async):
+    collection = StalledCollection()
+    buffer = CoalescingWriteBuffer(collection)
+
+    async def scenario():
+        buffer.add("taken", {"id": "taken"}, {"timeSpent": 10})
+        buffer.add("kept", {"id": "kept"}, {"timeSpent": 20})
+        flush = asyncio.ensure_future(buffer.flush())
+        await collection.entered.wait()
+        # A write-through while the batch is in flight finds nothing left to take
+        assert buffer.take("taken") == {}
+        buffer.add("kept", {"id": "kept"}, {"currentLessonId": "lesson-2"})
+        collection.release.set()
+        return await flush
+
+    assert run_async(scenario) == 0
+    assert buffer.pending("taken") == {}
+    assert buffer.pending("kept") == {"timeSpent": 20, "currentLessonId": "lesson-2"}
+
+
+def test_stop_flushes_what_is_queued(database_factory, run_async):
+    enrollments = database_factory().enrollments
+    run_async(enrollments.insert_one, {"id": "e1", "timeSpent": 0})
+    buffer = CoalescingWriteBuffer(enrollments, flush_interval=3600)
+
+    async def scenario():
+        buffer.start()
+        buffer.add("e1", {"id": "e1"}, {"timeSpent": 90})
+        await buffer.stop()
+
+    run_async(scenario)
+    assert run_async(enrollments.find_one, {"id": "e1"})["timeSpent"] == 90
+
+
+@pytest.fixture
+def enrollment_data(database_factory, use_database, run_async):
+    database = database_factory()
+    learner = make_user("learner")
+    run_async(database.users.insert_one, learner)
+    run_async(database.courses.insert_one, {
+        "id": COURSE_ID, "title": "Buffered", "modules": [
+            {"id": "m1", "title": "Module", "lessons": [{"id": "lesson-1", "type": "text", "title": "One"}]}
+        ]
+    })
+    run_async(database.enrollments.insert_one, {
+        "id": "enrollment-1", "userId": learner["id"], "courseId": COURSE_ID, "progress": 0.0,
+        "status": "active", "timeSpent": 0, "enrolledAt": datetime(2024, 1, 1)
+    })
+    counter = use_database(database)
+    return database, counter, auth_headers(learner), learner
+
+
+def test_heartbeat_is_buffered_until_a_progress_update_writes_through(api_client, run_async, enrollment_data):
+    database, counter, headers, learner = enrollment_data
+    path = f"/api/enrollments/{COURSE_ID}/progress"
+
+    counter.reset()
+    heartbeat = api_client.put(path, headers=headers, json={"currentLessonId": "lesson-1", "timeSpent": 120})
+    assert heartbeat.status_code == 200, heartbeat.text
+    assert heartbeat.json()["timeSpent"] == 120
+    assert counter.operations == ["users.find_one", "enrollments.find_one"]
+    assert run_async(database.enrollments.find_one, {"id": "enrollment-1"})["timeSpent"] == 0
+
+    update = api_client.put(path, headers=headers, json={"progress": 50.0})
+    assert update.status_code == 200, update.text
+    stored = run_async(database.enrollments.find_one, {"id": "enrollment-1"})
+    assert (stored["progress"], stored["currentLessonId"], stored["timeSpent"]) == (50.0, "lesson-1", 120)
+    assert core.progress_write_buffer.pending((learner["id"], COURSE_ID)) == {}